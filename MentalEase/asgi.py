@@ -3,6 +3,9 @@ ASGI config for MentalEase project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve with an ASGI server and ASYNC_VIEWS=true to use the async Supabase views,
+e.g. ``ASYNC_VIEWS=true uvicorn MentalEase.asgi:application --workers 4``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -14,3 +17,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'MentalEase.settings')
 
 application = get_asgi_application()
+
+# Only server processes probe the Supabase schema up front (students/repository.py)
+from students.repository import probe_schema_on_startup  # noqa: E402
+
+probe_schema_on_startup()
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 import os
 from pathlib import Path
 from dotenv import load_dotenv
+from django.core.exceptions import ImproperlyConfigured
 load_dotenv()
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -43,10 +44,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'students.middleware.SupabaseTimingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'students.middleware.LocalStudentMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -100,6 +103,40 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing. PASSWORD_HASHER picks the hasher for new hashes ("argon2", which
+# needs argon2-cffi, or "pbkdf2"); the other stays listed so existing hashes still
+# verify and get upgraded in the background after login (students/passwords.py).
+# Tune the costs for the host with `python manage.py calibrate_password_hasher`.
+try:
+    import argon2  # noqa: F401
+    ARGON2_AVAILABLE = True
+except ImportError:
+    ARGON2_AVAILABLE = False
+
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "argon2" if ARGON2_AVAILABLE else "pbkdf2")
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "102400"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "8"))
+PBKDF2_ITERATIONS = int(os.getenv("PBKDF2_ITERATIONS", "1000000"))
+# Threads that rewrite outdated hashes after login; keep low so upgrades never compete
+# with logins for CPU during a login storm
+PASSWORD_REHASH_WORKERS = int(os.getenv("PASSWORD_REHASH_WORKERS", "1"))
+# Upgrades allowed to wait for a worker; past this they are skipped until the next login
+PASSWORD_REHASH_QUEUE = int(os.getenv("PASSWORD_REHASH_QUEUE", "8"))
+
+_TUNED_HASHERS = {
+    "argon2": "students.hashers.TunedArgon2PasswordHasher",
+    "pbkdf2": "students.hashers.TunedPBKDF2PasswordHasher",
+}
+if PASSWORD_HASHER not in _TUNED_HASHERS:
+    raise ImproperlyConfigured(f"PASSWORD_HASHER must be one of {', '.join(_TUNED_HASHERS)}")
+PASSWORD_HASHERS = [_TUNED_HASHERS[PASSWORD_HASHER]] + [
+    hasher for name, hasher in _TUNED_HASHERS.items() if name != PASSWORD_HASHER
+] + [
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -130,6 +167,68 @@ AUTH_USER_MODEL = "students.Student"
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
+# Route the feed and admin JSON APIs to the async views in students/views_async.py.
+# Only enable when serving through MentalEase/asgi.py (e.g. uvicorn); under WSGI every
+# async view would run in its own short-lived event loop.
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "false").lower() in ("1", "true", "yes")
+
+# Threads available to students/parallel.py for running independent Supabase queries
+# side by side; keep it below SUPABASE_MAX_CONNECTIONS so the HTTP pool is not starved.
+SUPABASE_QUERY_WORKERS = int(os.getenv("SUPABASE_QUERY_WORKERS", "8"))
+
+# Per-request Supabase budgets (see students/middleware.py). Requests over either budget
+# are logged as warnings; single calls slower than SUPABASE_SLOW_QUERY_MS are logged too.
+SUPABASE_CALL_BUDGET = int(os.getenv("SUPABASE_CALL_BUDGET", "10"))
+SUPABASE_LATENCY_BUDGET_MS = float(os.getenv("SUPABASE_LATENCY_BUDGET_MS", "500"))
+SUPABASE_SLOW_QUERY_MS = float(os.getenv("SUPABASE_SLOW_QUERY_MS", "300"))
+# Expose Supabase timings to the browser in a Server-Timing header
+SUPABASE_SERVER_TIMING = os.getenv("SUPABASE_SERVER_TIMING", str(DEBUG)).lower() in ("1", "true", "yes")
+# Which post/like/comment tables and columns exist is probed once (students/repository.py),
+# in the background when a server loads wsgi.py/asgi.py unless disabled (management
+# commands probe on first use); when the probe fails the defaults are assumed and it is
+# retried after SUPABASE_SCHEMA_RETRY_SECONDS. With a refresh interval set, the schema is
+# re-probed that often so Supabase migrations apply without a restart.
+SUPABASE_SCHEMA_PROBE_ON_STARTUP = os.getenv("SUPABASE_SCHEMA_PROBE_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+SUPABASE_SCHEMA_RETRY_SECONDS = float(os.getenv("SUPABASE_SCHEMA_RETRY_SECONDS", "60"))
+SUPABASE_SCHEMA_REFRESH_SECONDS = float(os.getenv("SUPABASE_SCHEMA_REFRESH_SECONDS", "0"))
+
+# Application logs go through a queue to a background writer (students/log.py).
+# LOG_FORMAT=json emits one JSON object per line for log shippers.
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'text': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+        'json': {'()': 'students.log.JsonFormatter'},
+    },
+    'handlers': {
+        'console': {
+            '()': 'students.log.QueueStreamHandler',
+            'stream': 'ext://sys.stderr',
+            'formatter': 'json' if LOG_FORMAT == 'json' else 'text',
+        },
+    },
+    'loggers': {
+        'students': {
+            'handlers': ['console'],
+            'level': os.getenv("STUDENTS_LOG_LEVEL", "INFO"),
+            'propagate': False,
+        },
+    },
+}
+
+# Seconds an is_admin() decision stays cached per student (see students/roles.py)
+ADMIN_ROLE_CACHE_TTL = int(os.getenv("ADMIN_ROLE_CACHE_TTL", "300"))
+
+# Worker processes that resize uploaded profile pictures in the background (see
+# students/media.py); 0 processes uploads inside the request instead. Job state is
+# kept in the cache for PROFILE_PICTURE_JOB_TTL seconds so clients can poll it.
+PROFILE_PICTURE_WORKERS = int(os.getenv("PROFILE_PICTURE_WORKERS", "2"))
+PROFILE_PICTURE_JOB_TTL = int(os.getenv("PROFILE_PICTURE_JOB_TTL", "3600"))
+# Uploads whose header claims more pixels than this are rejected before decoding
+PROFILE_PICTURE_MAX_PIXELS = int(os.getenv("PROFILE_PICTURE_MAX_PIXELS", "40000000"))
+
 
 LOGIN_URL = '/students/login/'
 LOGIN_REDIRECT_URL = '/students/dashboard/'
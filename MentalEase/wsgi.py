@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'MentalEase.settings')
 
 application = get_wsgi_application()
+
+# Only server processes probe the Supabase schema up front (students/repository.py)
+from students.repository import probe_schema_on_startup  # noqa: E402
+
+probe_schema_on_startup()
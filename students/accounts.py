@@ -0,0 +1,63 @@
+# Username/email uniqueness for signup, admin signup and profile edits.
+# find_taken_fields() answers both questions with one query so the user gets a clear
+# message up front; the unique constraints on students.username and students.email
+# still decide races between the check and the write, and duplicate_field() maps
+# their errors back to the offending column.
+import re
+from .filters import quote_value
+from .supabase_client import supabase
+
+_KEY_RE = re.compile(r'Key \((\w+)\)')
+
+
+def find_taken_fields(username=None, email=None, exclude_id=None):
+    """Return which of username/email already belong to another student, e.g. {'email'}."""
+    conditions = []
+    if username:
+        conditions.append(f"username.eq.{quote_value(username)}")
+    if email:
+        conditions.append(f"email.eq.{quote_value(email)}")
+    if not conditions:
+        return set()
+
+    query = supabase.table("students").select("id, username, email").or_(",".join(conditions))
+    if exclude_id is not None:
+        query = query.neq("id", exclude_id)
+    # At most one row can hold the username and one the email
+    rows = query.limit(2).execute().data or []
+
+    taken = set()
+    for row in rows:
+        if username and row.get('username') == username:
+            taken.add('username')
+        if email and row.get('email') == email:
+            taken.add('email')
+    return taken
+
+
+def duplicate_field(error):
+    """Column named by a unique-violation error ('username', 'email', ...), 'unknown' if
+    it cannot be told, or None when the error is not a unique violation."""
+    code = getattr(error, 'code', None)
+    text = ' '.join(str(part) for part in (getattr(error, 'details', None), getattr(error, 'message', None), error) if part)
+    if code != '23505' and 'duplicate' not in text.lower() and 'unique' not in text.lower():
+        return None
+    match = _KEY_RE.search(text)
+    if match:
+        return match.group(1)
+    for field in ('username', 'email'):
+        if field in text.lower():
+            return field
+    return 'unknown'
+
+
+# What the signup pages tell the user for each taken field
+DUPLICATE_MESSAGES = {
+    'username': "❌ Username is already taken. Please choose a different one.",
+    'email': "❌ Email is already taken. Please use a different email address.",
+    'unknown': "❌ This username or email is already in use. Please choose different ones.",
+}
+
+
+def duplicate_message(field):
+    return DUPLICATE_MESSAGES.get(field, DUPLICATE_MESSAGES['unknown'])
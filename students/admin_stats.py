@@ -0,0 +1,61 @@
+# Aggregate counters for the admin pages.
+# Counts are computed by PostgREST (count="exact" on a HEAD request), so no rows
+# are transferred and the cost does not grow with the size of the tables.
+import logging
+from .parallel import run_parallel
+from .repository import get_repository
+from .supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+
+def count_rows(table, **filters):
+    """Return the number of rows in `table` matching the given equality filters."""
+    query = supabase.table(table).select("id", count="exact", head=True)
+    for column, value in filters.items():
+        query = query.eq(column, value)
+    response = query.execute()
+    return response.count or 0
+
+
+def count_posts(status=None):
+    """Number of posts, optionally only those in `status` (see repository.py)."""
+    response = get_repository().count_posts(status).execute()
+    return response.count or 0
+
+
+def get_pending_count():
+    """Number of posts awaiting moderation."""
+    return count_posts("pending")
+
+
+def get_navbar_stats():
+    """Stats needed by the admin navbar badge."""
+    stats = {'pending_count': 0}
+    try:
+        stats['pending_count'] = get_pending_count()
+    except Exception as e:
+        logger.warning("Error getting pending count: %s", e)
+    return stats
+
+
+def get_admin_stats():
+    """All counters shown on the admin dashboard; a failing counter reports 0."""
+    counters = {
+        'user_count': lambda: count_rows("students"),
+        'post_count': count_posts,
+        'pending_count': get_pending_count,
+        'resource_count': lambda: count_rows("wellness_resources"),
+    }
+
+    def safe(name, counter):
+        def run():
+            try:
+                return counter()
+            except Exception as e:
+                logger.warning("Error getting %s: %s", name, e)
+                return 0
+        return run
+
+    # The counters are independent, so fetch them together
+    return run_parallel({name: safe(name, counter) for name, counter in counters.items()})
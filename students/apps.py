@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_delete
+
+
+class StudentsConfig(AppConfig):
+    name = 'students'
+
+    def ready(self):
+        from .middleware import forget_local_student
+        from .models import Student
+        # Sessions keep the local Student's key (see middleware.resolve_local_student)
+        post_delete.connect(forget_local_student, sender=Student, dispatch_uid='students.forget_local_student')
@@ -0,0 +1,672 @@
+# In-process stand-in for the Supabase client, for offline tests and benchmarks.
+# Tables live in memory and queries go through the same builder calls the views
+# make (table().select/insert/update/delete, eq/neq/in_/or_/ilike/order/range/limit,
+# count="exact", head=True, embedded "<table>(count)", the database functions in
+# DEFAULT_FUNCTIONS, the post counter triggers and storage uploads), so the views
+# run unchanged once the fake is installed:
+#
+#     from students.fake_supabase import FakeSupabase
+#     from students.supabase_client import install_client
+#     install_client(FakeSupabase())
+#
+# Like PostgREST, unknown tables and columns raise APIError, so the schema probe
+# in repository.py resolves the same names against the fake as against a real
+# project; pass a different `schema` to FakeSupabase to try the legacy names.
+import copy
+import difflib
+import itertools
+import json
+import re
+import threading
+import time
+from datetime import datetime
+from postgrest.exceptions import APIError
+from .instrumentation import is_recording, record_call
+
+# The tables and columns the app reads and writes
+DEFAULT_SCHEMA = {
+    "students": ["id", "username", "email", "full_name", "password", "is_admin", "date_of_birth",
+                 "bio", "phone", "location", "profile_picture_url", "created_at"],
+    "admins": ["id", "student_id", "created_at"],
+    "posts": ["id", "content", "status", "approved", "is_anonymous", "student_id", "created_at",
+              "like_count", "comment_count"],
+    "likes": ["id", "post_id", "student_id", "created_at"],
+    "comments": ["id", "post_id", "student_id", "content", "created_at"],
+    "moods": ["id", "student_id", "mood", "mood_emoji", "score", "date"],
+    "journals": ["id", "student_id", "title", "content", "created_at", "updated_at"],
+    "wellness_resources": ["id", "name", "type", "description", "url", "phone", "created_at"],
+}
+
+# Columns with a unique constraint; writes that would duplicate a value raise 23505
+UNIQUE_COLUMNS = {
+    "students": ["username", "email"],
+}
+
+# Column defaults other than NULL
+COLUMN_DEFAULTS = {
+    "posts": {"like_count": 0, "comment_count": 0},
+    "anonymous_posts": {"like_count": 0, "comment_count": 0},
+}
+
+# Counters kept by the post_counters triggers (supabase/migrations): child table ->
+# (parent table, counter column); the legacy tables only count if given the column
+POST_COUNTERS = {
+    "likes": ("posts", "like_count"),
+    "comments": ("posts", "comment_count"),
+    "post_likes": ("anonymous_posts", "like_count"),
+    "post_comments": ("anonymous_posts", "comment_count"),
+}
+
+_FILTER_RE = re.compile(r'^(?P<column>[\w]+)\.(?P<negate>not\.)?(?P<op>\w+)\.(?P<value>.*)$', re.S)
+
+
+class FakeResponse:
+    """Mirrors the .data / .count attributes of postgrest's APIResponse."""
+
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+    def __repr__(self):
+        return f"FakeResponse(data={self.data!r}, count={self.count!r})"
+
+
+def _error(message, code, details=None):
+    return APIError({'message': message, 'code': code, 'hint': None, 'details': details})
+
+
+def _split_top_level(text):
+    """Split on commas that are not inside parentheses or double quotes."""
+    parts, depth, quoted, escaped, current = [], 0, False, False, []
+    for char in text:
+        if escaped:
+            escaped = False
+        elif quoted and char == '\\':
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and char == ',':
+            parts.append(''.join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    if current:
+        parts.append(''.join(current).strip())
+    return [part for part in parts if part]
+
+
+def _unquote(value):
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return re.sub(r'\\(.)', r'\1', value[1:-1], flags=re.S)
+    return value
+
+
+def _coerce(value, like):
+    """Convert a filter value to the type of the stored value, as Postgres would."""
+    if value is None or like is None or isinstance(value, type(like)):
+        return value
+    if isinstance(like, bool):
+        return str(value).lower() in ('true', 't', '1')
+    try:
+        return type(like)(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _like_regex(pattern):
+    """Translate a LIKE pattern (with PostgREST's * alias for %) to a regex; \\ escapes."""
+    parts, chars = [], iter(pattern)
+    for char in chars:
+        if char == '\\':
+            parts.append(re.escape(next(chars, '\\')))
+        elif char in '%*':
+            parts.append('.*')
+        elif char == '_':
+            parts.append('.')
+        else:
+            parts.append(re.escape(char))
+    return ''.join(parts) + r'\Z'
+
+
+def _pattern_matches(value, pattern, case_insensitive):
+    if value is None:
+        return False
+    flags = re.S | (re.I if case_insensitive else 0)
+    return re.match(_like_regex(pattern), str(value), flags) is not None
+
+
+def _compare(op, actual, expected):
+    if op == 'in':
+        return any(actual == _coerce(item, actual) for item in expected)
+    if op == 'is':
+        return actual is None if expected in (None, 'null') else actual == _coerce(expected, True)
+    if op in ('like', 'ilike'):
+        return _pattern_matches(actual, expected, op == 'ilike')
+    expected = _coerce(expected, actual)
+    if op == 'eq':
+        return actual == expected
+    if op == 'neq':
+        return actual != expected
+    if actual is None or expected is None:
+        return False
+    if op == 'lt':
+        return actual < expected
+    if op == 'lte':
+        return actual <= expected
+    if op == 'gt':
+        return actual > expected
+    if op == 'gte':
+        return actual >= expected
+    raise _error(f'unknown operator "{op}"', 'PGRST100')
+
+
+def _timed(client, table, operation, filters, run):
+    """Run one fake request, reporting it to the instrumentation like a real HTTP call."""
+    started = time.perf_counter()
+    response = None
+    try:
+        client.round_trip()
+        response = run()
+        return response
+    finally:
+        rows = len(response.data) if response is not None else None
+        # Serialising the rows is only worth it when a request is being measured
+        size = len(json.dumps(response.data, default=str)) if response is not None and is_recording() else None
+        record_call(table, operation, filters, rows, size, time.perf_counter() - started)
+
+
+class FakeTable:
+    """Rows of one table plus the set of columns that may be filtered or written."""
+
+    def __init__(self, name, columns, unique=(), defaults=None):
+        self.name = name
+        self.columns = set(columns)
+        self.unique = list(unique)
+        self.defaults = {column: value for column, value in (defaults or {}).items() if column in self.columns}
+        self.rows = []
+        self._ids = itertools.count(1)
+
+    def check_column(self, column):
+        if column not in self.columns:
+            raise _error(f'column {self.name}.{column} does not exist', '42703')
+
+    def check_unique(self, row, values):
+        """Raise a unique violation if writing `values` to `row` would duplicate another row."""
+        for column in self.unique:
+            value = values.get(column)
+            if value is not None and any(other is not row and other.get(column) == value for other in self.rows):
+                raise _error(
+                    f'duplicate key value violates unique constraint "{self.name}_{column}_key"', '23505',
+                    f'Key ({column})=({value}) already exists.',
+                )
+
+    def insert(self, record):
+        for column in record:
+            self.check_column(column)
+        row = {column: None for column in self.columns}
+        row.update(self.defaults)
+        row.update(record)
+        self.check_unique(row, row)
+        if 'id' in self.columns and row.get('id') is None:
+            row['id'] = next(self._ids)
+        elif isinstance(row.get('id'), int):
+            # Keep generated ids ahead of explicitly supplied ones
+            self._ids = itertools.count(max(row['id'] + 1, next(self._ids)))
+        if 'created_at' in self.columns and row.get('created_at') is None:
+            row['created_at'] = datetime.now().isoformat()
+        self.rows.append(row)
+        return row
+
+
+class FakeQuery:
+    """Chainable query builder; execute() runs it against the in-memory tables."""
+
+    def __init__(self, client, table_name, source=None, function_name=None):
+        self._client = client
+        self._table_name = table_name
+        # Set for set-returning RPCs: a callable producing the rows to query instead of the table's
+        self._source = source
+        self._function_name = function_name
+        self._action = 'select'
+        self._columns = '*'
+        self._payload = None
+        self._count = None
+        self._head = False
+        self._filters = []
+        self._filter_text = []
+        # Columns of the top-level filters, checked even when no row is tested
+        self._filter_columns = []
+        self._order = []
+        self._offset = 0
+        self._limit = None
+
+    # Actions
+
+    def select(self, columns='*', count=None, head=False):
+        self._action, self._columns, self._count, self._head = 'select', columns, count, head
+        return self
+
+    def insert(self, data, **kwargs):
+        self._action, self._payload = 'insert', data
+        return self
+
+    def update(self, data, **kwargs):
+        self._action, self._payload = 'update', data
+        return self
+
+    def delete(self, **kwargs):
+        self._action = 'delete'
+        return self
+
+    # Filters
+
+    def _filter(self, column, op, value, negate=False):
+        self._filter_text.append(f"{column}={'not.' if negate else ''}{op}.{value}")
+        self._filter_columns.append(column)
+        self._filters.append(lambda table, row: self._test(table, row, column, op, value, negate))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, 'eq', value)
+
+    def neq(self, column, value):
+        return self._filter(column, 'neq', value)
+
+    def gt(self, column, value):
+        return self._filter(column, 'gt', value)
+
+    def gte(self, column, value):
+        return self._filter(column, 'gte', value)
+
+    def lt(self, column, value):
+        return self._filter(column, 'lt', value)
+
+    def lte(self, column, value):
+        return self._filter(column, 'lte', value)
+
+    def like(self, column, pattern):
+        return self._filter(column, 'like', pattern)
+
+    def ilike(self, column, pattern):
+        return self._filter(column, 'ilike', pattern)
+
+    def is_(self, column, value):
+        return self._filter(column, 'is', value)
+
+    def in_(self, column, values):
+        return self._filter(column, 'in', list(values))
+
+    def or_(self, filters, reference_table=None):
+        conditions = [self._parse_condition(part) for part in _split_top_level(filters)]
+        self._filter_text.append(f"or=({filters})")
+        self._filters.append(lambda table, row: any(condition(table, row) for condition in conditions))
+        return self
+
+    # Modifiers
+
+    def order(self, column, desc=False, nullsfirst=None, foreign_table=None):
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size, foreign_table=None):
+        self._limit = size
+        return self
+
+    def range(self, start, end, foreign_table=None):
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    # Execution
+
+    def execute(self):
+        if self._function_name:
+            return _timed(self._client, self._function_name, 'rpc', '&'.join(self._filter_text), self._run)
+        operation = 'count' if self._head else self._action
+        return _timed(self._client, self._table_name, operation, '&'.join(self._filter_text), self._run)
+
+    def _run(self):
+        with self._client.lock:
+            table = self._client.get_table(self._table_name)
+            if not self._source:
+                for column in self._filter_columns:
+                    table.check_column(column)
+            rows = self._source() if self._source else table.rows
+            matches = [row for row in rows if all(test(table, row) for test in self._filters)]
+            if self._action == 'select':
+                return self._select(table, matches)
+            if self._action == 'insert':
+                records = self._payload if isinstance(self._payload, list) else [self._payload]
+                inserted = [table.insert(record) for record in records]
+                self._client.bump_post_counters(table.name, inserted, 1)
+                return FakeResponse(copy.deepcopy(inserted))
+            if self._action == 'update':
+                for column in self._payload:
+                    table.check_column(column)
+                for row in matches:
+                    table.check_unique(row, self._payload)
+                self._client.bump_post_counters(table.name, matches, -1)
+                for row in matches:
+                    row.update(copy.deepcopy(self._payload))
+                self._client.bump_post_counters(table.name, matches, 1)
+                return FakeResponse(copy.deepcopy(matches))
+            deleted = {id(row) for row in matches}
+            table.rows = [row for row in table.rows if id(row) not in deleted]
+            self._client.bump_post_counters(table.name, matches, -1)
+            return FakeResponse(copy.deepcopy(matches))
+
+    def _select(self, table, matches):
+        # Like PostgREST, unknown columns fail the request even when no row matches
+        self._check_columns(table)
+        for column, desc in reversed(self._order):
+            table.check_column(column)
+            # Postgres puts NULLs last in ascending order and first in descending order
+            matches.sort(key=lambda row: (row[column] is None, row[column] if row[column] is not None else 0),
+                         reverse=desc)
+        total = len(matches) if self._count else None
+        end = None if self._limit is None else self._offset + self._limit
+        page = matches[self._offset:end]
+        if self._head:
+            return FakeResponse([], total)
+        return FakeResponse([self._project(table, row) for row in page], total)
+
+    def _project(self, table, row):
+        result = {}
+        for item in _split_top_level(self._columns):
+            embed = re.match(r'^(\w+)\((.*)\)$', item)
+            if embed:
+                result[embed.group(1)] = self._embed(table, row, embed.group(1), embed.group(2))
+            elif item == '*':
+                result.update(copy.deepcopy(row))
+            else:
+                table.check_column(item)
+                result[item] = copy.deepcopy(row[item])
+        return result
+
+    def _check_columns(self, table):
+        for item in _split_top_level(self._columns):
+            embed = re.match(r'^(\w+)\((.*)\)$', item)
+            if embed:
+                self._relationship(table, embed.group(1))
+            elif item != '*':
+                table.check_column(item)
+
+    def _relationship(self, parent, name):
+        """(child table, foreign key column) for embedding `name` under `parent`."""
+        # Relationships follow the app's naming: posts.student_id -> students.id
+        child = self._client.get_table(name)
+        foreign_key = parent.name[:-1] + '_id' if parent.name.endswith('s') else parent.name + '_id'
+        if foreign_key not in child.columns:
+            raise _error(f"Could not find a relationship between '{parent.name}' and '{name}'", 'PGRST200')
+        return child, foreign_key
+
+    def _embed(self, parent, row, name, columns):
+        child, foreign_key = self._relationship(parent, name)
+        related = [child_row for child_row in child.rows if child_row[foreign_key] == row.get('id')]
+        if columns.strip() == 'count':
+            return [{'count': len(related)}]
+        wanted = [column.strip() for column in columns.split(',')]
+        if '*' in wanted:
+            return copy.deepcopy(related)
+        for column in wanted:
+            child.check_column(column)
+        return [{column: copy.deepcopy(child_row[column]) for column in wanted} for child_row in related]
+
+    def _test(self, table, row, column, op, value, negate=False):
+        table.check_column(column)
+        result = _compare(op, row[column], value)
+        return not result if negate else result
+
+    def _parse_condition(self, text):
+        """Parse one PostgREST logic-tree condition, e.g. 'title.ilike.%x%' or 'and(a.eq.1,b.lt.2)'."""
+        group = re.match(r'^(and|or)\((.*)\)$', text, re.S)
+        if group:
+            combine = all if group.group(1) == 'and' else any
+            conditions = [self._parse_condition(part) for part in _split_top_level(group.group(2))]
+            return lambda table, row: combine(condition(table, row) for condition in conditions)
+
+        match = _FILTER_RE.match(text)
+        if not match:
+            raise _error(f'failed to parse logic tree ({text})', 'PGRST100')
+        column, op, value = match.group('column'), match.group('op'), match.group('value')
+        negate = bool(match.group('negate'))
+        if op == 'in':
+            value = [_unquote(item) for item in _split_top_level(value.strip('()'))]
+        else:
+            value = _unquote(value)
+        return lambda table, row: self._test(table, row, column, op, value, negate)
+
+
+class FakeBucket:
+    def __init__(self, storage, bucket):
+        self._storage = storage
+        self._bucket = bucket
+
+    def upload(self, path, file, file_options=None):
+        data = file.read() if hasattr(file, 'read') else file
+        upsert = str((file_options or {}).get('upsert', 'false')).lower() == 'true'
+        with self._storage.lock:
+            objects = self._storage.objects.setdefault(self._bucket, {})
+            if path in objects and not upsert:
+                raise Exception('The resource already exists')
+            objects[path] = bytes(data)
+        return {'Key': f"{self._bucket}/{path}"}
+
+    def download(self, path):
+        try:
+            return self._storage.objects[self._bucket][path]
+        except KeyError:
+            raise Exception('Object not found')
+
+    def remove(self, paths):
+        with self._storage.lock:
+            objects = self._storage.objects.get(self._bucket, {})
+            return [{'name': path} for path in paths if objects.pop(path, None) is not None]
+
+    def exists(self, path):
+        return path in self._storage.objects.get(self._bucket, {})
+
+    def get_public_url(self, path, options=None):
+        return f"{self._storage.url}/storage/v1/object/public/{self._bucket}/{path}"
+
+
+class FakeStorage:
+    def __init__(self, url):
+        self.url = url
+        self.objects = {}
+        self.lock = threading.Lock()
+
+    def from_(self, bucket):
+        return FakeBucket(self, bucket)
+
+
+def _similarity(needle, value):
+    # Stands in for pg_trgm's similarity()
+    return difflib.SequenceMatcher(None, needle, (value or '').lower()).ratio()
+
+
+def _search_students(client, search):
+    """Python version of the search_students SQL function (supabase/migrations)."""
+    needle = search.lower()
+    columns = ('username', 'email', 'full_name')
+    rows = [row for row in client.get_table('students').rows
+            if any(needle in (row.get(column) or '').lower() for column in columns)]
+    rows.sort(key=lambda row: row.get('created_at') or '', reverse=True)
+    rows.sort(key=lambda row: max(_similarity(needle, row.get(column)) for column in columns), reverse=True)
+    return rows
+
+
+def _search_wellness_resources(client, search, resource_type=None):
+    """Python version of the search_wellness_resources SQL function (supabase/migrations)."""
+    needle = search.lower()
+    terms = re.findall(r'\w+', needle)
+
+    def rank(row):
+        name, description = (row.get('name') or '').lower(), (row.get('description') or '').lower()
+        return sum(2 * (term in name) + (term in description) for term in terms)
+
+    rows = [row for row in client.get_table('wellness_resources').rows
+            if (resource_type is None or row.get('type') == resource_type)
+            and (needle in (row.get('name') or '').lower()
+                 or (terms and all(term in f"{row.get('name') or ''} {row.get('description') or ''}".lower() for term in terms)))]
+    rows.sort(key=lambda row: row.get('created_at') or '', reverse=True)
+    rows.sort(key=lambda row: (rank(row), _similarity(needle, row.get('name'))), reverse=True)
+    return rows
+
+
+def _reconcile_post_counts(client):
+    """Python version of the reconcile_post_counts SQL function (supabase/migrations)."""
+    fixed = []
+    for child, (parent_name, column) in POST_COUNTERS.items():
+        parent, rows = client.tables.get(parent_name), client.tables.get(child)
+        if parent is None or rows is None or column not in parent.columns:
+            continue
+        counts = {}
+        for row in rows.rows:
+            counts[str(row.get('post_id'))] = counts.get(str(row.get('post_id')), 0) + 1
+        for post in parent.rows:
+            actual = counts.get(str(post['id']), 0)
+            if post[column] != actual:
+                post[column] = actual
+                fixed.append(post)
+    # One row per corrected post, like the SQL function's RETURNING
+    unique = {id(post): post for post in fixed}.values()
+    return [{'id': post['id'], 'like_count': post.get('like_count'), 'comment_count': post.get('comment_count')}
+            for post in unique]
+
+
+# Database functions the app calls through rpc(): name -> (function, table it returns rows of)
+DEFAULT_FUNCTIONS = {
+    "search_students": (_search_students, "students"),
+    "search_wellness_resources": (_search_wellness_resources, "wellness_resources"),
+    "reconcile_post_counts": (_reconcile_post_counts, None),
+}
+
+
+class FakeSupabase:
+    """Drop-in replacement for supabase.Client backed by in-memory tables.
+
+    `latency` (seconds) is slept on every request to stand in for the network round
+    trip; `calls` counts executed requests.
+    """
+
+    def __init__(self, schema=DEFAULT_SCHEMA, url="http://supabase.local", latency=0.0):
+        self.lock = threading.RLock()
+        self.latency = latency
+        self.calls = 0
+        self.tables = {
+            name: FakeTable(name, columns, UNIQUE_COLUMNS.get(name, ()), COLUMN_DEFAULTS.get(name))
+            for name, columns in schema.items()
+        }
+        self.storage = FakeStorage(url)
+        self.functions = {}
+        for name, (function, returns) in DEFAULT_FUNCTIONS.items():
+            self.register_rpc(name, function, returns)
+
+    def round_trip(self):
+        with self.lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_table(self, name):
+        try:
+            return self.tables[name]
+        except KeyError:
+            raise _error(f"Could not find the table 'public.{name}' in the schema cache", 'PGRST205')
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    from_ = table
+
+    def register_rpc(self, name, function, returns=None):
+        """Make `function(client, **params)` callable through rpc(name, params).
+
+        With `returns` set to a table name the function is set-returning: it returns
+        rows of that table, and the call can be chained with select/filters/order/range
+        and count like a table query.
+        """
+        self.functions[name] = (function, returns)
+
+    def rpc(self, name, params=None, count=None, head=False, get=False):
+        if name not in self.functions:
+            raise _error(f"Could not find the function public.{name}", 'PGRST202')
+        function, returns = self.functions[name]
+        params = params or {}
+        if returns is None:
+            return _RpcCall(self, name, function, params)
+        query = FakeQuery(self, returns, source=lambda: function(self, **params), function_name=name)
+        return query.select('*', count=count, head=head)
+
+    def seed(self, table, rows):
+        """Bulk insert rows without going through the query builder; returns the stored rows."""
+        with self.lock:
+            target = self.get_table(table)
+            inserted = [target.insert(dict(row)) for row in rows]
+            self.bump_post_counters(table, inserted, 1)
+            return inserted
+
+    def bump_post_counters(self, table, rows, delta):
+        """What the post_counters triggers do when `rows` are added to (or removed from) `table`."""
+        parent_name, column = POST_COUNTERS.get(table, (None, None))
+        parent = self.tables.get(parent_name)
+        if parent is None or column not in parent.columns:
+            return
+        for row in rows:
+            post_id = row.get('post_id')
+            if post_id is None:
+                continue
+            for post in parent.rows:
+                if str(post.get('id')) == str(post_id):
+                    post[column] = max((post[column] or 0) + delta, 0)
+
+
+class _RpcCall:
+    def __init__(self, client, name, function, params):
+        self._client = client
+        self._name = name
+        self._function = function
+        self._params = params
+
+    def execute(self):
+        return _timed(self._client, self._name, 'rpc', json.dumps(self._params, default=str), self._run)
+
+    def _run(self):
+        with self._client.lock:
+            return FakeResponse(self._function(self._client, **self._params))
+
+
+class AsyncFakeSupabase:
+    """Async view onto a FakeSupabase, for the ASGI views; shares the sync fake's data."""
+
+    def __init__(self, fake):
+        self._fake = fake
+        self.storage = fake.storage
+
+    def table(self, name):
+        return _AsyncQuery(self._fake.table(name))
+
+    def rpc(self, name, params=None, count=None, head=False, get=False):
+        return _AsyncQuery(self._fake.rpc(name, params, count=count, head=head, get=get))
+
+
+class _AsyncQuery:
+    def __init__(self, query):
+        self._query = query
+
+    def __getattr__(self, name):
+        attribute = getattr(self._query, name)
+        if not callable(attribute):
+            return attribute
+
+        def chain(*args, **kwargs):
+            result = attribute(*args, **kwargs)
+            return self if result is self._query else result
+        return chain
+
+    async def execute(self):
+        return self._query.execute()
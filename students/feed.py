@@ -0,0 +1,163 @@
+# Cursor handling and formatting shared by the sync (views.py) and async
+# (views_async.py) community feed endpoints. Nothing here performs I/O; the
+# queries themselves are built by students/repository.py.
+import base64
+import json
+from django.utils.dateparse import parse_datetime
+from .images import avatar_urls
+
+POSTS_PAGE_SIZE = 20
+POSTS_MAX_PAGE_SIZE = 50
+LIKE_STATES_MAX_POSTS = 100
+
+
+def encode_post_cursor(post):
+    """Encode the (created_at, id) keyset of the last post on a page."""
+    payload = json.dumps({'created_at': post.get('created_at'), 'id': post.get('id')})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_post_cursor(cursor):
+    """Decode a cursor produced by encode_post_cursor, or raise ValueError."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        created_at, post_id = payload['created_at'], payload['id']
+    except Exception:
+        raise ValueError('Invalid cursor')
+    # Both end up in filters, so only an ISO timestamp and an integer id are accepted
+    if not isinstance(created_at, str) or not isinstance(post_id, int) or isinstance(post_id, bool):
+        raise ValueError('Invalid cursor')
+    if parse_datetime(created_at) is None:
+        raise ValueError('Invalid cursor')
+    return created_at, post_id
+
+
+def parse_page_size(value, default=POSTS_PAGE_SIZE, maximum=POSTS_MAX_PAGE_SIZE):
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, maximum))
+
+
+def parse_id_list(value):
+    """Split a comma separated ?ids= parameter into unique integer ids, in order.
+
+    Raises ValueError for anything that is not an integer.
+    """
+    ids = [int(item) for item in (value or '').split(',') if item.strip()]
+    return list(dict.fromkeys(ids))
+
+
+def author_ids(posts):
+    """Unique student ids of the non-anonymous posts."""
+    return list({post['student_id'] for post in posts if post.get('student_id') and not post.get('is_anonymous', True)})
+
+
+def author_name_map(students):
+    return {student['id']: student.get('full_name') or student.get('username', 'Unknown') for student in students}
+
+
+def tally_comment_counts(comments):
+    counts = {}
+    for comment in comments:
+        post_id = comment.get('post_id')
+        if post_id:
+            counts[post_id] = counts.get(post_id, 0) + 1
+    return counts
+
+
+def tally_like_states(post_ids, likes, student_id=None):
+    """Build {str(post_id): {'count', 'is_liked'}} from (post_id, student_id) like rows."""
+    states = {str(post_id): {'count': 0, 'is_liked': False} for post_id in post_ids}
+    for like in likes:
+        state = states.get(str(like.get('post_id')))
+        if state is None:
+            continue
+        state['count'] += 1
+        if student_id and like.get('student_id') == student_id:
+            state['is_liked'] = True
+    return states
+
+
+def stored_comment_counts(posts):
+    """Comment counts from the comment_count column of post rows (Schema.post_counters)."""
+    return {post['id']: post.get('comment_count') or 0 for post in posts if post.get('id')}
+
+
+def stored_like_states(post_ids, posts, liked_post_ids=()):
+    """Like states from the like_count column of post rows, shaped like tally_like_states()."""
+    liked = {str(post_id) for post_id in liked_post_ids}
+    states = {str(post_id): {'count': 0, 'is_liked': False} for post_id in post_ids}
+    for post in posts:
+        state = states.get(str(post.get('id')))
+        if state is not None:
+            state['count'] = post.get('like_count') or 0
+            state['is_liked'] = str(post['id']) in liked
+    return states
+
+
+def format_feed_post(post, author_names, comment_counts, like_states):
+    post_data = post.copy()
+    post_status = post.get('status') or ('approved' if post.get('approved') else 'pending')
+    post_data['status'] = post_status
+    post_data['approved'] = post_status == 'approved'
+    if not post.get('is_anonymous', True) and post.get('student_id'):
+        post_data['author_name'] = author_names.get(post['student_id'], 'Unknown')
+    else:
+        post_data['is_anonymous'] = True
+
+    post_id = post.get('id')
+    post_data['comments_count'] = comment_counts.get(post_id, 0)
+    like_state = like_states.get(str(post_id), {'count': 0, 'is_liked': False})
+    post_data['like_count'] = like_state['count']
+    post_data['is_liked'] = like_state['is_liked']
+    return post_data
+
+
+def attach_comment_authors(comments, students):
+    """Add a 'student' dict (username, full_name and avatar URLs) to each comment.
+
+    Comment avatars are small, so they point at a list-size rendition of the picture.
+    """
+    student_map = {
+        student['id']: {
+            'username': student.get('username', 'Unknown'),
+            'full_name': student.get('full_name', ''),
+            **avatar_urls(student.get('profile_picture_url', ''))
+        }
+        for student in students
+    }
+    for comment in comments:
+        comment['student'] = student_map.get(comment.get('student_id'), {
+            'username': 'Unknown',
+            'full_name': '',
+            'profile_picture_url': '',
+            'profile_picture_webp_url': None
+        })
+    return comments
+
+
+def format_admin_user(user):
+    """Strip the password hash and point the avatar at a list-size rendition."""
+    user.pop('password', None)
+    user.update(avatar_urls(user.get('profile_picture_url')))
+    return user
+
+
+def format_admin_posts(posts, students):
+    """Normalise status/approved and attach a 'student' summary to each admin post."""
+    student_map = {
+        student['id']: {
+            'username': student.get('username', 'Unknown'),
+            'full_name': student.get('full_name', ''),
+            'id': student['id']
+        }
+        for student in students
+    }
+    for post in posts:
+        post_status = post.get('status') or ('approved' if post.get('approved') else 'pending')
+        post['status'] = post_status
+        post['approved'] = post_status == 'approved'
+        post['student'] = student_map.get(post.get('student_id'))
+    return posts
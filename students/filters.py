@@ -0,0 +1,21 @@
+# Helpers for building PostgREST filter strings from user input.
+# Values placed inside or_() / and() logic trees are parsed by PostgREST, so commas,
+# parentheses, dots and quotes in them must be quoted or they change the filter.
+
+
+def quote_value(value):
+    """Double-quote a value for use inside a PostgREST logic tree."""
+    escaped = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def like_pattern(text):
+    """A %text% ILIKE pattern in which %, _ and \\ from the input match literally."""
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def ilike_any(columns, text):
+    """or_() filter matching `text` as a substring of any of `columns`."""
+    value = quote_value(like_pattern(text))
+    return ",".join(f"{column}.ilike.{value}" for column in columns)
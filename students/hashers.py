@@ -0,0 +1,16 @@
+# Password hashers whose cost comes from settings, so it can be tuned per deployment
+# (see `manage.py calibrate_password_hasher`). They keep Django's algorithm names,
+# so existing hashes verify unchanged and hashes made with other parameters are
+# reported as needing an update.
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    time_cost = getattr(settings, 'ARGON2_TIME_COST', Argon2PasswordHasher.time_cost)
+    memory_cost = getattr(settings, 'ARGON2_MEMORY_COST', Argon2PasswordHasher.memory_cost)
+    parallelism = getattr(settings, 'ARGON2_PARALLELISM', Argon2PasswordHasher.parallelism)
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = getattr(settings, 'PBKDF2_ITERATIONS', PBKDF2PasswordHasher.iterations)
@@ -0,0 +1,123 @@
+# Image work for uploaded profile pictures. Kept free of Django and Supabase imports:
+# render_profile_picture() runs inside the media process pool (see media.py), whose
+# workers only need to import this module.
+#
+# Every picture is stored as a set of renditions under the SHA-256 of the uploaded
+# bytes, profile_pics/<hash>/<size>.<ext>, so identical uploads share one set of
+# files and a rendition's URL can be derived from the stored profile_picture_url.
+import re
+from io import BytesIO
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Largest first; the largest JPEG is what students.profile_picture_url points at
+AVATAR_SIZES = (400, 96, 48)
+# (extension, PIL format, content type, save options); JPEG is the fallback for
+# clients without WebP support
+AVATAR_FORMATS = (
+    ('webp', 'WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    ('jpg', 'JPEG', 'image/jpeg', {'quality': 85, 'optimize': True}),
+)
+# Rendition size the JSON APIs hand out for the small avatars next to comments and
+# users (shown at 36-48 CSS px, so 96 px stays sharp on high-density screens)
+LIST_AVATAR_SIZE = 96
+
+# Formats accepted for profile pictures, as reported by PIL from the file header
+PROFILE_PICTURE_FORMATS = {'JPEG', 'PNG', 'WEBP', 'GIF'}
+
+_RENDITION_RE = re.compile(r'^(?P<base>.*/profile_pics/[0-9a-f]{64}/)\d+\.(?:jpg|webp)$')
+
+
+class UnsupportedImage(ValueError):
+    """An upload that is not an image we accept, or is too large to decode safely."""
+
+
+def inspect_image(file, max_pixels):
+    """Check an image from its header alone; returns (format, width, height).
+
+    Only the first few KiB are read, so an oversized image (a decompression bomb
+    can claim 100k x 100k pixels in a few KiB of PNG) is rejected before any pixel
+    data is decoded. Returns None when PIL is not installed.
+    """
+    if Image is None:
+        return None
+    try:
+        with Image.open(file) as img:
+            image_format, (width, height) = img.format, img.size
+    except Image.DecompressionBombError:
+        raise UnsupportedImage("Image dimensions are too large.")
+    except Exception:
+        raise UnsupportedImage("Invalid file type. Please upload an image.")
+    finally:
+        if hasattr(file, 'seek'):
+            file.seek(0)
+    if image_format not in PROFILE_PICTURE_FORMATS:
+        raise UnsupportedImage("Unsupported image format. Please upload a JPEG, PNG, WebP or GIF image.")
+    if width * height > max_pixels:
+        raise UnsupportedImage("Image dimensions are too large.")
+    return image_format, width, height
+
+
+def rendition_path(digest, size, extension='jpg'):
+    return f"profile_pics/{digest}/{size}.{extension}"
+
+
+def rendition_url(url, size, extension='jpg'):
+    """URL of another rendition of a stored profile picture.
+
+    URLs that do not follow the rendition layout (pictures uploaded before it, or
+    stored without PIL) are returned unchanged.
+    """
+    match = _RENDITION_RE.match(url or '')
+    if not match:
+        return url
+    return f"{match.group('base')}{size}.{extension}"
+
+
+def avatar_urls(url, size=LIST_AVATAR_SIZE):
+    """{'profile_picture_url', 'profile_picture_webp_url'} for showing a picture at `size`."""
+    if not _RENDITION_RE.match(url or ''):
+        return {'profile_picture_url': url, 'profile_picture_webp_url': None}
+    return {
+        'profile_picture_url': rendition_url(url, size),
+        'profile_picture_webp_url': rendition_url(url, size, 'webp'),
+    }
+
+
+def render_profile_picture(path, max_pixels):
+    """Return [(size, extension, content_type, bytes)] for every rendition of the image at `path`.
+
+    The file is decoded straight from disk and JPEGs are downscaled by the decoder
+    itself, so memory use follows the target size rather than the upload's. Returns
+    an empty list without PIL, or for images PIL cannot decode, in which case the
+    caller stores the original upload.
+    """
+    if Image is None:
+        return []
+    with Image.open(path) as original:
+        # The header was checked in the request; check again in case the file was swapped
+        if original.width * original.height > max_pixels:
+            raise UnsupportedImage("Image dimensions are too large.")
+        try:
+            # Lets the JPEG decoder downscale while decoding (1/2, 1/4 or 1/8 scale);
+            # thumbnail() then box-reduces other formats before resampling
+            original.draft('RGB', (AVATAR_SIZES[0], AVATAR_SIZES[0]))
+            img = original.convert('RGB') if original.mode != 'RGB' else original
+            return _renditions(img)
+        except Exception:
+            return []
+
+
+def _renditions(img):
+    renditions = []
+    for size in AVATAR_SIZES:
+        # Each size is scaled down from the previous one rather than the original
+        img.thumbnail((size, size), Image.Resampling.LANCZOS)
+        for extension, image_format, content_type, options in AVATAR_FORMATS:
+            output = BytesIO()
+            img.save(output, format=image_format, **options)
+            renditions.append((size, extension, content_type, output.getvalue()))
+    return renditions
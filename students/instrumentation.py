@@ -0,0 +1,167 @@
+# Per-request accounting of Supabase calls.
+# Every PostgREST/Storage request made while a request is being recorded (see
+# SupabaseTimingMiddleware) is appended to a list held in a ContextVar, so calls
+# made from parallel.run_parallel workers and asyncio tasks count towards the
+# request that started them. The HTTP transport records real calls; the in-memory
+# fake records its own.
+import contextvars
+import logging
+import time
+from urllib.parse import unquote
+import httpx
+from django.conf import settings
+
+logger = logging.getLogger('students.supabase')
+
+SUPABASE_SLOW_QUERY_MS = getattr(settings, 'SUPABASE_SLOW_QUERY_MS', 300)
+
+_calls = contextvars.ContextVar('supabase_calls', default=None)
+
+_OPERATIONS = {'GET': 'select', 'HEAD': 'count', 'POST': 'insert', 'PATCH': 'update', 'PUT': 'upsert', 'DELETE': 'delete'}
+
+
+def start_recording():
+    """Begin collecting calls for the current request; returns a token for stop_recording."""
+    return _calls.set([])
+
+
+def stop_recording(token):
+    calls = _calls.get() or []
+    _calls.reset(token)
+    return calls
+
+
+def is_recording():
+    return _calls.get() is not None
+
+
+def record_call(table, operation, filters, rows, size, duration):
+    """Store one call on the current request and log it when it is slow."""
+    duration_ms = duration * 1000
+    if duration_ms >= SUPABASE_SLOW_QUERY_MS:
+        logger.warning(
+            "slow supabase call table=%s op=%s duration_ms=%.1f rows=%s bytes=%s filters=%s",
+            table, operation, duration_ms, rows, size, filters[:200],
+        )
+    calls = _calls.get()
+    if calls is not None:
+        calls.append({
+            'table': table,
+            'operation': operation,
+            'filters': filters,
+            'rows': rows,
+            'bytes': size,
+            'duration_ms': duration_ms,
+        })
+
+
+def summarize(calls):
+    return {
+        'calls': len(calls),
+        'duration_ms': sum(call['duration_ms'] for call in calls),
+        'rows': sum(call['rows'] or 0 for call in calls),
+        'bytes': sum(call['bytes'] or 0 for call in calls),
+    }
+
+
+def _describe(request):
+    """(table, operation, filters) for a PostgREST or Storage request."""
+    path = request.url.path
+    operation = _OPERATIONS.get(request.method, request.method.lower())
+    if '/rest/v1/rpc/' in path:
+        table, operation = path.rsplit('/', 1)[-1], 'rpc'
+    elif '/rest/v1/' in path:
+        table = path.split('/rest/v1/', 1)[1]
+    elif '/storage/v1/' in path:
+        table, operation = 'storage', f"storage.{operation}"
+    else:
+        table = path
+    return table, operation, unquote(request.url.query.decode())
+
+
+def _row_count(response):
+    # PostgREST reports the returned range as e.g. "0-19/*" or "*/0"
+    content_range = response.headers.get('content-range', '')
+    first_last = content_range.split('/', 1)[0]
+    if first_last == '*':
+        return 0
+    if '-' in first_last:
+        first, last = first_last.split('-', 1)
+        try:
+            return int(last) - int(first) + 1
+        except ValueError:
+            return None
+    return None
+
+
+class _RecordingStream(httpx.SyncByteStream):
+    """Counts body bytes as they are read and records the call when the body is closed."""
+
+    def __init__(self, stream, finish):
+        self._stream = stream
+        self._finish = finish
+        self._size = 0
+
+    def __iter__(self):
+        for chunk in self._stream:
+            self._size += len(chunk)
+            yield chunk
+
+    def close(self):
+        self._stream.close()
+        self._finish(self._size)
+
+
+class _AsyncRecordingStream(httpx.AsyncByteStream):
+    def __init__(self, stream, finish):
+        self._stream = stream
+        self._finish = finish
+        self._size = 0
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._size += len(chunk)
+            yield chunk
+
+    async def aclose(self):
+        await self._stream.aclose()
+        self._finish(self._size)
+
+
+def _recorder(request, response, started):
+    table, operation, filters = _describe(request)
+    rows = _row_count(response)
+
+    def finish(size):
+        record_call(table, operation, filters, rows, size, time.perf_counter() - started)
+    return finish
+
+
+class InstrumentedTransport(httpx.BaseTransport):
+    """Time each Supabase HTTP call, including reading its body, and record it."""
+
+    def __init__(self, transport):
+        self._transport = transport
+
+    def handle_request(self, request):
+        started = time.perf_counter()
+        response = self._transport.handle_request(request)
+        response.stream = _RecordingStream(response.stream, _recorder(request, response, started))
+        return response
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncInstrumentedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport):
+        self._transport = transport
+
+    async def handle_async_request(self, request):
+        started = time.perf_counter()
+        response = await self._transport.handle_async_request(request)
+        response.stream = _AsyncRecordingStream(response.stream, _recorder(request, response, started))
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
@@ -0,0 +1,71 @@
+# Journal listing for the journal entries page. Pages are read newest (or oldest)
+# first with a (created_at, id) keyset, which the students_journal index on
+# (student_id, created_at, id) serves without sorting, and carry only a snippet
+# of each entry: the full content is fetched one entry at a time when opened.
+from django.db.models import Q
+from django.db.models.functions import Substr
+from django.utils.dateparse import parse_datetime
+from .feed import decode_post_cursor, encode_post_cursor
+from .models import Journal
+
+JOURNAL_PAGE_SIZE = 20
+JOURNAL_MAX_PAGE_SIZE = 100
+JOURNAL_SNIPPET_LENGTH = 200
+
+
+def journal_page(student, limit, cursor=None, oldest_first=False, query=''):
+    """Return (entries, next_cursor) for one page of a student's journal.
+
+    Raises ValueError for a malformed cursor.
+    """
+    journals = Journal.objects.filter(student_id=student)
+    if query:
+        journals = journals.filter(Q(title__icontains=query) | Q(content__icontains=query))
+    if cursor:
+        created_at, last_id = decode_journal_cursor(cursor)
+        if oldest_first:
+            after = Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=last_id)
+        else:
+            after = Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=last_id)
+        journals = journals.filter(after)
+
+    ordering = ('created_at', 'id') if oldest_first else ('-created_at', '-id')
+    # One character past the snippet tells us whether the entry was cut short
+    rows = list(
+        journals.order_by(*ordering)
+        .annotate(snippet=Substr('content', 1, JOURNAL_SNIPPET_LENGTH + 1))
+        .values('id', 'title', 'created_at', 'snippet')[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    entries = [format_journal_summary(row) for row in rows]
+    next_cursor = encode_post_cursor(entries[-1]) if has_more else None
+    return entries, next_cursor
+
+
+def decode_journal_cursor(cursor):
+    """Decode a journal page cursor to (created_at datetime, id), or raise ValueError."""
+    # decode_post_cursor has checked the types and the timestamp format
+    created_at, last_id = decode_post_cursor(cursor)
+    return parse_datetime(created_at), last_id
+
+
+def format_journal_summary(row):
+    snippet = row['snippet'] or ''
+    return {
+        'id': row['id'],
+        'title': row['title'] or 'Journal Entry',
+        'snippet': snippet[:JOURNAL_SNIPPET_LENGTH],
+        'truncated': len(snippet) > JOURNAL_SNIPPET_LENGTH,
+        'created_at': row['created_at'].isoformat() if row['created_at'] else '',
+    }
+
+
+def format_journal(journal):
+    return {
+        'id': journal.id,
+        'title': journal.title or 'Journal Entry',
+        'content': journal.content,
+        'created_at': journal.created_at.isoformat() if journal.created_at else '',
+    }
@@ -0,0 +1,66 @@
+# Logging plumbing referenced from settings.LOGGING.
+# Request threads only put records on a queue; a background listener thread does
+# the formatting and the (blocking) stream writes. Records below the configured
+# level are dropped by the logger before any of this runs, so disabled debug
+# calls cost one level check.
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any fields passed with `extra=`."""
+
+    def format(self, record):
+        payload = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        payload.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class QueueStreamHandler(logging.handlers.QueueHandler):
+    """A StreamHandler behind a queue, written to by a background thread.
+
+    The formatter configured for this handler is applied in the listener thread.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(queue.SimpleQueue())
+        self.target = logging.StreamHandler(stream)
+        self._start_listener()
+        atexit.register(self._stop_listener)
+        # The listener thread does not survive a fork (e.g. gunicorn --preload)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._start_listener)
+
+    def _start_listener(self):
+        self.listener = logging.handlers.QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+
+    def _stop_listener(self):
+        # Flushes whatever is still queued
+        self.listener.stop()
+
+    def setFormatter(self, fmt):
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Merge the arguments now, while they still hold their values at call time,
+        # but leave the formatter's work to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
@@ -0,0 +1,221 @@
+"""
+Benchmark the hot feed, admin and journal views against local data.
+
+    python manage.py benchmark_views --sizes 100,1000,10000 --requests 50 --latency-ms 20
+
+For each size a fresh in-memory Supabase (students/fake_supabase.py) is seeded with
+posts, students, comments and likes, journals are written to a throwaway test
+database, and every endpoint is requested through the Django test client. Reported
+per endpoint: p50/p95 latency, Supabase round trips and ORM queries per request,
+and the peak memory allocated while serving one request. --latency-ms adds a sleep
+to every Supabase call so the numbers reflect network-bound behaviour.
+"""
+import contextlib
+import json
+import logging
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from students.fake_supabase import FakeSupabase
+from students.models import Journal, Student
+from students.supabase_client import install_client
+
+ENDPOINTS = [
+    ('get_anonymous_posts', lambda data: reverse('api_get_posts')),
+    ('get_comments', lambda data: reverse('api_get_comments', args=[data['hot_post']])),
+    ('get_likes', lambda data: reverse('api_get_likes', args=[data['hot_post']])),
+    ('admin_get_users', lambda data: reverse('admin_get_users')),
+    ('admin_dashboard', lambda data: reverse('admin_dashboard')),
+    ('journal_entries_view', lambda data: reverse('journal_entries')),
+    ('get_journal_entries', lambda data: reverse('api_journal_entries')),
+]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def seed(fake, size, rng):
+    """Seed `size` posts and proportional students, comments, likes and journals."""
+    start = datetime(2025, 1, 1)
+    student_count = max(10, size // 5)
+    students = fake.seed("students", [
+        {
+            "username": f"admin{i}" if i == 0 else f"student{i}",
+            "email": f"student{i}@example.com",
+            "full_name": f"Student {i}",
+            "password": "!",
+            "is_admin": i == 0,
+            "created_at": (start + timedelta(minutes=i)).isoformat(),
+        }
+        for i in range(student_count)
+    ])
+    student_ids = [student['id'] for student in students]
+    fake.seed("admins", [{"student_id": student_ids[0]}])
+
+    posts = fake.seed("posts", [
+        {
+            "content": f"Post {i}",
+            "status": "approved" if i % 5 else "pending",
+            "approved": bool(i % 5),
+            "is_anonymous": i % 3 == 0,
+            "student_id": rng.choice(student_ids),
+            "created_at": (start + timedelta(seconds=30 * i)).isoformat(),
+        }
+        for i in range(size)
+    ])
+    post_ids = [post['id'] for post in posts]
+    # Skew activity towards recent posts, which is what the first feed page shows
+    weights = [i + 1 for i in range(len(post_ids))]
+    fake.seed("comments", [
+        {"post_id": post_id, "student_id": rng.choice(student_ids), "content": "Comment"}
+        for post_id in rng.choices(post_ids, weights, k=2 * size)
+    ])
+    fake.seed("likes", [
+        {"post_id": post_id, "student_id": rng.choice(student_ids)}
+        for post_id in rng.choices(post_ids, weights, k=4 * size)
+    ])
+    fake.seed("wellness_resources", [
+        {"name": f"Resource {i}", "type": "article", "description": "Guide"} for i in range(max(5, size // 100))
+    ])
+
+    # journal_entries_view reads the local Django models
+    viewer = students[0]
+    local_student = Student.objects.create(username=viewer['username'], email=viewer['email'], full_name=viewer['full_name'])
+    Journal.objects.bulk_create([
+        Journal(student_id=local_student, title=f"Entry {i}", content="Today I felt... " * 20)
+        for i in range(max(10, size // 10))
+    ])
+
+    # The newest approved post carries the most comments and likes
+    hot_post = next(post['id'] for post in reversed(posts) if post['status'] == 'approved')
+    return {'viewer': viewer, 'hot_post': hot_post}
+
+
+@contextlib.contextmanager
+def silence_views():
+    """Hide the views' per-request log lines while timing."""
+    logger = logging.getLogger('students')
+    level = logger.level
+    logger.setLevel(logging.ERROR)
+    try:
+        yield
+    finally:
+        logger.setLevel(level)
+
+
+class Command(BaseCommand):
+    help = "Benchmark the feed, admin and journal views against seeded local data"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100,1000,5000', help='Comma separated post counts to seed')
+        parser.add_argument('--requests', type=int, default=30, help='Timed requests per endpoint')
+        parser.add_argument('--latency-ms', type=float, default=0.0, help='Simulated Supabase round-trip time')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed for the generated data')
+        parser.add_argument('--json', dest='json_path', help='Also write the results to this file')
+        parser.add_argument('--verbose-views', action='store_true', help="Don't silence the views' log output below ERROR")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError('--sizes must be a comma separated list of integers')
+        if options['requests'] < 1:
+            raise CommandError('--requests must be at least 1')
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        results = []
+        try:
+            for size in sizes:
+                results.extend(self.run_size(size, options))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as handle:
+                json.dump(results, handle, indent=2)
+            self.stdout.write(f"Results written to {options['json_path']}")
+
+    def run_size(self, size, options):
+        fake = FakeSupabase(latency=options['latency_ms'] / 1000)
+        install_client(fake)
+        cache.clear()
+        Journal.objects.all().delete()
+        Student.objects.all().delete()
+        data = seed(fake, size, random.Random(options['seed']))
+
+        client = Client()
+        session = client.session
+        viewer = data['viewer']
+        session['student'] = {key: viewer[key] for key in ('id', 'username', 'email', 'full_name')}
+        session.save()
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"\n{size} posts, {len(fake.tables['students'].rows)} students, "
+            f"{len(fake.tables['comments'].rows)} comments, {len(fake.tables['likes'].rows)} likes"
+        ))
+        self.stdout.write(f"{'endpoint':<24}{'p50 ms':>10}{'p95 ms':>10}{'sb calls':>10}{'db queries':>12}{'peak KiB':>10}")
+
+        rows = []
+        quiet = contextlib.nullcontext() if options['verbose_views'] else silence_views()
+        with quiet:
+            for name, url_for in ENDPOINTS:
+                rows.append(self.measure(client, fake, name, url_for(data), options['requests']))
+                rows[-1]['size'] = size
+
+        for row in rows:
+            line = (
+                f"{row['endpoint']:<24}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}"
+                f"{row['supabase_calls']:>10.1f}{row['db_queries']:>12.1f}{row['peak_kib']:>10.0f}"
+            )
+            self.stdout.write(line if row['ok'] else self.style.ERROR(f"{line}  (status {row['status']})"))
+        return rows
+
+    def measure(self, client, fake, name, url, requests):
+        # Warm up caches (admin role, templates) the way a long-running worker would have
+        response = client.get(url)
+
+        timings = []
+        calls_before = fake.calls
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+        calls = (fake.calls - calls_before) / requests
+        # Read the captured queries now; the next request resets Django's query log
+        db_queries = len(queries) / requests
+
+        tracemalloc.start()
+        try:
+            client.get(url)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        ok = response.status_code < 400
+        if ok and response.get('Content-Type', '').startswith('application/json'):
+            ok = json.loads(response.content).get('success', True)
+        return {
+            'endpoint': name,
+            'p50_ms': statistics.median(timings),
+            'p95_ms': percentile(timings, 0.95),
+            'supabase_calls': calls,
+            'db_queries': db_queries,
+            'peak_kib': peak / 1024,
+            'status': response.status_code,
+            'ok': bool(ok),
+        }
@@ -0,0 +1,85 @@
+"""
+Pick password hasher costs for this machine.
+
+    python manage.py calibrate_password_hasher --target-ms 150
+
+Hashes a sample password with increasing cost until one hash takes about
+--target-ms, then prints the settings to put in the environment. Run it on the
+production hardware: a lower target leaves more CPU for login storms, a higher one
+makes stolen hashes more expensive to crack.
+"""
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher
+from django.core.management.base import BaseCommand, CommandError
+
+
+def time_hasher(hasher, samples):
+    """Median milliseconds to hash a password with `hasher`."""
+    timings = []
+    for _ in range(samples):
+        salt = hasher.salt()
+        started = time.perf_counter()
+        hasher.encode("calibration-password", salt)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = "Measure password hashing cost and recommend ARGON2_*/PBKDF2_ITERATIONS settings"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hasher', choices=['argon2', 'pbkdf2'], default=settings.PASSWORD_HASHER)
+        parser.add_argument('--target-ms', type=float, default=150.0, help='Desired time for one hash')
+        parser.add_argument('--samples', type=int, default=5, help='Hashes timed per candidate setting')
+        parser.add_argument('--memory-cost', type=int, default=settings.ARGON2_MEMORY_COST,
+                            help='Argon2 memory in KiB (kept fixed; time cost is calibrated)')
+        parser.add_argument('--parallelism', type=int, default=settings.ARGON2_PARALLELISM)
+
+    def handle(self, *args, **options):
+        if options['target_ms'] <= 0 or options['samples'] < 1:
+            raise CommandError('--target-ms and --samples must be positive')
+        if options['hasher'] == 'argon2':
+            self.calibrate_argon2(options)
+        else:
+            self.calibrate_pbkdf2(options)
+
+    def calibrate_argon2(self, options):
+        if not settings.ARGON2_AVAILABLE:
+            raise CommandError('argon2-cffi is not installed')
+
+        hasher = Argon2PasswordHasher()
+        hasher.memory_cost = options['memory_cost']
+        hasher.parallelism = options['parallelism']
+        chosen = 1
+        for time_cost in range(1, 17):
+            hasher.time_cost = time_cost
+            elapsed = time_hasher(hasher, options['samples'])
+            self.stdout.write(f"argon2 time_cost={time_cost} memory_cost={hasher.memory_cost} "
+                              f"parallelism={hasher.parallelism}: {elapsed:.1f} ms")
+            if elapsed > options['target_ms']:
+                if time_cost == 1:
+                    self.stdout.write(self.style.WARNING(
+                        "The minimum time cost is already over the target; lower --memory-cost to go faster."
+                    ))
+                break
+            chosen = time_cost
+
+        self.stdout.write(self.style.SUCCESS("\nRecommended settings:"))
+        self.stdout.write(f"PASSWORD_HASHER=argon2\nARGON2_TIME_COST={chosen}\n"
+                          f"ARGON2_MEMORY_COST={hasher.memory_cost}\nARGON2_PARALLELISM={hasher.parallelism}")
+
+    def calibrate_pbkdf2(self, options):
+        hasher = PBKDF2PasswordHasher()
+        # PBKDF2 cost is linear in the iteration count, so measure once and scale
+        hasher.iterations = 100_000
+        elapsed = time_hasher(hasher, options['samples'])
+        iterations = max(100_000, int(hasher.iterations * options['target_ms'] / elapsed) // 10_000 * 10_000)
+        hasher.iterations = iterations
+        elapsed = time_hasher(hasher, options['samples'])
+        self.stdout.write(f"pbkdf2_sha256 iterations={iterations}: {elapsed:.1f} ms")
+
+        self.stdout.write(self.style.SUCCESS("\nRecommended settings:"))
+        self.stdout.write(f"PASSWORD_HASHER=pbkdf2\nPBKDF2_ITERATIONS={iterations}")
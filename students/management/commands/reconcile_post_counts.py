@@ -0,0 +1,59 @@
+"""
+Repair drift in the stored like and comment counts of posts.
+
+    python manage.py reconcile_post_counts
+
+The counts (posts.like_count and posts.comment_count) are kept current by
+triggers from supabase/migrations/*_post_counters.sql; this recounts every post
+through the reconcile_post_counts() function from the same migration and lists
+the posts whose counts were wrong. The function is only granted to the service
+role, so SUPABASE_KEY must be the service role key.
+
+The migration only supports the current posts/likes/comments tables; projects
+still on the legacy anonymous_posts tables have no stored counts to repair.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from postgrest.exceptions import APIError
+
+from students.repository import Repository, refresh_schema
+from students.supabase_client import get_supabase_client
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the likes and comments of every post and fix stored counts that drifted. "
+        "Only for the posts/likes/comments schema, where supabase/migrations/*_post_counters.sql applies."
+    )
+
+    def handle(self, *args, **options):
+        try:
+            schema = refresh_schema()
+        except Exception as e:
+            raise CommandError(f"Could not probe the Supabase schema: {e}")
+        if not schema.post_counters:
+            raise CommandError(
+                f"{schema.posts} has no like_count/comment_count columns; "
+                "apply supabase/migrations/*_post_counters.sql first"
+            )
+
+        try:
+            response = Repository(get_supabase_client(), schema).reconcile_post_counts().execute()
+        except APIError as e:
+            if e.code == 'PGRST202':
+                raise CommandError(
+                    "reconcile_post_counts() is not deployed; apply supabase/migrations/*_post_counters.sql"
+                )
+            if e.code == '42501':
+                raise CommandError("reconcile_post_counts() may only be run with the service role key as SUPABASE_KEY")
+            raise CommandError(f"Could not reconcile post counts: {e.message}")
+
+        fixed = response.data or []
+        if options['verbosity'] > 1:
+            for post in fixed:
+                self.stdout.write(
+                    f"post {post['id']}: like_count={post['like_count']} comment_count={post['comment_count']}"
+                )
+        if fixed:
+            self.stdout.write(self.style.WARNING(f"Corrected the counts of {len(fixed)} post(s)"))
+        else:
+            self.stdout.write(self.style.SUCCESS("All post counts are correct"))
@@ -0,0 +1,42 @@
+"""
+Show which Supabase tables and columns the app routes its queries to.
+
+    python manage.py supabase_schema [--json]
+
+Probes the configured Supabase project the same way the app does at startup
+(students/repository.py) and prints the result next to the conservative
+fallback the app uses when the probe cannot run.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from students.repository import FALLBACK_SCHEMA, TABLE_CANDIDATES, refresh_schema
+
+
+class Command(BaseCommand):
+    help = "Probe the Supabase schema and show the detected table and column names"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help='Print the detected schema as JSON')
+
+    def handle(self, *args, **options):
+        try:
+            schema = refresh_schema()
+        except Exception as e:
+            raise CommandError(f"Could not probe the Supabase schema: {e}")
+
+        detected = schema.as_dict()
+        if options['json']:
+            self.stdout.write(json.dumps(detected, indent=2))
+            return
+
+        fallback = FALLBACK_SCHEMA.as_dict()
+        width = max(len(name) for name in detected)
+        for name, value in detected.items():
+            line = f"{name:<{width}}  {value}"
+            if name in TABLE_CANDIDATES:
+                line += f"  (candidates: {', '.join(TABLE_CANDIDATES[name])})"
+            if value != fallback[name]:
+                line = self.style.WARNING(f"{line}  [fallback: {fallback[name]}]")
+            self.stdout.write(line)
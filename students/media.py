@@ -0,0 +1,217 @@
+# Background pipeline for profile pictures.
+# update_profile checks the image header, then calls submit_profile_picture(), which
+# copies the upload to a temporary file in chunks (hashing it on the way) and returns
+# straight away. A small thread pool handles each job: it skips uploads whose content
+# hash is already stored, has the renditions rendered from the file in a process
+# pool (CPU-bound, so threads would contend for the GIL with the request threads),
+# uploads them and updates students.profile_picture_url. Job state lives in Django's
+# cache for the /api/profile-picture/<job_id>/ polling endpoint, so deployments with
+# several worker processes need a shared cache backend.
+import hashlib
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+from django.core.cache import cache
+from .images import AVATAR_SIZES, inspect_image, render_profile_picture, rendition_path
+from .supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+PROFILE_PICTURE_WORKERS = getattr(settings, 'PROFILE_PICTURE_WORKERS', 2)
+PROFILE_PICTURE_JOB_TTL = getattr(settings, 'PROFILE_PICTURE_JOB_TTL', 3600)
+PROFILE_PICTURE_MAX_PIXELS = getattr(settings, 'PROFILE_PICTURE_MAX_PIXELS', 40_000_000)
+PROFILE_PICTURE_BUCKET = "profile-pictures"
+# Rendition paths are content addressed, so their bytes never change
+PROFILE_PICTURE_CACHE_CONTROL = "31536000"
+# Content type and extension for an original stored without renditions, by PIL format
+ORIGINAL_TYPES = {
+    'JPEG': ('image/jpeg', 'jpg'),
+    'PNG': ('image/png', 'png'),
+    'WEBP': ('image/webp', 'webp'),
+    'GIF': ('image/gif', 'gif'),
+}
+
+_process_pool = None
+_upload_pool = None
+_pool_pid = None
+_lock = threading.Lock()
+
+
+def _get_pools():
+    # Rebuilt after a fork; neither the pools' threads nor their worker processes survive it
+    global _process_pool, _upload_pool, _pool_pid
+    pid = os.getpid()
+    with _lock:
+        if _pool_pid != pid:
+            _process_pool = None
+            _upload_pool = ThreadPoolExecutor(max_workers=PROFILE_PICTURE_WORKERS, thread_name_prefix="profile-picture")
+            _pool_pid = pid
+        if _process_pool is None:
+            # forkserver/spawn start fresh interpreters instead of forking a process
+            # that is running request threads
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            _process_pool = ProcessPoolExecutor(max_workers=PROFILE_PICTURE_WORKERS, mp_context=context)
+    return _process_pool, _upload_pool
+
+
+def _reset_process_pool(broken):
+    # A worker that died (e.g. killed while decoding a huge image) breaks the whole pool
+    global _process_pool
+    with _lock:
+        if _process_pool is broken:
+            _process_pool = None
+
+
+def _job_key(job_id):
+    return f"profile_picture_job:{job_id}"
+
+
+def _latest_key(student_id):
+    return f"profile_picture_latest:{student_id}"
+
+
+def _stored_key(digest):
+    return f"profile_picture_stored:{digest}"
+
+
+def _save_job(job):
+    cache.set(_job_key(job['id']), job, PROFILE_PICTURE_JOB_TTL)
+
+
+def get_job(job_id):
+    """The state of a profile picture job: {'id', 'student_id', 'status', 'url', 'error'}, or None."""
+    return cache.get(_job_key(job_id))
+
+
+def check_profile_picture(upload):
+    """Validate an uploaded picture from its header; raises images.UnsupportedImage."""
+    return inspect_image(upload, PROFILE_PICTURE_MAX_PIXELS)
+
+
+def _original_type(upload, image_format):
+    """(content type, extension) to store the original upload under if it cannot be rendered."""
+    if image_format in ORIGINAL_TYPES:
+        return ORIGINAL_TYPES[image_format]
+    # Without PIL only the content type the browser sent is known
+    declared = getattr(upload, 'content_type', None)
+    for content_type, extension in ORIGINAL_TYPES.values():
+        if declared == content_type:
+            return content_type, extension
+    return 'application/octet-stream', 'bin'
+
+
+def _spool(upload):
+    """Copy an UploadedFile to a temporary file chunk by chunk; returns (path, sha256)."""
+    digest = hashlib.sha256()
+    handle, path = tempfile.mkstemp(prefix="profile-picture-", suffix=".upload")
+    try:
+        with os.fdopen(handle, 'wb') as spooled:
+            for chunk in upload.chunks():
+                digest.update(chunk)
+                spooled.write(chunk)
+    except Exception:
+        os.unlink(path)
+        raise
+    return path, digest.hexdigest()
+
+
+def submit_profile_picture(student_id, upload, image_format=None):
+    """Queue an uploaded picture for resizing and upload; returns the job dict.
+
+    `image_format` is the PIL format check_profile_picture() detected, if any.
+
+    With PROFILE_PICTURE_WORKERS = 0 the work is done before returning, which is
+    handy for development and tests.
+    """
+    job = {'id': uuid.uuid4().hex, 'student_id': student_id, 'status': 'processing', 'url': None, 'error': None}
+    # The request's own copy of the upload is deleted when the request ends
+    path, digest = _spool(upload)
+    original_type = _original_type(upload, image_format)
+    _save_job(job)
+    # A newer upload supersedes any job still in flight for the same student
+    cache.set(_latest_key(student_id), job['id'], PROFILE_PICTURE_JOB_TTL)
+
+    if not PROFILE_PICTURE_WORKERS:
+        return _finish(job, path, digest, original_type)
+    _get_pools()[1].submit(_finish, job, path, digest, original_type)
+    return job
+
+
+def _render(path):
+    if not PROFILE_PICTURE_WORKERS:
+        return render_profile_picture(path, PROFILE_PICTURE_MAX_PIXELS)
+    pool = _get_pools()[0]
+    try:
+        return pool.submit(render_profile_picture, path, PROFILE_PICTURE_MAX_PIXELS).result()
+    except BrokenProcessPool:
+        _reset_process_pool(pool)
+        raise
+
+
+def _exists(bucket, path):
+    try:
+        return bucket.exists(path)
+    except Exception:
+        return False
+
+
+def _store(path, digest, original_type):
+    """Upload the renditions of the file at `path` unless an identical upload already did;
+    returns the URL to save."""
+    bucket = supabase.storage.from_(PROFILE_PICTURE_BUCKET)
+    # The path an identical upload was stored under: its main rendition or the original
+    stored_path = cache.get(_stored_key(digest))
+    if isinstance(stored_path, str):
+        return bucket.get_public_url(stored_path)
+    main_path = rendition_path(digest, AVATAR_SIZES[0])
+    if _exists(bucket, main_path):
+        return bucket.get_public_url(main_path)
+
+    renditions = _render(path)
+    if renditions:
+        # The main JPEG goes last, so its presence means the whole set is there
+        for size, extension, content_type, content in reversed(renditions):
+            _upload(bucket, rendition_path(digest, size, extension), content, content_type)
+    else:
+        # No PIL, or an image it cannot decode: stream the upload as it is
+        content_type, extension = original_type
+        main_path = f"profile_pics/{digest}.{extension}"
+        with open(path, 'rb') as original:
+            _upload(bucket, main_path, original, content_type)
+    cache.set(_stored_key(digest), main_path, PROFILE_PICTURE_JOB_TTL)
+    return bucket.get_public_url(main_path)
+
+
+def _upload(bucket, path, content, content_type):
+    bucket.upload(path, content, file_options={
+        "content-type": content_type,
+        "cache-control": PROFILE_PICTURE_CACHE_CONTROL,
+        "upsert": "true",
+    })
+
+
+def _finish(job, path, digest, original_type):
+    """Render and upload the picture, then point the student at it."""
+    student_id = job['student_id']
+    try:
+        url = _store(path, digest, original_type)
+        if cache.get(_latest_key(student_id)) in (job['id'], None):
+            supabase.table("students").update({"profile_picture_url": url}).eq("id", student_id).execute()
+        else:
+            logger.info("Profile picture job %s superseded for student_id=%s", job['id'], student_id)
+        job = {**job, 'status': 'done', 'url': url}
+        logger.info("Profile picture processed for student_id=%s", student_id)
+    except Exception as e:
+        logger.exception("Profile picture job %s failed for student_id=%s", job['id'], student_id)
+        job = {**job, 'status': 'failed', 'error': str(e)}
+    finally:
+        os.unlink(path)
+    _save_job(job)
+    return job
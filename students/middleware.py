@@ -0,0 +1,163 @@
+import logging
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import router
+from django.utils.functional import SimpleLazyObject
+from .instrumentation import start_recording, stop_recording, summarize
+
+logger = logging.getLogger('students.supabase')
+
+SUPABASE_CALL_BUDGET = getattr(settings, 'SUPABASE_CALL_BUDGET', 10)
+SUPABASE_LATENCY_BUDGET_MS = getattr(settings, 'SUPABASE_LATENCY_BUDGET_MS', 500)
+SUPABASE_SERVER_TIMING = getattr(settings, 'SUPABASE_SERVER_TIMING', settings.DEBUG)
+
+# Session key caching which local Student row belongs to the logged-in Supabase user
+LOCAL_STUDENT_SESSION_KEY = 'local_student'
+
+
+def _deleted_key(student_pk):
+    return f"students:local_student_deleted:{student_pk}"
+
+
+class SupabaseTimingMiddleware:
+    """Summarise the Supabase calls each request makes.
+
+    Logs one line per request that touched Supabase, as a warning when the request
+    went over SUPABASE_CALL_BUDGET calls or SUPABASE_LATENCY_BUDGET_MS of Supabase
+    time, and optionally adds a Server-Timing header for the browser dev tools.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        token = start_recording()
+        try:
+            response = self.get_response(request)
+        finally:
+            calls = stop_recording(token)
+        self.report(request, response, calls, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        token = start_recording()
+        try:
+            response = await self.get_response(request)
+        finally:
+            calls = stop_recording(token)
+        self.report(request, response, calls, started)
+        return response
+
+    def report(self, request, response, calls, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        summary = summarize(calls)
+
+        if SUPABASE_SERVER_TIMING:
+            # supabase;dur is the summed call time, which exceeds wall time when calls overlap
+            response['Server-Timing'] = (
+                f'supabase;dur={summary["duration_ms"]:.1f};desc="{summary["calls"]} calls", '
+                f'app;dur={total_ms:.1f}'
+            )
+
+        if not calls:
+            return
+
+        over_budget = []
+        if summary['calls'] > SUPABASE_CALL_BUDGET:
+            over_budget.append(f"calls>{SUPABASE_CALL_BUDGET}")
+        if summary['duration_ms'] > SUPABASE_LATENCY_BUDGET_MS:
+            over_budget.append(f"supabase_ms>{SUPABASE_LATENCY_BUDGET_MS}")
+
+        log = logger.warning if over_budget else logger.info
+        log(
+            "supabase request method=%s path=%s status=%s calls=%d supabase_ms=%.1f total_ms=%.1f rows=%d bytes=%d%s",
+            request.method, request.path, response.status_code, summary['calls'], summary['duration_ms'],
+            total_ms, summary['rows'], summary['bytes'],
+            f" over_budget={','.join(over_budget)} tables={','.join(call['table'] for call in calls)}" if over_budget else "",
+        )
+
+
+def resolve_local_student(request):
+    """The local Django Student for the logged-in Supabase user, or None.
+
+    The first call in a session matches the Supabase account to a Student by email
+    (creating the row if needed) and caches the primary key in the session. Later
+    calls build the Student from that key without a query; other fields load on
+    first access. A deleted Student (see forget_local_student) is looked up again.
+    """
+    from .models import Student
+
+    session_student = request.session.get('student')
+    if not session_student:
+        return None
+    # Keyed on the Supabase id, so the mapping survives an email change and is
+    # dropped when a different account logs in on the same session
+    identity = session_student.get('id') or session_student.get('email')
+    cached = request.session.get(LOCAL_STUDENT_SESSION_KEY)
+    if cached and cached.get('student') == identity:
+        deleted_at = cache.get(_deleted_key(cached['id']))
+        if deleted_at is None or deleted_at < cached.get('at', 0):
+            return Student.from_db(router.db_for_read(Student), ['id'], [cached['id']])
+        # The row was deleted after it was cached; match by email again
+        del request.session[LOCAL_STUDENT_SESSION_KEY]
+
+    email = session_student.get('email')
+    username = session_student.get('username') or (email.split('@')[0] if email else None)
+    full_name = session_student.get('full_name') or username
+    if not email and not username:
+        return None
+    student, _ = Student.objects.get_or_create(
+        email=email,
+        defaults={'username': username, 'full_name': full_name}
+    )
+    request.session[LOCAL_STUDENT_SESSION_KEY] = {'student': identity, 'id': student.pk, 'at': time.time()}
+    return student
+
+
+def forget_local_student(sender, instance, **kwargs):
+    """post_delete handler for Student: sessions that cached its key look it up again.
+
+    Sessions cannot be reached from here, so the deletion is noted in the cache for
+    as long as a session can live.
+    """
+    cache.set(_deleted_key(instance.pk), time.time(), settings.SESSION_COOKIE_AGE)
+
+
+class LocalStudentMiddleware:
+    """Expose the logged-in user's local Student as request.local_student.
+
+    Resolved lazily (see resolve_local_student), so requests that never touch the
+    Django models pay nothing. It evaluates falsy when nobody is logged in.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        request.local_student = SimpleLazyObject(lambda: resolve_local_student(request))
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Async views must resolve it through sync_to_async, as it may query the database
+        request.local_student = SimpleLazyObject(lambda: resolve_local_student(request))
+        return await self.get_response(request)
@@ -0,0 +1,107 @@
+from django.db import migrations, models
+
+# SQLite: an external-content FTS5 index over students_resource, kept in sync by
+# triggers. Prefix indexes on 2 and 3 characters keep short prefix queries cheap.
+SQLITE_FORWARDS = [
+    """
+    CREATE VIRTUAL TABLE students_resource_fts USING fts5(
+        title, description, category,
+        content='students_resource', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER students_resource_fts_insert AFTER INSERT ON students_resource BEGIN
+        INSERT INTO students_resource_fts(rowid, title, description, category)
+        VALUES (new.id, new.title, new.description, new.category);
+    END
+    """,
+    """
+    CREATE TRIGGER students_resource_fts_delete AFTER DELETE ON students_resource BEGIN
+        INSERT INTO students_resource_fts(students_resource_fts, rowid, title, description, category)
+        VALUES ('delete', old.id, old.title, old.description, old.category);
+    END
+    """,
+    """
+    CREATE TRIGGER students_resource_fts_update AFTER UPDATE ON students_resource BEGIN
+        INSERT INTO students_resource_fts(students_resource_fts, rowid, title, description, category)
+        VALUES ('delete', old.id, old.title, old.description, old.category);
+        INSERT INTO students_resource_fts(rowid, title, description, category)
+        VALUES (new.id, new.title, new.description, new.category);
+    END
+    """,
+    "INSERT INTO students_resource_fts(students_resource_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARDS = [
+    "DROP TRIGGER IF EXISTS students_resource_fts_insert",
+    "DROP TRIGGER IF EXISTS students_resource_fts_delete",
+    "DROP TRIGGER IF EXISTS students_resource_fts_update",
+    "DROP TABLE IF EXISTS students_resource_fts",
+]
+
+# PostgreSQL: a generated, weighted tsvector column with a GIN index
+POSTGRES_FORWARDS = [
+    """
+    ALTER TABLE students_resource ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(category, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX students_resource_search_idx ON students_resource USING GIN (search_vector)",
+]
+POSTGRES_BACKWARDS = [
+    "DROP INDEX IF EXISTS students_resource_search_idx",
+    "ALTER TABLE students_resource DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _fts5_available(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if cursor.fetchone()[0]:
+            return True
+        # Builds can also load FTS5 without advertising the compile option
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+            cursor.execute("DROP TABLE temp.fts5_probe")
+            return True
+        except Exception:
+            return False
+
+
+def _run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite' and _fts5_available(schema_editor.connection):
+        _run(schema_editor, SQLITE_FORWARDS)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FORWARDS)
+    # Anything else searches with icontains (see students/search.py)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_BACKWARDS)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_BACKWARDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0003_journal'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(fields=['category'], name='students_re_categor_idx'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0004_resource_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='journal',
+            index=models.Index(fields=['student_id', 'created_at', 'id'], name='students_jo_student_idx'),
+        ),
+    ]
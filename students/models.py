@@ -63,6 +63,10 @@ class Resource(models.Model):
     image = models.ImageField(upload_to='resources/images/', blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Full-text search lives outside the model (see search.py and migration 0004)
+    class Meta:
+        indexes = [models.Index(fields=['category'], name='students_re_categor_idx')]
+
     def __str__(self):
         return self.title
 
@@ -70,4 +74,10 @@ class Journal(models.Model):
     student_id = models.ForeignKey(Student, on_delete=models.CASCADE)
     title = models.CharField(max_length=255, default='Reflective Journal')
     content = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of one student's entries (see students/journals.py)
+            models.Index(fields=['student_id', 'created_at', 'id'], name='students_jo_student_idx'),
+        ]
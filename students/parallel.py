@@ -0,0 +1,66 @@
+# Run independent Supabase queries side by side from the sync views.
+# Each PostgREST call spends almost all of its time waiting on the network, so a
+# small thread pool lets a view issue them together and wait for the slowest one
+# instead of their sum. Tasks must not touch the Django ORM: database connections
+# are per thread and would be left open in the pool's workers.
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+
+SUPABASE_QUERY_WORKERS = getattr(settings, 'SUPABASE_QUERY_WORKERS', 8)
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_worker = threading.local()
+
+
+def _get_executor():
+    # Rebuilt after a fork, like the Supabase client; threads do not survive fork()
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(
+                    max_workers=SUPABASE_QUERY_WORKERS,
+                    thread_name_prefix="supabase-query",
+                    initializer=_mark_worker,
+                )
+                _executor_pid = pid
+    return _executor
+
+
+def _mark_worker():
+    _worker.active = True
+
+
+def run_parallel(tasks):
+    """Run a {name: callable} mapping concurrently and return {name: result}.
+
+    Every task is awaited before returning; the first exception raised by a task
+    is then re-raised, so callers that want partial results should catch errors
+    inside their callables. Called from inside a pool worker (or with a single
+    task) the tasks simply run inline, which keeps nested use from deadlocking
+    the bounded pool.
+    """
+    if len(tasks) <= 1 or getattr(_worker, 'active', False):
+        return {name: task() for name, task in tasks.items()}
+
+    executor = _get_executor()
+    # Each task runs in a copy of the caller's context so per-request state
+    # (e.g. the Supabase call log in instrumentation.py) follows it into the pool
+    futures = {name: executor.submit(contextvars.copy_context().run, task) for name, task in tasks.items()}
+    results = {}
+    error = None
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            if error is None:
+                error = e
+    if error is not None:
+        raise error
+    return results
@@ -0,0 +1,68 @@
+# Password checks for login. Verifying a hash has to happen inside the request, but
+# upgrading an outdated one (after PASSWORD_HASHER or its cost settings change) is
+# handed to a small background pool so the login response is not held up by a
+# second expensive hash. The pool's backlog is bounded: when it is full the upgrade
+# is skipped, and the next login with the still-outdated hash schedules it again.
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from .supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+PASSWORD_REHASH_WORKERS = getattr(settings, 'PASSWORD_REHASH_WORKERS', 1)
+# Upgrades waiting for a worker; each holds a plaintext password in memory
+PASSWORD_REHASH_QUEUE = getattr(settings, 'PASSWORD_REHASH_QUEUE', 8)
+
+_executor = None
+_executor_pid = None
+_pending = set()
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor, _executor_pid
+    pid = os.getpid()
+    with _lock:
+        if _executor is None or _executor_pid != pid:
+            _executor = ThreadPoolExecutor(max_workers=PASSWORD_REHASH_WORKERS, thread_name_prefix="password-rehash")
+            _executor_pid = pid
+            _pending.clear()
+    return _executor
+
+
+def verify_password(password, student):
+    """check_password() for a students row, scheduling a hash upgrade when one is due."""
+    stored_hash = student['password']
+    return check_password(password, stored_hash, setter=lambda raw: schedule_rehash(student['id'], stored_hash, raw))
+
+
+def schedule_rehash(student_id, old_hash, password):
+    """Re-hash a verified password with the preferred hasher in the background."""
+    executor = _get_executor()
+    with _lock:
+        # A student logging in repeatedly while the pool is busy needs one upgrade
+        if student_id in _pending:
+            return
+        if len(_pending) >= PASSWORD_REHASH_WORKERS + PASSWORD_REHASH_QUEUE:
+            logger.debug("Rehash queue full; skipping upgrade for student_id=%s until next login", student_id)
+            return
+        _pending.add(student_id)
+    executor.submit(_rehash, student_id, old_hash, password)
+
+
+def _rehash(student_id, old_hash, password):
+    try:
+        new_hash = make_password(password)
+        # Only replace the hash that was verified, so a password change made in the
+        # meantime is never overwritten
+        supabase.table("students").update({"password": new_hash}).eq("id", student_id).eq("password", old_hash).execute()
+        logger.info("Upgraded password hash for student_id=%s", student_id)
+    except Exception:
+        logger.exception("Password rehash failed for student_id=%s", student_id)
+    finally:
+        with _lock:
+            _pending.discard(student_id)
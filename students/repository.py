@@ -0,0 +1,358 @@
+# Supabase data access for posts, likes, comments and their moderation state.
+#
+# The app has run against two schemas: posts/likes/comments with a posts.status
+# column, and the older anonymous_posts/post_likes/post_comments with only an
+# approved flag. Rather than trying one name and falling back to the other on
+# every request, the schema is probed once per process (detect_schema, started when
+# wsgi.py or asgi.py loads) and every query here is built against the names that
+# exist, so each operation is a single well-formed request; `python manage.py
+# supabase_schema` shows what was detected. Like feed.py, nothing here performs I/O
+# besides the probe: the builders work with either supabase client and the caller
+# executes them.
+import logging
+import os
+import threading
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from postgrest.exceptions import APIError
+from .filters import quote_value
+from .roles import LOGIN_COLUMNS, LOGIN_COLUMNS_FALLBACK
+from .supabase_client import get_async_supabase_client, get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+# After a failed probe (e.g. Supabase unreachable) FALLBACK_SCHEMA is used and the
+# probe is retried after this many seconds
+SCHEMA_RETRY_SECONDS = getattr(settings, 'SUPABASE_SCHEMA_RETRY_SECONDS', 60)
+# Re-probe a detected schema this often (0 never), to pick up migrations without a restart
+SCHEMA_REFRESH_SECONDS = getattr(settings, 'SUPABASE_SCHEMA_REFRESH_SECONDS', 0)
+
+# Preferred name first
+TABLE_CANDIDATES = {
+    'posts': ('posts', 'anonymous_posts'),
+    'likes': ('likes', 'post_likes'),
+    'comments': ('comments', 'post_comments'),
+}
+# PostgREST errors for a missing table, column or relationship
+MISSING_CODES = {'PGRST205', 'PGRST200', '42P01', '42703'}
+
+POST_STATUSES = ('pending', 'approved', 'declined')
+
+
+class Schema:
+    """Table names and optional columns of the connected Supabase project."""
+
+    def __init__(self, posts='posts', likes='likes', comments='comments', status_column=True,
+                 approved_column=True, login_columns=LOGIN_COLUMNS, post_counts=True, post_counters=True):
+        self.posts = posts
+        self.likes = likes
+        self.comments = comments
+        # posts.status (pending/approved/declined) and the legacy posts.approved flag
+        self.status_column = status_column
+        self.approved_column = approved_column
+        # Columns login selects; the admins embed needs students.is_admin and admins.student_id
+        self.login_columns = login_columns
+        # Whether students -> posts can be embedded as "<posts>(count)"
+        self.post_counts = post_counts
+        # posts.like_count/comment_count, kept current by triggers (supabase/migrations/*_post_counters.sql)
+        self.post_counters = post_counters
+
+    def as_dict(self):
+        return dict(vars(self))
+
+    def __repr__(self):
+        return f"Schema({', '.join(f'{key}={value!r}' for key, value in vars(self).items())})"
+
+
+# Used until a probe succeeds: only what both schemas have, so a failed probe costs
+# the optional features rather than breaking login, posting and the feed. A schema
+# detected once is kept when later probes fail.
+FALLBACK_SCHEMA = Schema(status_column=False, login_columns=LOGIN_COLUMNS_FALLBACK, post_counts=False,
+                         post_counters=False)
+
+
+def _exists(query):
+    """Run a probe query; False when PostgREST reports something in it missing."""
+    try:
+        query.limit(1).execute()
+        return True
+    except APIError as e:
+        if e.code in MISSING_CODES:
+            return False
+        raise
+
+
+def detect_schema(client):
+    """Probe which tables and columns exist. Raises on anything but a missing name."""
+    tables = {}
+    for role, candidates in TABLE_CANDIDATES.items():
+        tables[role] = next(
+            (name for name in candidates if _exists(client.table(name).select("id"))),
+            candidates[0],
+        )
+    posts = tables['posts']
+    return Schema(
+        **tables,
+        status_column=_exists(client.table(posts).select("status")),
+        approved_column=_exists(client.table(posts).select("approved")),
+        login_columns=(
+            LOGIN_COLUMNS if _exists(client.table("students").select(LOGIN_COLUMNS)) else LOGIN_COLUMNS_FALLBACK
+        ),
+        post_counts=_exists(client.table("students").select(f"id, {posts}(count)")),
+        post_counters=_exists(client.table(posts).select("like_count, comment_count")),
+    )
+
+
+_schema = None
+# time.monotonic() of the last probe, successful or not
+_schema_checked_at = None
+# Held while a probe runs, so concurrent first requests wait for one probe
+_probe_lock = threading.Lock()
+
+
+def refresh_schema():
+    """Probe the schema now and cache it for the process. Raises if the probe fails."""
+    global _schema, _schema_checked_at
+    client = get_supabase_client()
+    try:
+        schema = detect_schema(client)
+    except Exception:
+        if client is get_supabase_client():
+            _schema_checked_at = time.monotonic()
+        raise
+    # A client installed while the probe ran (tests, benchmarks) gets its own probe
+    if client is get_supabase_client():
+        if _schema is None or schema.as_dict() != _schema.as_dict():
+            logger.info("Detected Supabase schema: %r", schema)
+        _schema, _schema_checked_at = schema, time.monotonic()
+    return schema
+
+
+def reset_schema():
+    """Forget the cached schema, e.g. after install_client() swapped the client."""
+    global _schema, _schema_checked_at
+    _schema = _schema_checked_at = None
+
+
+def get_schema():
+    """The cached schema; probed on first use if the startup probe has not finished.
+
+    With SUPABASE_SCHEMA_REFRESH_SECONDS set, a stale schema is re-probed in the
+    background while requests keep using the cached one.
+    """
+    if _schema is not None:
+        if SCHEMA_REFRESH_SECONDS and time.monotonic() - _schema_checked_at > SCHEMA_REFRESH_SECONDS:
+            start_schema_probe()
+        return _schema
+    with _probe_lock:
+        if _schema is not None:
+            return _schema
+        if _schema_checked_at is not None and time.monotonic() - _schema_checked_at < SCHEMA_RETRY_SECONDS:
+            return FALLBACK_SCHEMA
+        try:
+            return refresh_schema()
+        except Exception as e:
+            logger.warning("Could not detect the Supabase schema, using the fallback: %s", e)
+            return FALLBACK_SCHEMA
+
+
+def start_schema_probe():
+    """Probe in a background thread, unless a probe is already running."""
+    if not _probe_lock.acquire(blocking=False):
+        return
+    try:
+        threading.Thread(target=_background_probe, name='supabase-schema-probe', daemon=True).start()
+    except Exception:
+        _probe_lock.release()
+        raise
+
+
+def probe_schema_on_startup():
+    """Start the probe for a server process; called from wsgi.py and asgi.py.
+
+    Management commands never load those modules, so migrate, shell and the like
+    make no Supabase calls at startup.
+    """
+    configured = getattr(settings, 'SUPABASE_URL', None) and getattr(settings, 'SUPABASE_KEY', None)
+    if configured and getattr(settings, 'SUPABASE_SCHEMA_PROBE_ON_STARTUP', True):
+        start_schema_probe()
+
+
+def _background_probe():
+    try:
+        refresh_schema()
+    except Exception as e:
+        # Requests keep the cached schema (or the fallback) until the next attempt
+        logger.warning("Supabase schema probe failed: %s", e)
+    finally:
+        _probe_lock.release()
+
+
+def _reset_probe_lock():
+    global _probe_lock
+    _probe_lock = threading.Lock()
+
+
+# A probe running in the parent during fork (e.g. gunicorn --preload) would leave
+# the child's copy of the lock held forever
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_probe_lock)
+
+
+async def aget_schema():
+    if _schema is not None:
+        return get_schema()
+    # The first probe uses the sync client
+    return await sync_to_async(get_schema)()
+
+
+def get_repository():
+    return Repository(get_supabase_client(), get_schema())
+
+
+async def aget_repository():
+    return Repository(await get_async_supabase_client(), await aget_schema())
+
+
+class Repository:
+    """Query builders for one Supabase client (sync or async) and schema."""
+
+    def __init__(self, client, schema):
+        self.client = client
+        self.schema = schema
+
+    # Posts
+
+    def status_fields(self, status):
+        """Column values that put a post in `status`, for inserts and updates."""
+        fields = {}
+        if self.schema.status_column:
+            fields['status'] = status
+        if self.schema.approved_column:
+            fields['approved'] = status == 'approved'
+        return fields
+
+    def _with_status(self, query, status):
+        if self.schema.status_column:
+            return query.eq("status", status)
+        if status == 'declined':
+            # The approved flag cannot tell declined posts from pending ones
+            return query.is_("approved", "null")
+        return query.eq("approved", status == 'approved')
+
+    def approved_posts_page(self, keyset, limit):
+        """Approved posts newest first, one row past `limit` so the caller can tell if more exist."""
+        query = self._with_status(self.client.table(self.schema.posts).select("*"), 'approved')
+        # id is a tie-breaker so the (created_at, id) keyset is total
+        if keyset:
+            created_at, last_id = keyset
+            created_at = quote_value(created_at)
+            query = query.or_(
+                f'created_at.lt.{created_at},'
+                f'and(created_at.eq.{created_at},id.lt.{quote_value(last_id)})'
+            )
+        return query.order("created_at", desc=True).order("id", desc=True).limit(limit + 1)
+
+    def posts(self, status=None):
+        """All posts newest first, optionally only those in `status`."""
+        query = self.client.table(self.schema.posts).select("*")
+        if status in POST_STATUSES:
+            query = self._with_status(query, status)
+        return query.order("created_at", desc=True)
+
+    def post(self, post_id, columns="*"):
+        return self.client.table(self.schema.posts).select(columns).eq("id", post_id)
+
+    def insert_post(self, data):
+        return self.client.table(self.schema.posts).insert(data)
+
+    def update_post(self, post_id, data):
+        return self.client.table(self.schema.posts).update(data).eq("id", post_id)
+
+    def set_post_status(self, post_id, status):
+        return self.update_post(post_id, self.status_fields(status))
+
+    def delete_post(self, post_id):
+        return self.client.table(self.schema.posts).delete().eq("id", post_id)
+
+    def delete_posts(self, post_ids):
+        return self.client.table(self.schema.posts).delete().in_("id", post_ids)
+
+    def count_posts(self, status=None):
+        query = self.client.table(self.schema.posts).select("id", count="exact", head=True)
+        return self._with_status(query, status) if status else query
+
+    def posts_by_students(self, student_ids, columns="student_id"):
+        return self.client.table(self.schema.posts).select(columns).in_("student_id", student_ids)
+
+    def posts_by_student(self, student_id):
+        return self.client.table(self.schema.posts).select("id").eq("student_id", student_id)
+
+    def post_counters(self, post_ids):
+        """Stored like and comment counts; only when schema.post_counters."""
+        return self.client.table(self.schema.posts).select("id, like_count, comment_count").in_("id", post_ids)
+
+    def reconcile_post_counts(self):
+        """Recount every post's likes and comments, returning the posts that had drifted."""
+        return self.client.rpc("reconcile_post_counts")
+
+    # Likes
+
+    def likes_for_posts(self, post_ids):
+        return self.client.table(self.schema.likes).select("post_id, student_id").in_("post_id", post_ids)
+
+    def liked_post_ids(self, post_ids, student_id):
+        """Which of `post_ids` the student has liked."""
+        return self.client.table(self.schema.likes).select("post_id").eq("student_id", student_id).in_("post_id", post_ids)
+
+    def like(self, post_id, student_id):
+        return self.client.table(self.schema.likes).select("post_id").eq("post_id", post_id).eq("student_id", student_id)
+
+    def insert_like(self, data):
+        return self.client.table(self.schema.likes).insert(data)
+
+    def delete_like(self, post_id, student_id):
+        return self.client.table(self.schema.likes).delete().eq("post_id", post_id).eq("student_id", student_id)
+
+    # Comments
+
+    def comments(self, post_id):
+        return self.client.table(self.schema.comments).select("*").eq("post_id", post_id).order("created_at", desc=False)
+
+    def comment_post_ids(self, post_ids):
+        return self.client.table(self.schema.comments).select("post_id").in_("post_id", post_ids)
+
+    def insert_comment(self, data):
+        return self.client.table(self.schema.comments).insert(data)
+
+    # Students
+
+    def login_row(self, username):
+        return self.client.table("students").select(self.schema.login_columns).eq("username", username)
+
+    def user_columns(self):
+        """Columns for the admin user list: every column, plus the post count when it can be embedded."""
+        return f"*, {self.schema.posts}(count)" if self.schema.post_counts else "*"
+
+    def pop_post_count(self, user):
+        """Move an embedded post count (see user_columns) to user['post_count']; False if absent."""
+        embedded = user.pop(self.schema.posts, None)
+        if embedded is None:
+            return False
+        user['post_count'] = (embedded or [{}])[0].get('count', 0)
+        return True
+
+    def user_cleanup(self, user_id, post_ids):
+        """Deletes for a user's likes, comments and admin row, and everything on their posts."""
+        queries = [
+            self.client.table(self.schema.comments).delete().eq("student_id", user_id),
+            self.client.table(self.schema.likes).delete().eq("student_id", user_id),
+            self.client.table("admins").delete().eq("student_id", user_id),
+        ]
+        if post_ids:
+            queries += [
+                self.client.table(self.schema.comments).delete().in_("post_id", post_ids),
+                self.client.table(self.schema.likes).delete().in_("post_id", post_ids),
+            ]
+        return queries
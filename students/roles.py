@@ -0,0 +1,146 @@
+# Cache for admin role decisions.
+# is_admin() needs up to two Supabase queries; the answer is cached per student id in
+# Django's cache for ADMIN_ROLE_CACHE_TTL seconds and must be invalidated whenever the
+# admins table or students.is_admin changes. The flag is also kept in the session, so
+# invalidation leaves a timestamp in the cache that outranks any session flag checked
+# before it. With the default per-process LocMemCache, invalidation only reaches the
+# current worker; other workers pick up the change when their entry expires. Configure
+# a shared CACHES backend to make invalidation global.
+import logging
+import time
+from django.conf import settings
+from django.core.cache import cache
+from .supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+ADMIN_ROLE_CACHE_TTL = getattr(settings, 'ADMIN_ROLE_CACHE_TTL', 300)
+
+
+# Columns login needs, with the student's admins row embedded so the role comes back
+# in the same round trip as the password hash
+LOGIN_COLUMNS = "id, username, email, full_name, password, is_admin, admins(student_id)"
+LOGIN_COLUMNS_FALLBACK = "id, username, email, full_name, password"
+
+
+def _cache_key(student_id):
+    return f"students:is_admin:{student_id}"
+
+
+def _changed_key(student_id):
+    return f"students:role_changed:{student_id}"
+
+
+def _known_status(student, cached):
+    status = cached.get(_cache_key(student['id']))
+    if status is not None:
+        return status
+    return session_admin_status(student, cached.get(_changed_key(student['id'])))
+
+
+def known_admin_status(student):
+    """Admin flag from the cache, else from the session student; None when neither can be trusted."""
+    return _known_status(student, cache.get_many([_cache_key(student['id']), _changed_key(student['id'])]))
+
+
+async def aknown_admin_status(student):
+    return _known_status(student, await cache.aget_many([_cache_key(student['id']), _changed_key(student['id'])]))
+
+
+def cache_admin_status(student_id, status):
+    cache.set(_cache_key(student_id), bool(status), ADMIN_ROLE_CACHE_TTL)
+
+
+async def acache_admin_status(student_id, status):
+    await cache.aset(_cache_key(student_id), bool(status), ADMIN_ROLE_CACHE_TTL)
+
+
+def invalidate_admin_status(student_id):
+    """Forget the cached admin flag; call after any change to a student's admin rows."""
+    cache.delete(_cache_key(student_id))
+    # Session flags checked before now are stale too; older ones expire by themselves
+    cache.set(_changed_key(student_id), time.time(), ADMIN_ROLE_CACHE_TTL)
+
+
+async def ainvalidate_admin_status(student_id):
+    await cache.adelete(_cache_key(student_id))
+    await cache.aset(_changed_key(student_id), time.time(), ADMIN_ROLE_CACHE_TTL)
+
+
+def admin_status_from_login_row(student):
+    """Admin status from a row selected with LOGIN_COLUMNS, as (is_admin, definitive).
+
+    Usernames starting with 'admin' still go through resolve_admin_status so its
+    auto-insert into the admins table keeps working.
+    """
+    if student.get('admins') or student.get('is_admin'):
+        return True, True
+    if 'admins' not in student or student.get('username', '').lower().startswith('admin'):
+        return resolve_admin_status(student)
+    return False, True
+
+
+def session_admin_status(student, changed_at=None):
+    """Admin flag stored in the session student, or None once stale.
+
+    The flag is stale once older than ADMIN_ROLE_CACHE_TTL, or when the role was
+    invalidated (at `changed_at`) after it was checked.
+    """
+    checked_at = student.get('role_checked_at')
+    if student.get('is_admin') is None or checked_at is None:
+        return None
+    if time.time() - checked_at > ADMIN_ROLE_CACHE_TTL:
+        return None
+    if changed_at is not None and changed_at >= checked_at:
+        return None
+    return bool(student['is_admin'])
+
+
+def with_admin_status(student, status):
+    """Copy of a session student carrying the admin flag and when it was checked."""
+    return {**student, 'is_admin': bool(status), 'role_checked_at': time.time()}
+
+
+def resolve_admin_status(student):
+    """Look up admin status in Supabase.
+
+    Returns (is_admin, definitive); a negative answer is not definitive when the
+    admins table could not be queried, so it is not cached.
+    """
+    student_id = student['id']
+    admins_table_ok = True
+    
+    # Method 1: Check admins table (primary method)
+    try:
+        admin_response = supabase.table("admins").select("student_id").eq("student_id", student_id).execute()
+        if admin_response.data and len(admin_response.data) > 0:
+            logger.debug("Admin check: student_id=%s is admin (admins table)", student_id)
+            return True, True
+    except Exception as e:
+        admins_table_ok = False
+        logger.warning("Error checking admins table: %s", e)
+    
+    # Method 2: Check is_admin column in students table (fallback)
+    try:
+        response = supabase.table("students").select("is_admin").eq("id", student_id).execute()
+        if response.data and response.data[0].get('is_admin'):
+            logger.debug("Admin check: student_id=%s is admin (is_admin column)", student_id)
+            return True, True
+    except Exception as e2:
+        logger.warning("Error checking is_admin column: %s", e2)
+    
+    # Method 3: Check if username starts with 'admin' (temporary fallback for testing)
+    username = student.get('username', '').lower()
+    if username.startswith('admin'):
+        logger.info("Admin check: student_id=%s is admin (username prefix fallback)", student_id)
+        # Automatically add to admins table if not already there
+        try:
+            admin_data = {"student_id": student_id}
+            supabase.table("admins").insert(admin_data).execute()
+            logger.info("Auto-added student_id=%s to admins table", student_id)
+            return True, True
+        except:
+            pass
+    
+    logger.debug("Admin check: student_id=%s is not admin", student_id)
+    return False, admins_table_ok
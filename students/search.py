@@ -0,0 +1,158 @@
+# Search for the Resources Hub (Django models) and, at the bottom, the Supabase
+# search functions behind the admin user list and wellness resources.
+#
+# Resources Hub: on SQLite, resources are indexed in an FTS5 table
+# (students_resource_fts) that triggers keep in sync with every insert, update and
+# delete on students_resource; on PostgreSQL, a generated tsvector column with a
+# GIN index does the same. Both are created by migration 0004_resource_search.
+# Matches are ranked with title weighted above category above description, and
+# every term matches as a prefix, so "anx" finds "anxiety". Other databases fall
+# back to icontains filters.
+#
+# Note: on SQLite, a migration that rebuilds students_resource (most AlterField
+# operations do) drops the triggers; re-create them as 0004 does in that migration.
+import logging
+import re
+from django.db import connection
+from django.db.models import Q
+from .models import Resource
+
+logger = logging.getLogger(__name__)
+
+RESOURCES_PAGE_SIZE = 12
+# Terms beyond this are ignored; keeps the query plan bounded
+MAX_SEARCH_TERMS = 8
+
+FTS_TABLE = f"{Resource._meta.db_table}_fts"
+# bm25() weights, in FTS column order: title, description, category
+FTS_WEIGHTS = (10.0, 2.0, 5.0)
+
+_TERM_RE = re.compile(r'\w+')
+_fts_ready = False
+
+
+def search_terms(query):
+    """Split free text into search terms; drops punctuation, so no query syntax gets through."""
+    return _TERM_RE.findall(query or '')[:MAX_SEARCH_TERMS]
+
+
+def search_resources(query='', category=''):
+    """Resources matching `query` (best match first) in `category`, ready for a Paginator.
+
+    Without search terms this is every resource in the category, newest first.
+    """
+    terms = search_terms(query)
+    if terms and connection.vendor == 'sqlite' and _sqlite_index_ready():
+        return _sqlite_search(terms, category)
+    if terms and connection.vendor == 'postgresql':
+        return _postgres_search(terms, category)
+
+    resources = Resource.objects.all()
+    if category:
+        resources = resources.filter(category=category)
+    for term in terms:
+        resources = resources.filter(
+            Q(title__icontains=term) | Q(description__icontains=term) | Q(category__icontains=term)
+        )
+    return resources.order_by('-created_at', '-id')
+
+
+def resource_categories():
+    return list(Resource.objects.order_by('category').values_list('category', flat=True).distinct())
+
+
+def _sqlite_index_ready():
+    # Only a positive answer is remembered, so running migrations later is picked up
+    global _fts_ready
+    if not _fts_ready:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _fts_ready = cursor.fetchone() is not None
+    return _fts_ready
+
+
+def _sqlite_search(terms, category):
+    match = ' '.join(f'"{term}"*' for term in terms)
+    where = f"{FTS_TABLE} MATCH %s"
+    params = [match]
+    if category:
+        where += " AND r.category = %s"
+        params.append(category)
+    table = Resource._meta.db_table
+    source = f"{FTS_TABLE} JOIN {table} r ON r.id = {FTS_TABLE}.rowid WHERE {where}"
+    weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+    return RankedResults(
+        f"SELECT r.id FROM {source} ORDER BY bm25({FTS_TABLE}, {weights}), r.created_at DESC",
+        f"SELECT COUNT(*) FROM {source}",
+        params,
+    )
+
+
+def _postgres_search(terms, category):
+    where = "search_vector @@ query"
+    params = [' & '.join(f"{term}:*" for term in terms)]
+    if category:
+        where += " AND category = %s"
+        params.append(category)
+    source = f"{Resource._meta.db_table}, to_tsquery('english', %s) query WHERE {where}"
+    return RankedResults(
+        f"SELECT id FROM {source} ORDER BY ts_rank_cd(search_vector, query) DESC, created_at DESC",
+        f"SELECT COUNT(*) FROM {source}",
+        params,
+    )
+
+
+class RankedResults:
+    """Ranked search hits, fetched one page at a time.
+
+    Supports count() and slicing, which is all django.core.paginator.Paginator
+    needs, so only the requested page's ids and rows are ever loaded.
+    """
+
+    def __init__(self, ids_sql, count_sql, params):
+        self._ids_sql = ids_sql
+        self._count_sql = count_sql
+        self._params = params
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            with connection.cursor() as cursor:
+                cursor.execute(self._count_sql, self._params)
+                self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step not in (None, 1):
+            raise TypeError("RankedResults only supports slicing")
+        start = index.start or 0
+        limit = -1 if index.stop is None else max(0, index.stop - start)
+        with connection.cursor() as cursor:
+            cursor.execute(f"{self._ids_sql} LIMIT %s OFFSET %s", [*self._params, limit, start])
+            ids = [row[0] for row in cursor.fetchall()]
+        resources = Resource.objects.in_bulk(ids)
+        return [resources[pk] for pk in ids if pk in resources]
+
+
+# Supabase search. search_students and search_wellness_resources are SQL functions
+# (supabase/migrations/*_search_rpcs.sql) backed by trigram and full-text indexes
+# that return matching rows best match first. Callers fall back to an escaped
+# ilike or_() filter when a function has not been deployed yet.
+STUDENT_SEARCH_COLUMNS = ("username", "email", "full_name")
+WELLNESS_SEARCH_COLUMNS = ("name", "description")
+
+_missing_functions = set()
+
+
+def search_function_available(name):
+    return name not in _missing_functions
+
+
+def note_search_error(name, error):
+    """Remember a search function PostgREST does not know (PGRST202), so callers stop calling it."""
+    if getattr(error, 'code', None) == 'PGRST202' and name not in _missing_functions:
+        _missing_functions.add(name)
+        logger.warning("Supabase function %s is not deployed; falling back to ilike search", name)
@@ -447,20 +447,40 @@ document.addEventListener('DOMContentLoaded', function() {
         return cookieValue;
     }
 
-    // Load admin users - make it accessible globally
-    window.loadAdminUsers = async function(searchQuery = '') {
+    // Load admin users - make it accessible globally (paginated; "Load more" appends the next page)
+    let loadedAdminUsers = [];
+    let adminUsersPage = 1;
+
+    window.loadAdminUsers = async function(searchQuery = '', append = false) {
         const container = document.getElementById('adminUsersContainer');
         if (!container) return;
         
-        container.innerHTML = '<div style="text-align: center; padding: 2rem; color: #6b7280;">Loading users...</div>';
+        if (!append) {
+            loadedAdminUsers = [];
+            adminUsersPage = 1;
+            container.innerHTML = '<div style="text-align: center; padding: 2rem; color: #6b7280;">Loading users...</div>';
+        }
         
         try {
-            const url = searchQuery ? `/api/admin/users/?search=${encodeURIComponent(searchQuery)}` : '/api/admin/users/';
-            const response = await fetch(url);
+            const params = new URLSearchParams({ page: adminUsersPage });
+            if (searchQuery) params.set('search', searchQuery);
+            const response = await fetch(`/api/admin/users/?${params.toString()}`);
             const data = await response.json();
             
             if (data.success) {
-                displayAdminUsers(data.users || []);
+                loadedAdminUsers = loadedAdminUsers.concat(data.users || []);
+                displayAdminUsers(loadedAdminUsers, data.total);
+                if (data.has_more) {
+                    const loadMoreBtn = document.createElement('button');
+                    loadMoreBtn.className = 'action-btn';
+                    loadMoreBtn.textContent = `Load more users (${loadedAdminUsers.length} of ${data.total})`;
+                    loadMoreBtn.addEventListener('click', () => {
+                        loadMoreBtn.disabled = true;
+                        adminUsersPage += 1;
+                        window.loadAdminUsers(searchQuery, true);
+                    });
+                    container.appendChild(loadMoreBtn);
+                }
             } else {
                 container.innerHTML = '<div style="color: #dc2626;">Error loading users</div>';
             }
@@ -474,14 +494,14 @@ document.addEventListener('DOMContentLoaded', function() {
     const loadAdminUsers = window.loadAdminUsers;
     
     // Display admin users
-    function displayAdminUsers(users) {
+    function displayAdminUsers(users, total = users.length) {
         const container = document.getElementById('adminUsersContainer');
         if (!container) return;
         
         // Update total count
         const totalCountEl = document.getElementById('totalCount');
         if (totalCountEl) {
-            totalCountEl.textContent = users.length;
+            totalCountEl.textContent = total;
         }
         
         if (users.length === 0) {
@@ -544,7 +564,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 </tbody>
             </table>
             <div class="admin-footer">
-                ${users.length} user${users.length !== 1 ? 's' : ''}
+                ${total} user${total !== 1 ? 's' : ''}
             </div>
         `;
         
@@ -259,14 +259,12 @@ document.addEventListener('DOMContentLoaded', () => {
     // Update stats display after post actions
     async function updateStatsDisplay() {
         try {
-            // Fetch counts from API
-            const pendingResponse = await fetch('/api/admin/posts/?status=pending');
-            const pendingData = await pendingResponse.json();
-            const pendingCount = pendingData.posts ? pendingData.posts.length : 0;
-            
-            const allPostsResponse = await fetch('/api/admin/posts/');
-            const allPostsData = await allPostsResponse.json();
-            const totalPosts = allPostsData.posts ? allPostsData.posts.length : 0;
+            // Fetch server-side counts from API
+            const response = await fetch('/api/admin/stats/');
+            const data = await response.json();
+            if (!data.success) return;
+            const pendingCount = data.stats.pending_count || 0;
+            const totalPosts = data.stats.post_count || 0;
             
             // Update pending count
             const pendingCountEl = document.getElementById('pendingCount');
@@ -287,19 +285,39 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
-    // Users
-    async function loadUsers(searchTerm = '') {
+    // Users (paginated; "Load more" appends the next page)
+    let loadedUsers = [];
+    let usersPage = 1;
+
+    async function loadUsers(searchTerm = '', append = false) {
         if (!usersContainer) return;
-        usersContainer.innerHTML = '<div class="empty-state">Loading users...</div>';
+        if (!append) {
+            loadedUsers = [];
+            usersPage = 1;
+            usersContainer.innerHTML = '<div class="empty-state">Loading users...</div>';
+        }
         try {
-            const url = searchTerm ? `/api/admin/users/?search=${encodeURIComponent(searchTerm)}` : '/api/admin/users/';
-            const response = await fetch(url);
+            const params = new URLSearchParams({ page: usersPage });
+            if (searchTerm) params.set('search', searchTerm);
+            const response = await fetch(`/api/admin/users/?${params.toString()}`);
             const data = await response.json();
             if (!data.success) {
                 usersContainer.innerHTML = `<div class="empty-state" style="color:#dc2626;">${data.error || 'Failed to load users'}</div>`;
                 return;
             }
-            renderUsers(data.users || []);
+            loadedUsers = loadedUsers.concat(data.users || []);
+            renderUsers(loadedUsers);
+            if (data.has_more) {
+                const loadMoreBtn = document.createElement('button');
+                loadMoreBtn.className = 'load-more-users-btn';
+                loadMoreBtn.textContent = `Load more users (${loadedUsers.length} of ${data.total})`;
+                loadMoreBtn.addEventListener('click', () => {
+                    loadMoreBtn.disabled = true;
+                    usersPage += 1;
+                    loadUsers(searchTerm, true);
+                });
+                usersContainer.appendChild(loadMoreBtn);
+            }
         } catch (err) {
             console.error('Error loading users', err);
             usersContainer.innerHTML = '<div class="empty-state" style="color:#dc2626;">Unable to load users right now.</div>';
@@ -362,7 +380,7 @@ document.addEventListener('DOMContentLoaded', () => {
                                 <input type="checkbox" class="user-checkbox" name="selected_users" value="${user.id}" ${isSelf ? 'disabled' : ''} style="width: 18px; height: 18px; cursor: pointer; accent-color: #9333ea;">
                                 <div class="user-avatar">
                                     ${user.profile_picture_url ? 
-                                        `<img src="${escapeHtml(user.profile_picture_url)}" alt="${escapeHtml(user.username || 'User')}" onerror="this.style.display='none'; this.nextElementSibling.style.display='flex';">` : 
+                                        `<picture style="display: contents;">${user.profile_picture_webp_url ? `<source srcset="${escapeHtml(user.profile_picture_webp_url)}" type="image/webp">` : ''}<img src="${escapeHtml(user.profile_picture_url)}" alt="${escapeHtml(user.username || 'User')}" loading="lazy" onerror="this.parentElement.style.display='none'; this.parentElement.nextElementSibling.style.display='flex';"></picture>` : 
                                         ''
                                     }
                                     <div class="avatar-placeholder" style="${user.profile_picture_url ? 'display:none;' : 'display:flex;'} align-items:center; justify-content:center; width:48px; height:48px; border-radius:50%; background:linear-gradient(135deg, #9333ea 0%, #3b82f6 100%); color:white; font-weight:700; font-size:1.1rem;">
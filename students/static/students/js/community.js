@@ -6,37 +6,94 @@ document.addEventListener('DOMContentLoaded', function() {
     const postMessage = document.getElementById('postMessage');
     const postsContainer = document.getElementById('postsContainer');
 
-    // Load posts
+    // Feed pagination state
+    const PAGE_SIZE = 20;
+    let nextCursor = null;
+    let isLoadingPosts = false;
+    let hasMorePosts = true;
+    let feedSentinel = null;
+
+    const emptyFeedHtml = '<div style="text-align: center; padding: 2rem; color: #6b7280; font-size: 0.9375rem;">No community posts yet. Be the first to share!</div>';
+
+    // Load the next page of posts
     async function loadPosts() {
+        if (isLoadingPosts || !hasMorePosts) return;
+        isLoadingPosts = true;
+
         try {
-            const response = await fetch('/api/posts/');
+            const params = new URLSearchParams({ limit: PAGE_SIZE });
+            if (nextCursor) params.set('cursor', nextCursor);
+
+            const response = await fetch(`/api/posts/?${params.toString()}`);
             const data = await response.json();
             
             if (data.success) {
-                displayPosts(data.posts || []);
-            } else {
-                postsContainer.innerHTML = '<div style="text-align: center; padding: 2rem; color: #6b7280; font-size: 0.9375rem;">No community posts yet. Be the first to share!</div>';
+                displayPosts(data.posts || [], !nextCursor);
+                nextCursor = data.next_cursor || null;
+                hasMorePosts = Boolean(nextCursor);
+                updateFeedSentinel();
+            } else if (!nextCursor) {
+                postsContainer.innerHTML = emptyFeedHtml;
             }
         } catch (error) {
             console.error('Error loading posts:', error);
-            postsContainer.innerHTML = '<div style="text-align: center; padding: 2rem; color: #6b7280; font-size: 0.9375rem;">No community posts yet. Be the first to share!</div>';
+            if (!nextCursor) {
+                postsContainer.innerHTML = emptyFeedHtml;
+            }
+        } finally {
+            isLoadingPosts = false;
         }
     }
 
-    // Display posts
-    function displayPosts(posts) {
-        if (posts.length === 0) {
-            postsContainer.innerHTML = '<div style="text-align: center; padding: 2rem; color: #6b7280;">No posts yet. Be the first to share!</div>';
-            return;
+    // Display posts (replace on the first page, append afterwards)
+    function displayPosts(posts, firstPage) {
+        if (firstPage) {
+            if (posts.length === 0) {
+                postsContainer.innerHTML = '<div style="text-align: center; padding: 2rem; color: #6b7280;">No posts yet. Be the first to share!</div>';
+                return;
+            }
+            postsContainer.innerHTML = '';
         }
 
-        postsContainer.innerHTML = '';
         posts.forEach(post => {
             const postCard = createPostCard(post);
             postsContainer.appendChild(postCard);
         });
     }
 
+    // Keep a sentinel below the last post; when it scrolls into view, fetch the next page
+    const feedObserver = 'IntersectionObserver' in window
+        ? new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                loadPosts();
+            }
+        }, { rootMargin: '400px 0px' })
+        : null;
+
+    function updateFeedSentinel() {
+        if (!feedSentinel) {
+            feedSentinel = document.createElement('div');
+            feedSentinel.className = 'feed-sentinel';
+            feedSentinel.style.cssText = 'text-align: center; padding: 1rem; color: #9ca3af; font-size: 0.875rem;';
+            if (!feedObserver) {
+                feedSentinel.style.cursor = 'pointer';
+                feedSentinel.addEventListener('click', () => loadPosts());
+            }
+        }
+
+        if (hasMorePosts) {
+            feedSentinel.textContent = feedObserver ? 'Loading more posts...' : 'Load more posts';
+            postsContainer.after(feedSentinel);
+            if (feedObserver) {
+                // Re-observe so a sentinel that is still on screen triggers the next page
+                feedObserver.unobserve(feedSentinel);
+                feedObserver.observe(feedSentinel);
+            }
+        } else {
+            feedSentinel.remove();
+        }
+    }
+
     // Convert to Philippine Time (PHT/UTC+8)
     function formatPhilippineTime(dateString) {
         if (!dateString) return 'N/A';
@@ -149,8 +206,12 @@ document.addEventListener('DOMContentLoaded', function() {
             </div>
         `;
 
-        // Load likes and comments
-        loadLikesForPost(post.id);
+        // Like state is embedded in the feed response; only comments are fetched per post
+        if (post.like_count !== undefined) {
+            renderLikeState(card.querySelector('.post-like-btn'), post.like_count, post.is_liked);
+        } else {
+            loadLikesForPost(post.id);
+        }
         loadCommentsForPost(post.id);
         
         // Update comment count display if it exists
@@ -206,34 +267,35 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    // Render like count and liked state on a like button
+    function renderLikeState(likeBtn, count, isLiked) {
+        if (!likeBtn) return;
+        const likeCount = likeBtn.querySelector('.like-count');
+        const likeIcon = likeBtn.querySelector('.like-icon');
+
+        likeCount.textContent = count || 0;
+
+        // Update icon color based on liked state
+        if (isLiked) {
+            likeIcon.style.fill = '#dc2626';
+            likeIcon.style.stroke = '#dc2626';
+            likeBtn.style.color = '#dc2626';
+        } else {
+            likeIcon.style.fill = 'none';
+            likeIcon.style.stroke = '#6b7280';
+            likeBtn.style.color = '#6b7280';
+        }
+    }
+
     // Load likes for post
     async function loadLikesForPost(postId) {
         try {
             const response = await fetch(`/api/posts/${postId}/likes/`);
             const data = await response.json();
             
-            const likeBtn = document.querySelector(`.post-like-btn[data-post-id="${postId}"]`);
-            if (likeBtn) {
-                const likeCount = likeBtn.querySelector('.like-count');
-                const likeIcon = likeBtn.querySelector('.like-icon');
-                
-                if (data.success) {
-                    const count = data.count || 0;
-                    const isLiked = data.is_liked || false;
-                    
-                    likeCount.textContent = count;
-                    
-                    // Update icon color based on liked state
-                    if (isLiked) {
-                        likeIcon.style.fill = '#dc2626';
-                        likeIcon.style.stroke = '#dc2626';
-                        likeBtn.style.color = '#dc2626';
-                    } else {
-                        likeIcon.style.fill = 'none';
-                        likeIcon.style.stroke = '#6b7280';
-                        likeBtn.style.color = '#6b7280';
-                    }
-                }
+            if (data.success) {
+                const likeBtn = document.querySelector(`.post-like-btn[data-post-id="${postId}"]`);
+                renderLikeState(likeBtn, data.count, data.is_liked);
             }
         } catch (error) {
             console.error('Error loading likes:', error);
@@ -267,7 +329,7 @@ document.addEventListener('DOMContentLoaded', function() {
                             commentDiv.innerHTML = `
                                 <div style="flex-shrink: 0;">
                                     ${profilePic ? 
-                                        `<img src="${escapeHtml(profilePic)}" alt="${escapeHtml(displayName)}" style="width: 36px; height: 36px; border-radius: 50%; object-fit: cover;" onerror="this.style.display='none'; this.nextElementSibling.style.display='flex';">` : 
+                                        `<picture style="display: contents;">${student.profile_picture_webp_url ? `<source srcset="${escapeHtml(student.profile_picture_webp_url)}" type="image/webp">` : ''}<img src="${escapeHtml(profilePic)}" alt="${escapeHtml(displayName)}" loading="lazy" style="width: 36px; height: 36px; border-radius: 50%; object-fit: cover;" onerror="this.parentElement.style.display='none'; this.parentElement.nextElementSibling.style.display='flex';"></picture>` : 
                                         ''
                                     }
                                     <div style="${profilePic ? 'display:none;' : 'display:flex;'} align-items:center; justify-content:center; width:36px; height:36px; border-radius:50%; background:linear-gradient(135deg, #9333ea 0%, #3b82f6 100%); color:white; font-weight:700; font-size:0.875rem;">
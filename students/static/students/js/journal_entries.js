@@ -21,95 +21,204 @@ document.addEventListener('DOMContentLoaded', function () {
     let currentEditId = null;
     let currentDeleteId = null;
 
-    // ===== Initialize Entries from window.journalsData (passed from template) =====
-    let journalEntries = window.journalsData || [];
-    let filteredEntries = [...journalEntries];
+    // ===== Pagination state =====
+    // Entries arrive a page at a time from /api/journal/ with a snippet of their
+    // content; the full text is fetched from /api/journal/<id>/ when needed.
+    const PAGE_SIZE = 20;
+    let journalEntries = [];
+    let nextCursor = null;
+    let hasMoreEntries = true;
+    let isLoadingEntries = false;
+    let requestGeneration = 0;
+    let entriesSentinel = null;
+    const fullEntries = {};
+
+    function csrfToken() {
+        const input = document.querySelector('[name=csrfmiddlewaretoken]');
+        return input ? input.value : '';
+    }
 
-    console.log('Loaded journalEntries:', journalEntries);
-    console.log('Total entries:', journalEntries.length);
+    // ===== Load the next page (search and sort are applied by the server) =====
+    async function loadEntries() {
+        if (isLoadingEntries || !hasMoreEntries) return;
+        isLoadingEntries = true;
+        const generation = requestGeneration;
+
+        try {
+            const params = new URLSearchParams({ limit: PAGE_SIZE, sort: sortSelect ? sortSelect.value : 'newest' });
+            const searchTerm = searchInput ? searchInput.value.trim() : '';
+            if (searchTerm) params.set('search', searchTerm);
+            if (nextCursor) params.set('cursor', nextCursor);
+
+            const res = await fetch(`/api/journal/?${params.toString()}`);
+            const data = await res.json();
+            // A newer search or sort started while this page was loading
+            if (generation !== requestGeneration) return;
+
+            if (data.success) {
+                const entries = data.entries || [];
+                journalEntries = journalEntries.concat(entries);
+                appendEntries(entries);
+                nextCursor = data.next_cursor || null;
+                hasMoreEntries = Boolean(nextCursor);
+            } else {
+                console.error('Error loading entries:', data.error);
+                hasMoreEntries = false;
+            }
+        } catch (err) {
+            console.error('Error loading entries:', err);
+            if (generation === requestGeneration) hasMoreEntries = false;
+        } finally {
+            if (generation === requestGeneration) {
+                isLoadingEntries = false;
+                updateEmptyState();
+                updateEntriesSentinel();
+            }
+        }
+    }
 
-    // ===== Display Entries (table) =====
-    function displayEntries() {
-        console.log('displayEntries() called with', filteredEntries.length, 'entries');
-        // clear tbody
+    // Start over from the first page, e.g. after the search or sort changed
+    function resetEntries() {
+        requestGeneration++;
+        journalEntries = [];
+        nextCursor = null;
+        hasMoreEntries = true;
+        isLoadingEntries = false;
         if (entriesTbody) entriesTbody.innerHTML = '';
-        
-        if (filteredEntries.length === 0) {
-            if (emptyState) emptyState.style.display = 'block';
-            if (totalEntriesSpan) totalEntriesSpan.textContent = '0';
-            // hide table wrapper
-            const wrapper = document.querySelector('.table-wrapper');
-            if (wrapper) wrapper.style.display = 'none';
-            return;
-        }
-        
-        if (emptyState) emptyState.style.display = 'none';
-        if (totalEntriesSpan) totalEntriesSpan.textContent = filteredEntries.length;
-        const wrapper = document.querySelector('.table-wrapper');
-        if (wrapper) wrapper.style.display = 'block';
+        loadEntries();
+    }
 
-        filteredEntries.forEach(entry => {
+    // ===== Display Entries (table) =====
+    function appendEntries(entries) {
+        entries.forEach(entry => {
             const tr = document.createElement('tr');
             tr.dataset.id = entry.id;
-
-            const dateStr = entry.created_at ? new Date(entry.created_at).toLocaleString() : 'Unknown date';
-            const title = entry.title || 'Journal Entry';
-            const content = entry.content || '';
-
-            tr.innerHTML = `
-                <td style="padding:8px; border-bottom:1px solid #eee; vertical-align:top; max-width:300px; white-space:pre-wrap;">${escapeHtml(title)}</td>
-                <td style="padding:8px; border-bottom:1px solid #eee; vertical-align:top; white-space:pre-wrap; max-width:500px;">${escapeHtml(content)}</td>
-                <td style="padding:8px; border-bottom:1px solid #eee; vertical-align:top;">${escapeHtml(dateStr)}</td>
-                <td style="padding:8px; border-bottom:1px solid #eee; text-align:center;">
-                    <button class="edit-btn" data-id="${entry.id}">✏️</button>
-                    <button class="delete-btn" data-id="${entry.id}">🗑️</button>
-                </td>
-            `;
+            renderRow(tr, entry);
             entriesTbody.appendChild(tr);
         });
+    }
 
-        attachEntryButtons();
+    function renderRow(tr, entry) {
+        const dateStr = entry.created_at ? new Date(entry.created_at).toLocaleString() : 'Unknown date';
+        const title = entry.title || 'Journal Entry';
+        const content = entry.snippet || '';
+        const readMore = entry.truncated
+            ? ` <button class="read-more-btn" data-id="${entry.id}" style="background:none; border:none; color:#6366f1; cursor:pointer; padding:0;">Read more</button>`
+            : '';
+
+        tr.innerHTML = `
+            <td style="padding:8px; border-bottom:1px solid #eee; vertical-align:top; max-width:300px; white-space:pre-wrap;">${escapeHtml(title)}</td>
+            <td class="entry-content" style="padding:8px; border-bottom:1px solid #eee; vertical-align:top; white-space:pre-wrap; max-width:500px;">${escapeHtml(content)}${entry.truncated ? '…' : ''}${readMore}</td>
+            <td style="padding:8px; border-bottom:1px solid #eee; vertical-align:top;">${escapeHtml(dateStr)}</td>
+            <td style="padding:8px; border-bottom:1px solid #eee; text-align:center;">
+                <button class="edit-btn" data-id="${entry.id}">✏️</button>
+                <button class="delete-btn" data-id="${entry.id}">🗑️</button>
+            </td>
+        `;
     }
 
-    // ===== Attach Edit/Delete Buttons =====
-    function attachEntryButtons() {
-        document.querySelectorAll('.edit-btn').forEach(btn => {
-            btn.addEventListener('click', () => openEditModal(btn.dataset.id));
-        });
+    function updateEmptyState() {
+        const wrapper = document.querySelector('.table-wrapper');
+        const empty = journalEntries.length === 0 && !hasMoreEntries;
+        if (emptyState) emptyState.style.display = empty ? 'block' : 'none';
+        if (wrapper) wrapper.style.display = empty ? 'none' : 'block';
+    }
 
-        document.querySelectorAll('.delete-btn').forEach(btn => {
-            btn.addEventListener('click', () => openDeleteModal(btn.dataset.id));
+    // Keep a sentinel below the table; when it scrolls into view, fetch the next page
+    const entriesObserver = 'IntersectionObserver' in window
+        ? new IntersectionObserver(items => {
+            if (items.some(item => item.isIntersecting)) {
+                loadEntries();
+            }
+        }, { rootMargin: '400px 0px' })
+        : null;
+
+    function updateEntriesSentinel() {
+        if (!entriesSentinel) {
+            entriesSentinel = document.createElement('div');
+            entriesSentinel.className = 'entries-sentinel';
+            entriesSentinel.style.cssText = 'text-align: center; padding: 1rem; color: #9ca3af; font-size: 0.875rem;';
+            if (!entriesObserver) {
+                entriesSentinel.style.cursor = 'pointer';
+                entriesSentinel.addEventListener('click', () => loadEntries());
+            }
+        }
+
+        if (hasMoreEntries) {
+            entriesSentinel.textContent = entriesObserver ? 'Loading more entries...' : 'Load more entries';
+            entriesContainer.appendChild(entriesSentinel);
+            if (entriesObserver) {
+                // Re-observe so a sentinel that is still on screen triggers the next page
+                entriesObserver.unobserve(entriesSentinel);
+                entriesObserver.observe(entriesSentinel);
+            }
+        } else {
+            entriesSentinel.remove();
+        }
+    }
+
+    // ===== Full content, fetched once per entry =====
+    async function fetchFullEntry(id) {
+        if (fullEntries[id]) return fullEntries[id];
+        const res = await fetch(`/api/journal/${id}/`);
+        const data = await res.json();
+        if (!data.success) throw new Error(data.error || 'Could not load entry');
+        fullEntries[id] = data.entry;
+        return data.entry;
+    }
+
+    // ===== Row buttons (delegated, so appended pages need no extra wiring) =====
+    if (entriesTbody) {
+        entriesTbody.addEventListener('click', async (e) => {
+            const btn = e.target.closest('button');
+            if (!btn) return;
+            const id = btn.dataset.id;
+
+            if (btn.classList.contains('edit-btn')) {
+                openEditModal(id);
+            } else if (btn.classList.contains('delete-btn')) {
+                openDeleteModal(id);
+            } else if (btn.classList.contains('read-more-btn')) {
+                btn.disabled = true;
+                try {
+                    const entry = await fetchFullEntry(id);
+                    const cell = btn.closest('td');
+                    if (cell) cell.textContent = entry.content || '';
+                } catch (err) {
+                    console.error('Error loading entry:', err);
+                    btn.disabled = false;
+                }
+            }
         });
     }
 
     // ===== Search & Sort =====
-    function filterAndSort() {
-        const searchTerm = (searchInput.value || '').toLowerCase();
-        filteredEntries = journalEntries.filter(e =>
-            (e.title || '').toLowerCase().includes(searchTerm) ||
-            (e.content || '').toLowerCase().includes(searchTerm)
-        );
-
-        const sortVal = sortSelect.value || 'newest';
-        filteredEntries.sort((a, b) => {
-            const dateA = new Date(a.created_at || 0);
-            const dateB = new Date(b.created_at || 0);
-            return sortVal === 'newest' ? dateB - dateA : dateA - dateB;
+    let searchTimer = null;
+    if (searchInput) {
+        searchInput.addEventListener('input', () => {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(resetEntries, 300);
         });
-
-        displayEntries();
     }
-
-    if (searchInput) searchInput.addEventListener('input', filterAndSort);
-    if (sortSelect) sortSelect.addEventListener('change', filterAndSort);
+    if (sortSelect) sortSelect.addEventListener('change', resetEntries);
 
     // ===== Edit Journal Entry =====
-    function openEditModal(id) {
-        currentEditId = id;
+    async function openEditModal(id) {
         const entry = journalEntries.find(e => e.id == id);
         if (!entry) return;
-        editTitle.value = entry.title || '';
-        editTextarea.value = entry.content || '';
+
+        let full;
+        try {
+            full = await fetchFullEntry(id);
+        } catch (err) {
+            console.error('Error loading entry:', err);
+            alert('Could not load this entry. Please try again.');
+            return;
+        }
+
+        currentEditId = id;
+        editTitle.value = full.title || '';
+        editTextarea.value = full.content || '';
         // show modal as flex so CSS centering works
         if (editModal) {
             editModal.style.display = 'flex';
@@ -138,30 +247,42 @@ document.addEventListener('DOMContentLoaded', function () {
                 return;
             }
 
-            const index = journalEntries.findIndex(e => e.id == currentEditId);
-            if (index > -1) journalEntries[index].content = newText;
-            if (index > -1) journalEntries[index].title = newTitle;
-
             try {
                 const res = await fetch(`/students/journal/${currentEditId}/edit/`, {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json',
-                        'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value || ''
+                        'X-CSRFToken': csrfToken()
                     },
                     body: JSON.stringify({ title: newTitle, content: newText })
                 });
                 const data = await res.json();
-                console.log('Edit response:', data);
+                if (data.success) {
+                    updateEditedEntry(data);
+                } else {
+                    alert(data.error || 'Could not save changes');
+                }
             } catch (err) {
                 console.error('Edit error:', err);
             }
 
-            filterAndSort();
             closeEditModalFunc();
         });
     }
 
+    function updateEditedEntry(data) {
+        const entry = journalEntries.find(e => e.id == data.id);
+        if (!entry) return;
+        const full = fullEntries[data.id] || {};
+        fullEntries[data.id] = { ...full, id: data.id, title: data.title, content: data.content };
+
+        entry.title = data.title;
+        entry.snippet = data.content;
+        entry.truncated = false;
+        const tr = entriesTbody.querySelector(`tr[data-id="${data.id}"]`);
+        if (tr) renderRow(tr, entry);
+    }
+
     // ===== Delete Journal Entry =====
     function openDeleteModal(id) {
         currentDeleteId = id;
@@ -179,24 +300,33 @@ document.addEventListener('DOMContentLoaded', function () {
     if (confirmDeleteBtn) {
         confirmDeleteBtn.addEventListener('click', async () => {
             if (!currentDeleteId) return;
-
-            journalEntries = journalEntries.filter(e => e.id != currentDeleteId);
+            const id = currentDeleteId;
 
             try {
-                const res = await fetch(`/students/journal/${currentDeleteId}/delete/`, {
+                const res = await fetch(`/students/journal/${id}/delete/`, {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json',
-                        'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value || ''
+                        'X-CSRFToken': csrfToken()
                     }
                 });
                 const data = await res.json();
-                console.log('Delete response:', data);
+                if (data.success) {
+                    journalEntries = journalEntries.filter(e => e.id != id);
+                    delete fullEntries[id];
+                    const tr = entriesTbody.querySelector(`tr[data-id="${id}"]`);
+                    if (tr) tr.remove();
+                    if (totalEntriesSpan) {
+                        totalEntriesSpan.textContent = Math.max(0, (parseInt(totalEntriesSpan.textContent, 10) || 1) - 1);
+                    }
+                    updateEmptyState();
+                } else {
+                    alert(data.error || 'Could not delete entry');
+                }
             } catch (err) {
                 console.error('Delete error:', err);
             }
 
-            filterAndSort();
             closeDeleteModalFunc();
         });
     }
@@ -213,6 +343,5 @@ document.addEventListener('DOMContentLoaded', function () {
     }
 
     // ===== Initialize =====
-    console.log('Initializing displayEntries');
-    displayEntries();
+    loadEntries();
 });
@@ -58,6 +58,24 @@ if (profileForm) {
                 profileMessage.textContent = data.message || 'Profile updated successfully!';
                 profileMessage.style.display = 'block';
                 
+                // A new picture is resized and uploaded in the background; wait for it
+                if (data.profile_picture && data.student) {
+                    let picture = data.profile_picture;
+                    if (picture.status === 'processing') {
+                        profileMessage.textContent = 'Profile updated. Processing your new picture...';
+                        picture = await waitForProfilePicture(picture.status_url);
+                    }
+                    if (picture.status === 'done') {
+                        data.student.profile_picture_url = picture.url;
+                        profileMessage.textContent = data.message || 'Profile updated successfully!';
+                    } else {
+                        data.student.profile_picture_url = data.profile_picture.placeholder_url;
+                        profileMessage.textContent = picture.status === 'failed'
+                            ? 'Profile updated, but your new picture could not be processed.'
+                            : 'Profile updated. Your new picture will appear shortly.';
+                    }
+                }
+                
                 // Update profile pic in navbar if changed (works for both admin and user navbars)
                 if (data.student) {
                     const navbarProfilePic = document.getElementById('navbarProfilePic');
@@ -131,6 +149,23 @@ if (profileForm) {
     });
 }
 
+// Poll a background profile picture job until it finishes (or ~30s pass)
+async function waitForProfilePicture(statusUrl) {
+    for (let attempt = 0; attempt < 30; attempt++) {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        try {
+            const response = await fetch(statusUrl);
+            const job = await response.json();
+            if (!job.success || job.status !== 'processing') {
+                return job;
+            }
+        } catch (error) {
+            console.error('Error checking profile picture:', error);
+        }
+    }
+    return { status: 'processing' };
+}
+
 // Profile Dropdown
 const profilePic = document.getElementById('profilePic');
 const profileDropdown = document.getElementById('profileDropdown');
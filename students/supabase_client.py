@@ -1,10 +1,245 @@
-from supabase import create_client
+from supabase import Client, AsyncClient
+from postgrest import SyncPostgrestClient, AsyncPostgrestClient
+from storage3 import SyncStorageClient, AsyncStorageClient
+import asyncio
 import os
+import random
+import threading
+import time
+import weakref
+import httpx
 from dotenv import load_dotenv
+from .instrumentation import InstrumentedTransport, AsyncInstrumentedTransport
 
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+# HTTP tuning for the Supabase REST/Storage connections (all optional)
+SUPABASE_HTTP2 = os.getenv("SUPABASE_HTTP2", "true").lower() in ("1", "true", "yes")
+SUPABASE_CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "3"))
+SUPABASE_READ_TIMEOUT = float(os.getenv("SUPABASE_READ_TIMEOUT", "10"))
+SUPABASE_POOL_TIMEOUT = float(os.getenv("SUPABASE_POOL_TIMEOUT", "5"))
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20"))
+SUPABASE_MAX_KEEPALIVE = int(os.getenv("SUPABASE_MAX_KEEPALIVE", "10"))
+SUPABASE_KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+SUPABASE_READ_RETRIES = int(os.getenv("SUPABASE_READ_RETRIES", "2"))
+SUPABASE_RETRY_BACKOFF = float(os.getenv("SUPABASE_RETRY_BACKOFF", "0.1"))
+
+
+class RetryTransport(httpx.BaseTransport):
+    """Retry idempotent requests on transient failures with jittered exponential backoff.
+
+    Only GET/HEAD/OPTIONS are retried, so inserts, updates, deletes and RPC calls
+    (which PostgREST issues as POST) are never replayed.
+    """
+
+    RETRY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+    RETRY_STATUSES = frozenset({502, 503, 504})
+    RETRY_ERRORS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+
+    def __init__(self, transport, retries=SUPABASE_READ_RETRIES, backoff=SUPABASE_RETRY_BACKOFF):
+        self._transport = transport
+        self.retries = retries
+        self.backoff = backoff
+
+    def handle_request(self, request):
+        if request.method not in self.RETRY_METHODS:
+            return self._transport.handle_request(request)
+
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                response = self._transport.handle_request(request)
+            except self.RETRY_ERRORS:
+                if last_attempt:
+                    raise
+            else:
+                if last_attempt or response.status_code not in self.RETRY_STATUSES:
+                    return response
+                response.close()
+            # Full jitter keeps concurrent workers from retrying in lockstep
+            time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncRetryTransport(httpx.AsyncBaseTransport):
+    """asyncio twin of RetryTransport, used by the async (ASGI) views."""
+
+    def __init__(self, transport, retries=SUPABASE_READ_RETRIES, backoff=SUPABASE_RETRY_BACKOFF):
+        self._transport = transport
+        self.retries = retries
+        self.backoff = backoff
+
+    async def handle_async_request(self, request):
+        if request.method not in RetryTransport.RETRY_METHODS:
+            return await self._transport.handle_async_request(request)
+
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                response = await self._transport.handle_async_request(request)
+            except RetryTransport.RETRY_ERRORS:
+                if last_attempt:
+                    raise
+            else:
+                if last_attempt or response.status_code not in RetryTransport.RETRY_STATUSES:
+                    return response
+                await response.aclose()
+            await asyncio.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def _pool_limits():
+    return httpx.Limits(
+        max_connections=SUPABASE_MAX_CONNECTIONS,
+        max_keepalive_connections=SUPABASE_MAX_KEEPALIVE,
+        keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY,
+    )
+
+
+def _timeouts():
+    return httpx.Timeout(SUPABASE_READ_TIMEOUT, connect=SUPABASE_CONNECT_TIMEOUT, pool=SUPABASE_POOL_TIMEOUT)
+
+
+def build_http_client(**kwargs):
+    """Create an httpx client with a bounded keep-alive pool, HTTP/2 and explicit timeouts.
+
+    httpx clients are safe to share between threads; the pool hands each thread its
+    own connection (or its own stream on a multiplexed HTTP/2 connection).
+    """
+    transport = httpx.HTTPTransport(
+        http2=SUPABASE_HTTP2,
+        limits=_pool_limits(),
+        retries=1,  # reconnect once if a pooled connection was dropped before use
+    )
+    transport = InstrumentedTransport(RetryTransport(transport))
+    return httpx.Client(transport=transport, timeout=_timeouts(), **kwargs)
+
+
+def build_async_http_client(**kwargs):
+    """Async counterpart of build_http_client; bound to the event loop that uses it."""
+    transport = httpx.AsyncHTTPTransport(http2=SUPABASE_HTTP2, limits=_pool_limits(), retries=1)
+    transport = AsyncInstrumentedTransport(AsyncRetryTransport(transport))
+    return httpx.AsyncClient(transport=transport, timeout=_timeouts(), **kwargs)
+
+
+class PooledClient(Client):
+    """Supabase client whose PostgREST and Storage sub-clients use tuned httpx pools.
+
+    Each sub-client gets its own httpx client because supabase-py rewrites the
+    base_url of whatever client it is handed.
+    """
+
+    def _init_postgrest_client(self, rest_url, headers, schema, **kwargs):
+        if getattr(self, '_rest_http', None) is None:
+            self._rest_http = build_http_client()
+        return SyncPostgrestClient(rest_url, headers=headers, schema=schema, http_client=self._rest_http)
+
+    def _init_storage_client(self, storage_url, headers, **kwargs):
+        if getattr(self, '_storage_http', None) is None:
+            self._storage_http = build_http_client(follow_redirects=True)
+        return SyncStorageClient(url=storage_url, headers=headers, http_client=self._storage_http)
+
+
+class AsyncPooledClient(AsyncClient):
+    """Async counterpart of PooledClient."""
+
+    def _init_postgrest_client(self, rest_url, headers, schema, **kwargs):
+        if getattr(self, '_rest_http', None) is None:
+            self._rest_http = build_async_http_client()
+        return AsyncPostgrestClient(rest_url, headers=headers, schema=schema, http_client=self._rest_http)
+
+    def _init_storage_client(self, storage_url, headers, **kwargs):
+        if getattr(self, '_storage_http', None) is None:
+            self._storage_http = build_async_http_client(follow_redirects=True)
+        return AsyncStorageClient(url=storage_url, headers=headers, http_client=self._storage_http)
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def create_supabase_client(url=SUPABASE_URL, key=SUPABASE_KEY):
+    """Build a new pooled client with its sub-clients initialised up front."""
+    client = PooledClient.create(url, key)
+    # Touch the lazily created sub-clients now, under our lock, rather than racing
+    # to create them from several request threads later
+    client.postgrest
+    client.storage
+    return client
+
+
+def get_supabase_client():
+    """Return this process's shared Supabase client, creating it on first use.
+
+    The client is rebuilt after a fork (e.g. gunicorn --preload) so worker processes
+    never share sockets with their parent.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                _client = create_supabase_client()
+                _client_pid = pid
+    return _client
+
+
+# httpx async pools cannot be shared between event loops, so keep one client per loop.
+# Under uvicorn that is one per worker; under WSGI every async view runs in its own
+# short-lived loop, which is why the async views are opt-in (see ASYNC_VIEWS).
+_async_clients = weakref.WeakKeyDictionary()
+
+
+_async_override = None
+
+
+def install_client(client, async_client=None):
+    """Replace the process's Supabase client, e.g. with students.fake_supabase.FakeSupabase.
+
+    Used by offline tests and benchmarks; the async views get `async_client`, or an
+    async wrapper around a fake client when none is given.
+    """
+    global _client, _client_pid, _async_override
+    from .fake_supabase import FakeSupabase, AsyncFakeSupabase
+    if async_client is None and isinstance(client, FakeSupabase):
+        async_client = AsyncFakeSupabase(client)
+    with _client_lock:
+        _client = client
+        _client_pid = os.getpid()
+        _async_override = async_client
+        _async_clients.clear()
+    # The new client may have different tables; probe it on first use
+    from .repository import reset_schema
+    reset_schema()
+
+
+async def get_async_supabase_client():
+    """Return the Supabase async client for the running event loop."""
+    if _async_override is not None:
+        return _async_override
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = await AsyncPooledClient.create(SUPABASE_URL, SUPABASE_KEY)
+        client.postgrest
+        client.storage
+        _async_clients[loop] = client
+    return client
+
+
+class _LazySupabase:
+    """Module-level stand-in so `from .supabase_client import supabase` keeps working."""
+
+    def __getattr__(self, name):
+        return getattr(get_supabase_client(), name)
+
+
+supabase = _LazySupabase()
@@ -0,0 +1,801 @@
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import struct
+import tempfile
+import zlib
+from unittest import mock
+
+import httpx
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password, make_password
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from postgrest.exceptions import APIError
+
+from students import media, passwords, search, views, views_async
+from students.fake_supabase import DEFAULT_SCHEMA, FakeSupabase
+from students.images import UnsupportedImage, inspect_image, render_profile_picture
+from students.feed import LIKE_STATES_MAX_POSTS
+from students.models import Journal, Resource, Student
+from students.repository import FALLBACK_SCHEMA, get_repository, get_schema, refresh_schema
+from students.roles import with_admin_status
+from students.search import search_resources
+from students.supabase_client import AsyncRetryTransport, RetryTransport, install_client
+
+
+def encode_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def png_bytes(width=64, height=48):
+    output = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 120, 40)).save(output, format='PNG')
+    return output.getvalue()
+
+
+def png_header(width, height):
+    """A PNG claiming `width` x `height`, cut off where its pixel data would start."""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)) + chunk(b'IDAT', b'')
+
+
+class FakeSupabaseTestCase(TestCase):
+    """Runs the views against an in-memory Supabase (students/fake_supabase.py)."""
+
+    def setUp(self):
+        self.supabase = FakeSupabase()
+        install_client(self.supabase)
+        cache.clear()
+
+    def seed_student(self, username, **fields):
+        return self.supabase.seed('students', [{
+            'username': username, 'email': f'{username}@example.com', 'full_name': username.title(),
+            'password': '!', **fields,
+        }])[0]
+
+    def log_in(self, student, client=None, is_admin=None):
+        client = client or self.client
+        session_student = {key: student[key] for key in ('id', 'username', 'email', 'full_name')}
+        if is_admin is not None:
+            session_student = with_admin_status(session_student, is_admin)
+        session = client.session
+        session['student'] = session_student
+        session.save()
+        return client
+
+
+
+class FakeSupabaseTests(FakeSupabaseTestCase):
+    """The fake has to fail the way PostgREST does, or the views' error paths go untested."""
+
+    def test_unknown_names_fail_even_without_rows(self):
+        with self.assertRaises(APIError) as missing_column:
+            self.supabase.table('students').select('id, nickname').execute()
+        self.assertEqual(missing_column.exception.code, '42703')
+        with self.assertRaises(APIError) as missing_table:
+            self.supabase.table('anonymous_posts').select('id').execute()
+        self.assertEqual(missing_table.exception.code, 'PGRST205')
+
+    def test_unknown_filter_columns_fail_writes_too(self):
+        with self.assertRaises(APIError) as missing_column:
+            self.supabase.table('comments').delete().eq('author_id', 1).execute()
+        self.assertEqual(missing_column.exception.code, '42703')
+
+    def test_unique_columns_raise_unique_violations(self):
+        self.seed_student('taken')
+        with self.assertRaises(APIError) as duplicate:
+            self.supabase.table('students').insert({'username': 'taken', 'email': 'other@example.com'}).execute()
+        self.assertEqual(duplicate.exception.code, '23505')
+        self.assertIn('Key (username)=(taken)', duplicate.exception.details)
+
+    def test_quoted_or_values_match_literally(self):
+        self.seed_student('a,b', full_name='x)y')
+        self.seed_student('plain')
+        rows = self.supabase.table('students').select('username').or_('username.eq."a,b",full_name.eq."x)y"').execute().data
+        self.assertEqual(rows, [{'username': 'a,b'}])
+
+    def test_embedded_counts(self):
+        student = self.seed_student('author')
+        self.supabase.seed('posts', [{'content': 'one', 'student_id': student['id']}, {'content': 'two', 'student_id': student['id']}])
+        [row] = self.supabase.table('students').select('id, posts(count)').execute().data
+        self.assertEqual(row['posts'], [{'count': 2}])
+
+
+class RetryTransportTests(TestCase):
+
+    def transport(self, *outcomes, retry=RetryTransport):
+        """A retrying transport over a mock answering with `outcomes` in turn (status codes or exceptions)."""
+        self.attempts = []
+
+        def handler(request):
+            self.attempts.append(request.method)
+            outcome = outcomes[len(self.attempts) - 1]
+            if isinstance(outcome, Exception):
+                raise outcome
+            return httpx.Response(outcome)
+        return retry(httpx.MockTransport(handler), retries=2, backoff=0)
+
+    def test_reads_are_retried_on_transient_failures(self):
+        client = httpx.Client(transport=self.transport(503, httpx.ConnectError('reset'), 200))
+        self.assertEqual(client.get('http://supabase.local/rest/v1/posts').status_code, 200)
+        self.assertEqual(self.attempts, ['GET'] * 3)
+
+    def test_last_attempt_is_returned_or_raised(self):
+        client = httpx.Client(transport=self.transport(503, 503, 503))
+        self.assertEqual(client.get('http://supabase.local/').status_code, 503)
+        client = httpx.Client(transport=self.transport(*[httpx.ReadTimeout('slow')] * 3))
+        with self.assertRaises(httpx.ReadTimeout):
+            client.get('http://supabase.local/')
+        self.assertEqual(len(self.attempts), 3)
+
+    def test_writes_are_never_replayed(self):
+        client = httpx.Client(transport=self.transport(503, 200))
+        self.assertEqual(client.post('http://supabase.local/rest/v1/rpc/search_students').status_code, 503)
+        self.assertEqual(self.attempts, ['POST'])
+
+    def test_async_transport_retries_reads(self):
+        async def fetch():
+            async with httpx.AsyncClient(transport=self.transport(504, 200, retry=AsyncRetryTransport)) as client:
+                return (await client.get('http://supabase.local/')).status_code
+        self.assertEqual(asyncio.run(fetch()), 200)
+        self.assertEqual(self.attempts, ['GET'] * 2)
+
+
+class FeedTests(FakeSupabaseTestCase):
+
+    def seed_posts(self, count, **fields):
+        # Several posts share each timestamp, so pages split ties on id
+        return self.supabase.seed('posts', [{
+            'content': f'post {i}', 'status': 'approved', 'approved': True, 'is_anonymous': True,
+            'created_at': f'2025-01-01T00:00:{i // 3:02d}', **fields,
+        } for i in range(count)])
+
+    def test_cursor_pages_cover_every_approved_post_once(self):
+        posts = self.seed_posts(8)
+        self.seed_posts(2, status='pending', approved=False)
+
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 3, **({'cursor': cursor} if cursor else {})}
+            data = self.client.get(reverse('api_get_posts'), params).json()
+            self.assertTrue(data['success'])
+            self.assertLessEqual(len(data['posts']), 3)
+            seen += [post['id'] for post in data['posts']]
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+
+        newest_first = sorted(posts, key=lambda post: (post['created_at'], post['id']), reverse=True)
+        self.assertEqual(seen, [post['id'] for post in newest_first])
+
+    def test_malformed_cursors_are_rejected(self):
+        for payload in (
+            {'created_at': '2025-01-01T00:00:00"),id.gt.(0', 'id': 1},
+            {'created_at': 5, 'id': 1},
+            {'created_at': None, 'id': 1},
+            {'created_at': '2025-01-01T00:00:00', 'id': '1,id.gt.0'},
+        ):
+            response = self.client.get(reverse('api_get_posts'), {'cursor': encode_cursor(payload)})
+            self.assertEqual(response.status_code, 400, payload)
+        self.assertEqual(self.client.get(reverse('api_get_posts'), {'cursor': 'not base64'}).status_code, 400)
+
+    def test_feed_reports_counts_and_the_viewers_likes(self):
+        viewer, other = self.seed_student('viewer'), self.seed_student('other')
+        post = self.seed_posts(1)[0]
+        self.supabase.seed('likes', [
+            {'post_id': post['id'], 'student_id': viewer['id']},
+            {'post_id': post['id'], 'student_id': other['id']},
+        ])
+        self.supabase.seed('comments', [{'post_id': post['id'], 'student_id': other['id'], 'content': 'hi'}])
+        self.log_in(viewer)
+
+        [feed_post] = self.client.get(reverse('api_get_posts')).json()['posts']
+        self.assertEqual((feed_post['like_count'], feed_post['comments_count']), (2, 1))
+        self.assertTrue(feed_post['is_liked'])
+
+    def test_bulk_like_states(self):
+        viewer = self.seed_student('viewer')
+        liked, unliked = self.seed_posts(2)
+        self.supabase.seed('likes', [{'post_id': liked['id'], 'student_id': viewer['id']}])
+        self.log_in(viewer)
+
+        url = reverse('api_get_likes_bulk')
+        likes = self.client.get(url, {'ids': f"{liked['id']}, {unliked['id']},{liked['id']},"}).json()['likes']
+        self.assertEqual(likes, {
+            str(liked['id']): {'count': 1, 'is_liked': True},
+            str(unliked['id']): {'count': 0, 'is_liked': False},
+        })
+
+    def test_bulk_like_states_reject_bad_ids(self):
+        url = reverse('api_get_likes_bulk')
+        for ids in ('abc', '1,,x', '1.5'):
+            response = self.client.get(url, {'ids': ids})
+            self.assertEqual(response.status_code, 400, ids)
+            self.assertEqual(response.json(), {'success': False, 'error': 'ids must be integers'})
+        self.assertEqual(self.client.get(url).status_code, 400)
+
+    def test_bulk_like_states_count_unique_ids_against_the_limit(self):
+        ids = ','.join(['1'] * (LIKE_STATES_MAX_POSTS + 1))
+        self.assertEqual(self.client.get(reverse('api_get_likes_bulk'), {'ids': ids}).status_code, 200)
+
+    def test_keyset_continues_within_a_timestamp(self):
+        first, second, third = self.seed_posts(3)
+        older = self.seed_posts(1, created_at='2024-12-31T23:59:59')[0]
+        repo = get_repository()
+
+        rows = repo.approved_posts_page((second['created_at'], second['id']), 10).execute().data
+        self.assertEqual([row['id'] for row in rows], [first['id'], older['id']])
+
+    def test_keyset_values_are_quoted_in_the_filter(self):
+        query = get_repository().approved_posts_page(('2025-01-01T00:00:00+00:00', 7), 10)
+        [keyset] = [text for text in query._filter_text if text.startswith('or=')]
+        self.assertEqual(keyset, 'or=(created_at.lt."2025-01-01T00:00:00+00:00",'
+                                 'and(created_at.eq."2025-01-01T00:00:00+00:00",id.lt."7"))')
+
+
+class AdminRoleTests(FakeSupabaseTestCase):
+
+    def stats_status(self, client):
+        return client.get(reverse('admin_get_stats')).status_code
+
+    def test_deleted_admin_loses_access_despite_session_flag(self):
+        alice = self.seed_student('alice', is_admin=True)
+        bob = self.seed_student('bob', is_admin=True)
+        self.supabase.seed('admins', [{'student_id': alice['id']}, {'student_id': bob['id']}])
+        alice_client = self.log_in(alice, is_admin=True)
+        bob_client = self.log_in(bob, self.client_class(), is_admin=True)
+        self.assertEqual(self.stats_status(bob_client), 200)
+
+        response = alice_client.delete(reverse('admin_delete_user', args=[bob['id']]))
+        self.assertTrue(response.json()['success'])
+        self.assertEqual(self.stats_status(bob_client), 403)
+
+    def test_demoted_admin_loses_access_despite_session_flag(self):
+        alice = self.seed_student('alice', is_admin=True)
+        bob = self.seed_student('bob', is_admin=True)
+        alice_client = self.log_in(alice, is_admin=True)
+        bob_client = self.log_in(bob, self.client_class(), is_admin=True)
+        self.assertEqual(self.stats_status(bob_client), 200)
+
+        # admin_update_user has no route; call it with alice's session
+        request = RequestFactory().post('/', json.dumps({'is_admin': False}), content_type='application/json')
+        request.session = alice_client.session
+        self.assertTrue(json.loads(views.admin_update_user(request, bob['id']).content)['success'])
+        self.assertEqual(self.stats_status(bob_client), 403)
+
+    def test_non_admin_is_refused(self):
+        self.log_in(self.seed_student('carol'), is_admin=False)
+        self.assertEqual(self.stats_status(self.client), 403)
+
+
+class AdminStatsTests(FakeSupabaseTestCase):
+
+    def test_one_count_request_per_counter(self):
+        admin = self.seed_student('admin')
+        self.seed_student('member')
+        self.supabase.seed('posts', [{'content': c, 'status': status} for c, status in
+                                     (('a', 'approved'), ('b', 'pending'), ('c', 'pending'))])
+        self.supabase.seed('wellness_resources', [{'name': 'Helpline'}])
+        self.log_in(admin, is_admin=True)
+        get_schema()
+
+        calls = self.supabase.calls
+        stats = self.client.get(reverse('admin_get_stats')).json()['stats']
+        self.assertEqual(stats, {'user_count': 2, 'post_count': 3, 'pending_count': 2, 'resource_count': 1})
+        self.assertEqual(self.supabase.calls - calls, 4)
+
+
+class AdminUsersTests(FakeSupabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.admin = self.seed_student('admin')
+        self.log_in(self.admin, is_admin=True)
+        get_schema()
+
+    def users(self, **params):
+        data = self.client.get(reverse('admin_get_users'), params).json()
+        self.assertTrue(data['success'], data)
+        return data['users']
+
+    def test_post_counts_are_embedded_in_the_page_query(self):
+        members = [self.seed_student(f'member{i}') for i in range(5)]
+        self.supabase.seed('posts', [{'content': 'x', 'student_id': members[0]['id']}] * 3
+                           + [{'content': 'y', 'student_id': members[1]['id']}])
+
+        calls = self.supabase.calls
+        users = self.users()
+        self.assertEqual(self.supabase.calls - calls, 1)
+        counts = {user['username']: user['post_count'] for user in users}
+        self.assertEqual(counts, {'admin': 0, 'member0': 3, 'member1': 1, 'member2': 0, 'member3': 0, 'member4': 0})
+        self.assertFalse(any('password' in user for user in users))
+
+    def test_search_uses_the_ranked_function(self):
+        # Best match first, not newest first
+        self.seed_student('ali', created_at='2025-01-01T00:00:00')
+        self.seed_student('natalie', created_at='2025-02-01T00:00:00')
+        self.seed_student('bob')
+        with mock.patch.object(self.supabase, 'rpc', wraps=self.supabase.rpc) as rpc:
+            self.assertEqual([user['username'] for user in self.users(search='ali')], ['ali', 'natalie'])
+        self.assertEqual([call.args for call in rpc.call_args_list], [('search_students', {'search': 'ali'})])
+
+    def test_search_falls_back_to_ilike_without_the_function(self):
+        self.addCleanup(search._missing_functions.discard, 'search_students')
+        del self.supabase.functions['search_students']
+        self.seed_student('o,neil', full_name='O(Neil)')
+        self.seed_student('bob')
+        with self.assertLogs('students.search', 'WARNING'):
+            self.assertEqual([user['username'] for user in self.users(search='o,n')], ['o,neil'])
+        # Not retried once known to be missing
+        calls = self.supabase.calls
+        self.assertEqual([user['username'] for user in self.users(search='(neil)')], ['o,neil'])
+        self.assertEqual(self.supabase.calls - calls, 1)
+
+
+class AdminStatusCacheTests(FakeSupabaseTestCase):
+
+    def admin_calls(self, student):
+        request = RequestFactory().get('/')
+        request.session = self.log_in(student).session
+        calls = self.supabase.calls
+        self.assertTrue(views.is_admin(request))
+        self.assertTrue(views.is_admin(request))
+        return self.supabase.calls - calls
+
+    def test_resolved_once_per_request_then_cached_per_student(self):
+        admin = self.seed_student('dana')
+        self.supabase.seed('admins', [{'student_id': admin['id']}])
+
+        self.assertEqual(self.admin_calls(admin), 1)
+        self.assertEqual(self.admin_calls(admin), 0)
+
+
+class AsyncViewTests(FakeSupabaseTestCase):
+    """views_async must answer like views.py; routing to them depends on ASYNC_VIEWS, so call them directly."""
+
+    def request(self, method, student=None, is_admin=None):
+        request = getattr(RequestFactory(), method)('/', {'limit': 5} if method == 'get' else None)
+        request.session = self.log_in(student, self.client_class(), is_admin).session if student else self.client.session
+        return request
+
+    def test_feed_matches_the_sync_view(self):
+        reader = self.seed_student('reader')
+        posts = self.supabase.seed('posts', [{
+            'content': f'post {i}', 'status': 'approved', 'approved': True, 'is_anonymous': False,
+            'student_id': reader['id'], 'created_at': f'2025-01-01T00:00:{i:02d}',
+        } for i in range(7)])
+        self.supabase.seed('likes', [{'post_id': posts[-1]['id'], 'student_id': reader['id']}])
+
+        sync = json.loads(views.get_anonymous_posts(self.request('get', reader)).content)
+        result = json.loads(async_to_sync(views_async.get_anonymous_posts)(self.request('get', reader)).content)
+        self.assertEqual(result, sync)
+        self.assertTrue(result['posts'][0]['is_liked'])
+
+    def test_delete_user_logs_failed_cleanup(self):
+        # comments without student_id: deleting the user's comments fails, the rest goes ahead
+        schema = {table: [column for column in columns if (table, column) != ('comments', 'student_id')]
+                  for table, columns in DEFAULT_SCHEMA.items()}
+        self.supabase = FakeSupabase(schema=schema)
+        install_client(self.supabase)
+        admin = self.seed_student('admin', is_admin=True)
+        user = self.seed_student('user')
+        [post] = self.supabase.seed('posts', [{'content': 'x', 'student_id': user['id']}])
+        self.supabase.seed('likes', [{'post_id': post['id'], 'student_id': admin['id']}])
+
+        with self.assertLogs('students.views_async', 'WARNING') as logs:
+            response = async_to_sync(views_async.admin_delete_user)(self.request('delete', admin, True), user['id'])
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertIn(f"Error cleaning up user {user['id']}", logs.output[0])
+        self.assertEqual([row['id'] for row in self.supabase.tables['students'].rows], [admin['id']])
+        self.assertEqual(self.supabase.tables['likes'].rows, [])
+        self.assertEqual(self.supabase.tables['posts'].rows, [])
+
+
+class LocalStudentTests(FakeSupabaseTestCase):
+
+    def save_journal(self, content):
+        response = self.client.post(reverse('save_journal'), json.dumps({'content': content}),
+                                    content_type='application/json')
+        self.assertTrue(response.json()['success'], response.content)
+        return Journal.objects.get(pk=response.json()['id'])
+
+    def test_deleted_student_is_looked_up_again(self):
+        self.log_in(self.seed_student('kim'))
+        first = self.save_journal('first')
+        first.student_id.delete()
+
+        second = self.save_journal('second')
+        self.assertTrue(Student.objects.filter(pk=second.student_id_id, email='kim@example.com').exists())
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SignupTests(FakeSupabaseTestCase):
+
+    def sign_up(self, username, email):
+        return self.client.post(reverse('signup'), {
+            'username': username, 'full_name': 'New Student', 'email': email,
+            'password': 'secret123', 'confirm_password': 'secret123', 'account_type': 'user',
+        })
+
+    def usernames(self):
+        return [row['username'] for row in self.supabase.tables['students'].rows]
+
+    def test_new_account_is_created(self):
+        response = self.sign_up('newbie', 'newbie@example.com')
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+        self.assertEqual(self.usernames(), ['newbie'])
+
+    def test_taken_username_and_email_are_reported_from_one_query(self):
+        self.seed_student('taken')
+        calls = self.supabase.calls
+
+        response = self.sign_up('taken', 'taken@example.com')
+        self.assertEqual(self.supabase.calls - calls, 1)
+        self.assertContains(response, 'Username is already taken')
+        self.assertContains(response, 'Email is already taken')
+        self.assertEqual(self.usernames(), ['taken'])
+
+    def test_taken_email_alone_is_reported(self):
+        self.seed_student('taken')
+
+        response = self.sign_up('fresh', 'taken@example.com')
+        self.assertContains(response, 'Email is already taken')
+        self.assertNotContains(response, 'Username is already taken')
+        self.assertEqual(self.usernames(), ['taken'])
+
+
+class InlineExecutor:
+    """Stands in for the rehash pool, running each upgrade as it is submitted."""
+
+    def __init__(self, run=True):
+        self.run, self.submitted = run, []
+
+    def submit(self, function, *args):
+        self.submitted.append(args[0])
+        if self.run:
+            function(*args)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher',
+                                     'django.contrib.auth.hashers.PBKDF2PasswordHasher'])
+class PasswordRehashTests(FakeSupabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(passwords._pending.clear)
+        # An outdated hash: not the preferred hasher, and cheap to verify
+        self.old_hash = PBKDF2PasswordHasher().encode('secret-pass', 'saltsaltsalt', iterations=1)
+        self.student = self.seed_student('lee', password=self.old_hash)
+
+    def stored_hash(self):
+        return self.supabase.table('students').select('password').eq('id', self.student['id']).execute().data[0]['password']
+
+    def test_login_upgrades_an_outdated_hash(self):
+        with mock.patch('students.passwords._get_executor', return_value=InlineExecutor()):
+            response = self.client.post(reverse('login'), {'username': 'lee', 'password': 'secret-pass'})
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(self.stored_hash().startswith('md5$'))
+        self.assertTrue(check_password('secret-pass', self.stored_hash()))
+
+    def test_upgrade_never_overwrites_a_changed_password(self):
+        changed = make_password('new-pass')
+        self.supabase.table('students').update({'password': changed}).eq('id', self.student['id']).execute()
+        passwords._rehash(self.student['id'], self.old_hash, 'secret-pass')
+        self.assertEqual(self.stored_hash(), changed)
+
+    def test_backlog_is_bounded_and_deduplicated(self):
+        executor = InlineExecutor(run=False)
+        with mock.patch('students.passwords._get_executor', return_value=executor), \
+                mock.patch.multiple(passwords, PASSWORD_REHASH_WORKERS=1, PASSWORD_REHASH_QUEUE=1):
+            for student_id in (1, 1, 2, 3):
+                passwords.schedule_rehash(student_id, 'old', 'password')
+        self.assertEqual(executor.submitted, [1, 2])
+
+
+class ImageInspectionTests(TestCase):
+
+    def test_accepts_supported_formats(self):
+        self.assertEqual(inspect_image(io.BytesIO(png_bytes(64, 48)), 10_000), ('PNG', 64, 48))
+
+    def test_rejects_oversized_images_from_the_header(self):
+        # 100k x 100k pixels declared in 45 bytes; decoding it would need ~30 GB
+        with self.assertRaisesMessage(UnsupportedImage, 'too large'):
+            inspect_image(io.BytesIO(png_header(100_000, 100_000)), 40_000_000)
+        with self.assertRaisesMessage(UnsupportedImage, 'too large'):
+            inspect_image(io.BytesIO(png_bytes(64, 48)), 64 * 48 - 1)
+
+    def test_rejects_other_files(self):
+        bmp = io.BytesIO()
+        Image.new('RGB', (8, 8)).save(bmp, format='BMP')
+        for content in (b'<svg xmlns="http://www.w3.org/2000/svg"/>', bmp.getvalue()):
+            with self.assertRaises(UnsupportedImage):
+                inspect_image(io.BytesIO(content), 40_000_000)
+
+    def test_inspection_rewinds_the_file(self):
+        upload = SimpleUploadedFile('me.png', png_bytes(), 'image/png')
+        inspect_image(upload, 40_000_000)
+        self.assertEqual(upload.read(), png_bytes())
+
+    def test_rendering_checks_the_size_again(self):
+        with tempfile.NamedTemporaryFile(suffix='.upload') as spooled:
+            spooled.write(png_bytes(64, 48))
+            spooled.flush()
+            with self.assertRaises(UnsupportedImage):
+                render_profile_picture(spooled.name, 64 * 48 - 1)
+            self.assertEqual(len(render_profile_picture(spooled.name, 64 * 48)), 6)
+
+
+@mock.patch.object(media, 'PROFILE_PICTURE_WORKERS', 0)
+class ProfilePictureTests(FakeSupabaseTestCase):
+    """With PROFILE_PICTURE_WORKERS = 0 a job is finished before update_profile returns."""
+
+    def setUp(self):
+        super().setUp()
+        self.student = self.seed_student('pat')
+        self.log_in(self.student)
+
+    def upload(self, content, name='me.png', content_type='image/png'):
+        return self.client.post(reverse('update_profile'), {
+            'username': 'pat', 'email': 'pat@example.com',
+            'profile_picture': SimpleUploadedFile(name, content, content_type),
+        })
+
+    def stored(self):
+        return self.supabase.storage.objects.get(media.PROFILE_PICTURE_BUCKET, {})
+
+    def test_upload_reports_a_pollable_job(self):
+        picture = self.upload(png_bytes()).json()['profile_picture']
+        self.assertEqual(picture['status'], 'done')
+
+        status = self.client.get(picture['status_url']).json()
+        self.assertEqual((status['status'], status['url']), ('done', picture['url']))
+        self.assertIn(picture['url'].split(f'/{media.PROFILE_PICTURE_BUCKET}/')[1], self.stored())
+        [row] = self.supabase.table('students').select('profile_picture_url').eq('id', self.student['id']).execute().data
+        self.assertEqual(row['profile_picture_url'], picture['url'])
+        self.assertEqual(self.client.get(reverse('profile_picture_status', args=['unknown'])).status_code, 404)
+
+
+    def test_invalid_and_oversized_pictures_are_refused_before_any_work(self):
+        for content in (b'not an image at all', png_header(100_000, 100_000)):
+            with mock.patch.object(media, '_spool') as spool:
+                response = self.upload(content)
+            self.assertEqual(response.status_code, 400, response.content)
+            spool.assert_not_called()
+        self.assertEqual(self.stored(), {})
+
+    def test_renditions_are_stored_once_per_content(self):
+        content = png_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        url = self.upload(content).json()['profile_picture']['url']
+        self.assertTrue(url.endswith(f'/profile_pics/{digest}/400.jpg'), url)
+        expected = {f'profile_pics/{digest}/{size}.{extension}'
+                    for size in (400, 96, 48) for extension in ('jpg', 'webp')}
+        self.assertEqual(set(self.stored()), expected)
+        self.assertEqual(Image.open(io.BytesIO(self.stored()[f'profile_pics/{digest}/48.webp'])).size, (48, 36))
+
+        with mock.patch.object(media, '_render') as render:
+            self.assertEqual(self.upload(content).json()['profile_picture']['url'], url)
+        render.assert_not_called()
+
+    def test_unrenderable_upload_is_stored_as_is(self):
+        content = png_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        with mock.patch.object(media, '_render', return_value=[]):
+            url = self.upload(content).json()['profile_picture']['url']
+        self.assertTrue(url.endswith(f'/profile_pics/{digest}.png'), url)
+        self.assertEqual(self.stored(), {f'profile_pics/{digest}.png': content})
+
+
+class JournalPagingTests(FakeSupabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.student = self.seed_student('writer')
+        self.log_in(self.student)
+        self.owner = Student.objects.create(username='writer', email='writer@example.com')
+
+    def add_entries(self, count, student=None):
+        entries = [Journal.objects.create(student_id=student or self.owner, title=f'Entry {i}', content=f'note {i}')
+                   for i in range(count)]
+        # Equal timestamps, so the id tie-breaker decides the order
+        Journal.objects.filter(id__in=[entry.id for entry in entries]).update(created_at=entries[0].created_at)
+        return entries
+
+    def read_all(self, **params):
+        ids, cursor = [], None
+        while True:
+            query = {'limit': 2, **params, **({'cursor': cursor} if cursor else {})}
+            data = self.client.get(reverse('api_journal_entries'), query).json()
+            self.assertTrue(data['success'])
+            ids += [entry['id'] for entry in data['entries']]
+            cursor = data['next_cursor']
+            if not cursor:
+                return ids
+
+    def test_pages_in_both_orders_list_only_own_entries(self):
+        entries = self.add_entries(5)
+        other = Student.objects.create(username='someone', email='someone@example.com')
+        self.add_entries(2, student=other)
+
+        ids = [entry.id for entry in entries]
+        self.assertEqual(self.read_all(), ids[::-1])
+        self.assertEqual(self.read_all(sort='oldest'), ids)
+
+    def test_long_entries_are_snippets_until_opened(self):
+        entry = Journal.objects.create(student_id=self.owner, title='Long', content='x' * 500)
+
+        [summary] = self.client.get(reverse('api_journal_entries')).json()['entries']
+        self.assertTrue(summary['truncated'])
+        self.assertLess(len(summary['snippet']), 500)
+        full = self.client.get(reverse('api_journal_entry', args=[entry.id])).json()['entry']
+        self.assertEqual(full['content'], 'x' * 500)
+
+    def test_malformed_cursors_are_rejected(self):
+        for payload in ({'created_at': 5, 'id': 1}, {'created_at': None, 'id': 1}, {'created_at': 'later', 'id': 1}):
+            response = self.client.get(reverse('api_journal_entries'), {'cursor': encode_cursor(payload)})
+            self.assertEqual(response.status_code, 400, payload)
+
+
+LEGACY_SCHEMA = {
+    **{table: columns for table, columns in DEFAULT_SCHEMA.items() if table not in ('posts', 'likes', 'comments')},
+    'students': [column for column in DEFAULT_SCHEMA['students'] if column != 'is_admin'],
+    'anonymous_posts': ['id', 'content', 'approved', 'is_anonymous', 'student_id', 'created_at'],
+    'post_likes': ['id', 'post_id', 'student_id', 'created_at'],
+    'post_comments': ['id', 'post_id', 'student_id', 'content', 'created_at'],
+}
+
+
+class SchemaProbeTests(FakeSupabaseTestCase):
+
+    def test_detects_the_current_schema(self):
+        detected = refresh_schema().as_dict()
+        self.assertEqual(detected['posts'], 'posts')
+        self.assertTrue(all(detected[flag] for flag in ('status_column', 'post_counts', 'post_counters')))
+
+    def test_detects_the_legacy_schema_and_serves_the_feed(self):
+        self.supabase = FakeSupabase(schema=LEGACY_SCHEMA)
+        install_client(self.supabase)
+        out = io.StringIO()
+        call_command('supabase_schema', '--json', stdout=out)
+        self.assertEqual(json.loads(out.getvalue()), {
+            'posts': 'anonymous_posts', 'likes': 'post_likes', 'comments': 'post_comments',
+            'status_column': False, 'approved_column': True, 'login_columns': FALLBACK_SCHEMA.login_columns,
+            'post_counts': True, 'post_counters': False,
+        })
+
+        [post, _] = self.supabase.seed('anonymous_posts', [
+            {'content': 'shown', 'approved': True, 'created_at': '2025-01-02T00:00:00'},
+            {'content': 'pending', 'approved': False, 'created_at': '2025-01-01T00:00:00'},
+        ])
+        self.supabase.seed('post_likes', [{'post_id': post['id'], 'student_id': 1}])
+        [shown] = self.client.get(reverse('api_get_posts')).json()['posts']
+        self.assertEqual((shown['content'], shown['status'], shown['like_count']), ('shown', 'approved', 1))
+
+    def test_failed_refresh_keeps_the_detected_schema(self):
+        detected = refresh_schema()
+        with mock.patch('students.repository.detect_schema', side_effect=ConnectionError('unreachable')):
+            with self.assertRaises(ConnectionError):
+                refresh_schema()
+            self.assertIs(get_schema(), detected)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SchemaFallbackTests(FakeSupabaseTestCase):
+    """When the probe fails the app must still work against a project without the optional columns."""
+
+    def setUp(self):
+        super().setUp()
+        optional = {'students': {'is_admin'}, 'posts': {'status', 'like_count', 'comment_count'}}
+        schema = {table: [column for column in columns if column not in optional.get(table, ())]
+                  for table, columns in DEFAULT_SCHEMA.items()}
+        self.supabase = FakeSupabase(schema=schema)
+        install_client(self.supabase)
+        patcher = mock.patch('students.repository.detect_schema', side_effect=ConnectionError('unreachable'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_failed_probe_uses_the_fallback(self):
+        self.assertIs(get_schema(), FALLBACK_SCHEMA)
+
+    def test_login_and_post_creation_still_work(self):
+        self.seed_student('robin', password=make_password('secret-pass'))
+        response = self.client.post(reverse('login'), {'username': 'robin', 'password': 'secret-pass'})
+        self.assertRedirects(response, reverse('feed'), fetch_redirect_response=False)
+
+        response = self.client.post(reverse('api_create_post'), json.dumps({'content': 'hello'}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.content)
+        [post] = self.supabase.tables['posts'].rows
+        self.assertEqual((post['content'], post['approved']), ('hello', False))
+
+
+class PostCounterTests(FakeSupabaseTestCase):
+    """The fake's counter triggers against the recount in reconcile_post_counts."""
+
+    def setUp(self):
+        super().setUp()
+        author = self.seed_student('author')
+        self.first, self.second = self.supabase.seed('posts', [
+            {'content': 'one', 'student_id': author['id']}, {'content': 'two', 'student_id': author['id']},
+        ])
+
+    def counts(self, post):
+        [row] = self.supabase.table('posts').select('like_count, comment_count').eq('id', post['id']).execute().data
+        return row['like_count'], row['comment_count']
+
+    def reconcile(self):
+        out = io.StringIO()
+        call_command('reconcile_post_counts', verbosity=2, stdout=out)
+        return out.getvalue()
+
+    def test_triggers_keep_counts_current(self):
+        like = self.supabase.table('likes').insert({'post_id': self.first['id'], 'student_id': 1}).execute().data[0]
+        comment = self.supabase.table('comments').insert({'post_id': self.first['id'], 'content': 'hi'}).execute().data[0]
+        self.assertEqual(self.counts(self.first), (1, 1))
+
+        self.supabase.table('comments').update({'post_id': self.second['id']}).eq('id', comment['id']).execute()
+        self.supabase.table('likes').delete().eq('id', like['id']).execute()
+        self.assertEqual((self.counts(self.first), self.counts(self.second)), ((0, 0), (0, 1)))
+        self.assertIn('All post counts are correct', self.reconcile())
+
+    def test_reconcile_fixes_drift(self):
+        self.supabase.seed('likes', [{'post_id': self.first['id'], 'student_id': 1}])
+        # Written with the triggers disabled
+        self.supabase.tables['posts'].rows[0]['like_count'] = 5
+        self.supabase.tables['posts'].rows[1]['comment_count'] = 2
+
+        output = self.reconcile()
+        self.assertIn(f"post {self.first['id']}: like_count=1 comment_count=0", output)
+        self.assertIn(f"post {self.second['id']}: like_count=0 comment_count=0", output)
+        self.assertIn('Corrected the counts of 2 post(s)', output)
+        self.assertEqual((self.counts(self.first), self.counts(self.second)), ((1, 0), (0, 0)))
+
+    def test_reconcile_refuses_a_project_without_the_columns(self):
+        schema = {table: [column for column in columns if column not in ('like_count', 'comment_count')]
+                  for table, columns in DEFAULT_SCHEMA.items()}
+        install_client(FakeSupabase(schema=schema))
+        with self.assertRaisesMessage(CommandError, 'has no like_count/comment_count columns'):
+            self.reconcile()
+
+
+class ResourceSearchTests(TestCase):
+    """Runs on SQLite, where migration 0004 indexes resources with FTS5."""
+
+    def setUp(self):
+        self.in_title = Resource.objects.create(title='Coping with anxiety', description='Breathing', category='Guides')
+        self.in_description = Resource.objects.create(title='Sleep', description='Anxiety keeps you up', category='Guides')
+        self.in_category = Resource.objects.create(title='Helpline', description='Call us', category='Anxiety support')
+        Resource.objects.create(title='Study skills', description='Notes', category='Guides')
+
+    def titles(self, query, category=''):
+        return [resource.title for resource in search_resources(query, category)[:10]]
+
+    def test_prefix_matches_ranked_title_then_category_then_description(self):
+        self.assertEqual(self.titles('anx'), ['Coping with anxiety', 'Helpline', 'Sleep'])
+        self.assertEqual(search_resources('anx').count(), 3)
+        self.assertEqual(self.titles('anx', 'Guides'), ['Coping with anxiety', 'Sleep'])
+
+    def test_query_syntax_is_not_passed_through(self):
+        self.assertEqual(self.titles('"anxiety* OR (sleep'), [])
+        self.assertEqual(self.titles('anxiety -- sleep'), ['Sleep'])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.in_title.title = 'Coping with stress'
+        self.in_title.save()
+        self.in_category.delete()
+        self.assertEqual(self.titles('anx'), ['Sleep'])
+        self.assertEqual(self.titles('stress'), ['Coping with stress'])
+
+    def test_hub_pages_through_results(self):
+        response = self.client.get(reverse('resources_hub'), {'q': 'anx'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([resource.title for resource in response.context['resources']],
+                         ['Coping with anxiety', 'Helpline', 'Sleep'])
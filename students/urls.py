@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, views_async
+
+# The hot JSON endpoints have async twins for ASGI deployments (see views_async.py)
+api = views_async if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
     # Authentication URLs & Dashboard URLs
@@ -10,24 +14,28 @@ urlpatterns = [
     path('profile/', views.student_profile, name='profile_page'),
     path('profile/edit/', views.profile_edit, name='profile_edit'),
     path('api/update-profile/', views.update_profile, name='update_profile'),
+    path('api/profile-picture/<str:job_id>/', views.profile_picture_status, name='profile_picture_status'),
     path('api/change-password/', views.change_password, name='change_password'),
     path('about-us/', views.about_us, name='about_us'),
     
     # Journal URLs
     path('dashboard/save_journal/', views.save_journal_entry, name='save_journal'),
     path('journal_entries/', views.journal_entries_view, name='journal_entries'),
+    path('api/journal/', views.get_journal_entries, name='api_journal_entries'),
+    path('api/journal/<int:journal_id>/', views.get_journal_entry, name='api_journal_entry'),
     path('journal/<int:journal_id>/edit/', views.edit_journal_entry, name='edit_journal'),
     path('journal/<int:journal_id>/delete/', views.delete_journal_entry, name='delete_journal'),
     
     
     # Feed URLs
     path('feed/', views.feed_view, name='feed'),
-    path('api/posts/', views.get_anonymous_posts, name='api_get_posts'),
+    path('api/posts/', api.get_anonymous_posts, name='api_get_posts'),
     path('api/posts/create/', views.create_anonymous_post, name='api_create_post'),
-    path('api/posts/<str:post_id>/like/', views.like_post, name='api_like_post'),
-    path('api/posts/<str:post_id>/likes/', views.get_likes, name='api_get_likes'),
-    path('api/posts/<str:post_id>/comments/', views.get_comments, name='api_get_comments'),
-    path('api/posts/<str:post_id>/comments/create/', views.create_comment, name='api_create_comment'),
+    path('api/posts/likes/', api.get_likes_bulk, name='api_get_likes_bulk'),
+    path('api/posts/<str:post_id>/like/', api.like_post, name='api_like_post'),
+    path('api/posts/<str:post_id>/likes/', api.get_likes, name='api_get_likes'),
+    path('api/posts/<str:post_id>/comments/', api.get_comments, name='api_get_comments'),
+    path('api/posts/<str:post_id>/comments/create/', api.create_comment, name='api_create_comment'),
     path('toggle-like/<int:post_id>/', views.toggle_like, name='toggle_like'),
     path('add-comment/<int:post_id>/', views.add_comment, name='add_comment'),
     path('post/<int:post_id>/edit/', views.edit_post, name='edit_post'),
@@ -35,6 +43,7 @@ urlpatterns = [
 
     #Resource URLs
      path('resources/', views.resources_hub, name='resources_hub'),
+    path('api/wellness-resources/', views.get_wellness_resources, name='api_wellness_resources'),
     
     # Admin URLs
     path('admin/posts/', views.admin_posts_view, name='admin_posts'),
@@ -43,13 +52,14 @@ urlpatterns = [
     path('admin/resources/', views.admin_resources_view, name='admin_resources'),
     
     # Admin API URLs
-    path('api/admin/posts/', views.admin_get_posts, name='admin_get_posts'),
-    path('api/admin/posts/<int:post_id>/approve/', views.admin_approve_post, name='admin_approve_post'),
-    path('api/admin/posts/<int:post_id>/decline/', views.admin_decline_post, name='admin_decline_post'),
-    path('api/admin/posts/<int:post_id>/pending/', views.admin_pending_post, name='admin_pending_post'),
-    path('api/admin/posts/<int:post_id>/delete/', views.admin_delete_post, name='admin_delete_post'),
-    path('api/admin/users/', views.admin_get_users, name='admin_get_users'),
-    path('api/admin/users/<int:user_id>/delete/', views.admin_delete_user, name='admin_delete_user'),
+    path('api/admin/stats/', api.admin_get_stats, name='admin_get_stats'),
+    path('api/admin/posts/', api.admin_get_posts, name='admin_get_posts'),
+    path('api/admin/posts/<int:post_id>/approve/', api.admin_approve_post, name='admin_approve_post'),
+    path('api/admin/posts/<int:post_id>/decline/', api.admin_decline_post, name='admin_decline_post'),
+    path('api/admin/posts/<int:post_id>/pending/', api.admin_pending_post, name='admin_pending_post'),
+    path('api/admin/posts/<int:post_id>/delete/', api.admin_delete_post, name='admin_delete_post'),
+    path('api/admin/users/', api.admin_get_users, name='admin_get_users'),
+    path('api/admin/users/<int:user_id>/delete/', api.admin_delete_user, name='admin_delete_user'),
     
     # Utility URL for manually adding admin (temporary - remove after fixing admin accounts)
     path('add-admin-utility/', views.add_admin_utility, name='add_admin_utility'),
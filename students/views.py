@@ -4,33 +4,49 @@ from django.contrib import messages
 from django.contrib.auth.hashers import make_password, check_password
 from .forms import StudentSignUpForm, StudentLoginForm, AdminRegistrationForm
 from .supabase_client import supabase  # make sure you have supabase_client.py configured
+from .admin_stats import get_admin_stats, get_navbar_stats
+from .parallel import run_parallel
+from .passwords import verify_password
+from .accounts import find_taken_fields, duplicate_field, duplicate_message
+from .media import check_profile_picture, submit_profile_picture, get_job
+from .images import UnsupportedImage
+from .search import (
+    RESOURCES_PAGE_SIZE, STUDENT_SEARCH_COLUMNS, WELLNESS_SEARCH_COLUMNS, search_resources, resource_categories,
+    search_function_available, note_search_error,
+)
+from .filters import ilike_any
+from .roles import (
+    known_admin_status, cache_admin_status, invalidate_admin_status,
+    resolve_admin_status, admin_status_from_login_row, with_admin_status,
+)
+from .feed import (
+    LIKE_STATES_MAX_POSTS, decode_post_cursor, encode_post_cursor, parse_page_size, parse_id_list,
+    author_ids, author_name_map, tally_comment_counts, tally_like_states, stored_comment_counts,
+    stored_like_states, format_feed_post, attach_comment_authors, format_admin_posts, format_admin_user,
+)
+from .repository import get_repository
+from .journals import JOURNAL_PAGE_SIZE, JOURNAL_MAX_PAGE_SIZE, journal_page, format_journal
 from django.contrib.auth.decorators import login_required
 from .models import Post, Like, Comment, Student, Journal, Resource
 from .forms import PostForm 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
+from django.urls import reverse
+from django.core.paginator import Paginator
 from django.shortcuts import get_object_or_404
+from django.db.models import Count, Q
+from django.utils import timezone
+from datetime import datetime
+from httpx import ConnectError
 import json
+import logging
 
-# Optional PIL import for image processing
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
-    Image = None
-
+logger = logging.getLogger(__name__)
 
 # Home Page
 def home_view(request):
     return render(request, 'students/home.html')
 
-# About Us Page
-def about_us(request):
-    # Check if user is logged in to pass student data to template
-    student = request.session.get('student', None)
-    return render(request, 'students/about_us.html', {'student': student})
-
 # Journal Entries Page
 def journal_entries(request):
     student = request.session.get('student', None)
@@ -38,13 +54,6 @@ def journal_entries(request):
         return redirect('login')
     return render(request, 'students/journal_entries.html', {'student': student})
 
-# Resources Hub Page
-def resources_hub(request):
-    student = request.session.get('student', None)
-    if not student:
-        return redirect('login')
-    return render(request, 'students/resources_hub.html', {'student': student})
-
 # 📝 Student Sign Up
 def signup_view(request):
     if request.method == 'POST':
@@ -62,6 +71,10 @@ def signup_view(request):
                 messages.error(request, "❌ Passwords do not match. Please try again.")
                 return render(request, 'students/signup.html', {'form': form})
 
+            # Check both fields in one query before paying for the password hash
+            if _reject_taken(request, username=username, email=email):
+                return render(request, 'students/signup.html', {'form': form})
+
             hashed_password = make_password(password)
 
             data = {
@@ -73,28 +86,8 @@ def signup_view(request):
             }
 
             try:
-                # Check if username already exists
-                try:
-                    username_check = supabase.table("students").select("username").eq("username", username).execute()
-                    if username_check.data and len(username_check.data) > 0:
-                        messages.error(request, "❌ Username is already taken. Please choose a different one.")
-                        return render(request, 'students/signup.html', {'form': form})
-                except Exception as check_error:
-                    print(f"Error checking username: {check_error}")
-                    # Continue with registration attempt, Supabase will handle duplicate key errors
-                
-                # Check if email already exists
-                try:
-                    email_check = supabase.table("students").select("email").eq("email", email).execute()
-                    if email_check.data and len(email_check.data) > 0:
-                        messages.error(request, "❌ Email is already taken. Please use a different email address.")
-                        return render(request, 'students/signup.html', {'form': form})
-                except Exception as check_error:
-                    print(f"Error checking email: {check_error}")
-                    # Continue with registration attempt, Supabase will handle duplicate key errors
-
                 response = supabase.table("students").insert(data).execute()
-                print(f"Insert response: {response}")  # Debug output
+                logger.debug("Signup insert returned %d row(s)", len(response.data or []))
 
                 if response.data:
                     student_id = response.data[0]['id']
@@ -108,26 +101,27 @@ def signup_view(request):
                             result = supabase.table("admins").insert(admin_data).execute()
                             if result.data:
                                 admin_added = True
-                                print(f"Admin account created successfully for student_id: {student_id}")
+                                logger.info("Admin account created for student_id=%s", student_id)
                         except Exception as admin_error:
                             error_msg = str(admin_error)
-                            print(f"Error adding to admins table (first attempt): {error_msg}")
+                            logger.warning("Error adding to admins table (first attempt): %s", error_msg)
                             
                             # Try alternative: Update students table with is_admin flag if column exists
                             try:
                                 update_result = supabase.table("students").update({"is_admin": True}).eq("id", student_id).execute()
                                 if update_result.data:
                                     admin_added = True
-                                    print(f"Admin status set via is_admin column for student_id: {student_id}")
+                                    logger.info("Admin status set via is_admin column for student_id=%s", student_id)
                             except Exception as update_error:
-                                print(f"Error setting is_admin column: {update_error}")
+                                logger.warning("Error setting is_admin column: %s", update_error)
                         
+                        invalidate_admin_status(student_id)
                         if admin_added:
                             messages.success(request, f"Welcome, {full_name}! Your admin account was created successfully. You can now log in and access the admin dashboard.")
                         else:
                             # Last resort: store admin status in session as temporary workaround
                             messages.warning(request, f"Welcome, {full_name}! Your account was created, but admin status setup encountered an issue. Please contact the administrator.")
-                            print(f"WARNING: Failed to set admin status for student_id: {student_id}")
+                            logger.warning("Failed to set admin status for student_id=%s", student_id)
                     else:
                         messages.success(request, f"Welcome, {full_name}! Your account was created successfully.")
                     
@@ -156,25 +150,21 @@ def signup_view(request):
                     "Please check your internet connection and Supabase configuration. "
                     "Error: [Errno 11001] getaddrinfo failed"
                 )
-                print(f"Connection error: {e}")
+                logger.error("Signup connection error: %s", e)
             except Exception as e:
                 error_msg = str(e)
-                print(f"Signup error: {error_msg}")
-                print(f"Error type: {type(e)}")
-                # Check if it's a duplicate error
-                if "duplicate" in error_msg.lower() or "unique" in error_msg.lower():
-                    if "username" in error_msg.lower():
-                        messages.error(request, "❌ Username is already taken. Please choose a different one.")
-                    elif "email" in error_msg.lower():
-                        messages.error(request, "❌ Email is already taken. Please use a different email address.")
-                    else:
-                        messages.error(request, "❌ This username or email is already in use. Please choose different ones.")
+                # Lost a race with another signup: the unique constraint names the column
+                field = duplicate_field(e)
+                if field:
+                    logger.info("Signup rejected by unique constraint on %s", field)
+                    messages.error(request, duplicate_message(field))
                 else:
+                    logger.exception("Signup error (%s)", type(e).__name__)
                     messages.error(request, f"❌ An error occurred: {error_msg}")
                 return render(request, 'students/signup.html', {'form': form})
         else:
             # Form validation failed
-            print("Form validation errors:", form.errors)
+            logger.debug("Signup form validation errors: %s", form.errors.as_json())
             for field, errors in form.errors.items():
                 for error in errors:
                     messages.error(request, f"❌ {field}: {error}")
@@ -183,6 +173,20 @@ def signup_view(request):
     return render(request, 'students/signup.html', {'form': form})
 
 
+def _reject_taken(request, username, email):
+    """Add a message per taken field and return True if the username or email is in use."""
+    try:
+        taken = find_taken_fields(username=username, email=email)
+    except Exception as check_error:
+        # The insert still fails on the unique constraints, which the callers report
+        logger.warning("Error checking username/email availability: %s", check_error)
+        return False
+    for field in ('username', 'email'):
+        if field in taken:
+            messages.error(request, duplicate_message(field))
+    return bool(taken)
+
+
 # Admin Registration
 def admin_signup_view(request):
     if request.method == 'POST':
@@ -192,6 +196,10 @@ def admin_signup_view(request):
             email = form.cleaned_data['email']
             full_name = form.cleaned_data['full_name']
             password = form.cleaned_data['password']
+
+            if _reject_taken(request, username=username, email=email):
+                return render(request, 'students/admin_signup.html', {'form': form})
+
             hashed_password = make_password(password)
 
             data = {
@@ -213,20 +221,21 @@ def admin_signup_view(request):
                         result = supabase.table("admins").insert(admin_data).execute()
                         if result.data:
                             admin_added = True
-                            print(f"Admin account created successfully for student_id: {student_id}")
+                            logger.info("Admin account created for student_id=%s", student_id)
                     except Exception as admin_error:
                         error_msg = str(admin_error)
-                        print(f"Error adding to admins table: {error_msg}")
+                        logger.warning("Error adding to admins table: %s", error_msg)
                         
                         # Try alternative: Update students table with is_admin flag
                         try:
                             update_result = supabase.table("students").update({"is_admin": True}).eq("id", student_id).execute()
                             if update_result.data:
                                 admin_added = True
-                                print(f"Admin status set via is_admin column for student_id: {student_id}")
+                                logger.info("Admin status set via is_admin column for student_id=%s", student_id)
                         except Exception as update_error:
-                            print(f"Error setting is_admin column: {update_error}")
+                            logger.warning("Error setting is_admin column: %s", update_error)
                     
+                    invalidate_admin_status(student_id)
                     if admin_added:
                         messages.success(request, "✅ Admin account created successfully! Please log in and access the admin dashboard.")
                     else:
@@ -235,7 +244,11 @@ def admin_signup_view(request):
                 else:
                     messages.error(request, "❌ Failed to create admin account. Please try again.")
             except Exception as e:
-                messages.error(request, f"❌ Error: {str(e)}")
+                field = duplicate_field(e)
+                if field:
+                    messages.error(request, duplicate_message(field))
+                else:
+                    messages.error(request, f"❌ Error: {str(e)}")
     else:
         form = AdminRegistrationForm()
     
@@ -251,10 +264,11 @@ def login_view(request):
             password = form.cleaned_data['password']
 
             try:
-                response = supabase.table("students").select("*").eq("username", username).execute()
+                # One round trip: only the columns login needs, with the admin role embedded
+                response = get_repository().login_row(username).execute()
                 if response.data:
                     student = response.data[0]
-                    if check_password(password, student['password']):
+                    if verify_password(password, student):
                         # Check if user just logged out BEFORE doing anything else
                         # Store this value since we'll delete the flag later
                         just_logged_out = request.session.get('just_logged_out', False)
@@ -268,12 +282,19 @@ def login_view(request):
                                 pass  # Consume all messages
                             storage.used = True
                         
-                        request.session['student'] = {
+                        session_student = {
                             'id': student['id'],
                             'username': student['username'],
                             'email': student['email'],
                             'full_name': student.get('full_name', '')
                         }
+                        # Keep the role in the session so later requests skip the lookup
+                        admin_status, definitive = admin_status_from_login_row(student)
+                        if definitive:
+                            cache_admin_status(student['id'], admin_status)
+                            session_student = with_admin_status(session_student, admin_status)
+                        request.session['student'] = session_student
+                        request._is_admin = admin_status
                         
                         # Only show welcome message if:
                         # 1. User did NOT just log out (just_logged_out is False)
@@ -290,14 +311,11 @@ def login_view(request):
                         request.session.modified = True  # Ensure session is saved
                         
                         # Redirect admins to admin dashboard, regular users to feed
-                        # Check if user is admin using the is_admin function
-                        # Debug: Check admin status
-                        admin_status = is_admin(request)
-                        print(f"Login: User {student['username']} (ID: {student['id']}) admin status: {admin_status}")
+                        logger.debug("Login: student_id=%s admin=%s", student['id'], admin_status)
                         if admin_status:
-                            print(f"Redirecting admin {student['username']} to admin_dashboard")
+                            logger.debug("Redirecting admin student_id=%s to admin_dashboard", student['id'])
                             return redirect('admin_dashboard')
-                        print(f"Redirecting regular user {student['username']} to feed")
+                        logger.debug("Redirecting student_id=%s to feed", student['id'])
                         return redirect('feed')
                     messages.error(request, "❌ Incorrect username or password.")
             except ConnectError as e:
@@ -306,10 +324,10 @@ def login_view(request):
                     "❌ Connection error: Cannot reach Supabase server. "
                     "Please check your internet connection and Supabase configuration."
                 )
-                print(f"Connection error: {e}")
+                logger.error("Login connection error: %s", e)
             except Exception as e:
                 messages.error(request, f"❌ An error occurred: {str(e)}")
-                print(f"Error: {e}")
+                logger.exception("Login error")
     else:
         form = StudentLoginForm()
     return render(request, 'students/login.html', {'form': form})
@@ -343,9 +361,9 @@ def student_dashboard(request):
     
     # Redirect admins to admin dashboard
     admin_status = is_admin(request)
-    print(f"Dashboard: User {student.get('username')} admin status: {admin_status}")
+    logger.debug("Dashboard: student_id=%s admin=%s", student.get('id'), admin_status)
     if admin_status:
-        print("Redirecting to admin_dashboard")
+        logger.debug("Redirecting to admin_dashboard")
         return redirect('admin_dashboard')
     
     return render(request, 'students/dashboard.html', {'student': student})
@@ -357,6 +375,27 @@ def student_profile(request):
         return redirect('login')
     return render(request, 'students/profile.html', {'student': student})
 
+#Edit Profile (the form posts to update_profile via profile_edit.js)
+def profile_edit(request):
+    student = request.session.get('student', None)
+    if not student:
+        return redirect('login')
+    
+    profile = None
+    try:
+        response = supabase.table("students").select("*").eq("id", student['id']).execute()
+        if response.data:
+            profile = response.data[0]
+            profile.pop('password', None)
+    except Exception as e:
+        logger.warning("Error loading profile for student_id=%s: %s", student['id'], e)
+    
+    return render(request, 'students/profile_edit.html', {
+        'student': student,
+        'profile': profile,
+        'is_admin_flag': is_admin(request)
+    })
+
 #About Us
 def about_us(request):
     return render(request, 'students/about_us.html')
@@ -369,20 +408,8 @@ def feed_view(request):
         messages.error(request, "Please login first.")
         return redirect('login')
 
-    # map session -> local Django Student (get or create)
-    def get_or_create_local_student(sess):
-        email = sess.get('email')
-        username = sess.get('username') or (email.split('@')[0] if email else None)
-        full_name = sess.get('full_name') or username
-        if not email and not username:
-            return None
-        student_obj, created = Student.objects.get_or_create(
-            email=email,
-            defaults={'username': username, 'full_name': full_name}
-        )
-        return student_obj
-
-    local_student = get_or_create_local_student(student_session)
+    # local Django Student for the session (see LocalStudentMiddleware)
+    local_student = request.local_student or None
 
     if request.method == 'POST':
         form = PostForm(request.POST)
@@ -397,13 +424,104 @@ def feed_view(request):
 
             messages.success(request, "Post created!")
             return redirect('feed')
+    else:
+        form = PostForm()
+
+    # Approved posts, plus the viewer's own posts while they await approval
+    visible = Q(approved=True)
+    if local_student is not None:
+        visible |= Q(student=local_student)
+    posts = (
+        Post.objects.filter(visible)
+        .select_related('student')
+        .prefetch_related('comments__student')
+        .annotate(likes_count=Count('likes', distinct=True), comments_count=Count('comments', distinct=True))
+    )
+    return render(request, 'students/feed.html', {'form': form, 'posts': posts, 'student': local_student})
+
+# Change Password
+def change_password(request):
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Invalid request method'}, status=405)
+    
+    student = request.session.get('student', None)
+    if not student:
+        return JsonResponse({'success': False, 'error': 'Not authenticated'}, status=401)
+    
+    try:
+        data = json.loads(request.body)
+        current_password = data.get('current_password')
+        new_password = data.get('new_password')
+        confirm_password = data.get('confirm_password')
+        
+        if not all([current_password, new_password, confirm_password]):
+            return JsonResponse({'success': False, 'error': 'All fields are required'}, status=400)
+        
+        if new_password != confirm_password:
+            return JsonResponse({'success': False, 'error': 'New passwords do not match'}, status=400)
+        
+        # Verify current password
+        response = supabase.table("students").select("*").eq("id", student['id']).execute()
+        if not response.data:
+            return JsonResponse({'success': False, 'error': 'User not found'}, status=404)
+        
+        student_data = response.data[0]
+        if not check_password(current_password, student_data['password']):
+            return JsonResponse({'success': False, 'error': 'Current password is incorrect'}, status=400)
+        
+        # Update password
+        hashed_password = make_password(new_password)
+        update_response = supabase.table("students").update({"password": hashed_password}).eq("id", student['id']).execute()
+        
+        if update_response.data:
+            return JsonResponse({'success': True, 'message': 'Password updated successfully'})
         else:
             return JsonResponse({'success': False, 'error': 'Failed to update password'}, status=500)
             
     except Exception as e:
-        print(f"Error changing password: {e}")
+        logger.info("Error changing password for student_id=%s: %s", student['id'], e)
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
+def _apply_profile_picture(request, student, url):
+    """Point the session (and `student`, if given) at a newly processed profile picture."""
+    if student is not None:
+        student['profile_picture_url'] = url
+    session_student = request.session.get('student')
+    if session_student:
+        request.session['student'] = {**session_student, 'profile_picture_url': url}
+
+
+# Poll a background profile picture job started by update_profile
+def profile_picture_status(request, job_id):
+    student = request.session.get('student', None)
+    if not student:
+        return JsonResponse({'success': False, 'error': 'Not authenticated'}, status=401)
+    
+    job = get_job(job_id)
+    if not job or job['student_id'] != student['id']:
+        return JsonResponse({'success': False, 'error': 'Unknown profile picture job'}, status=404)
+    
+    if job['status'] == 'done':
+        _apply_profile_picture(request, None, job['url'])
+    return JsonResponse({'success': True, 'status': job['status'], 'url': job['url'], 'error': job['error']})
+
+
+PROFILE_TAKEN_ERRORS = {'username': 'Username already taken', 'email': 'Email already taken'}
+
+
+def _profile_taken_response(student, username, email):
+    """400 response if a changed username or email belongs to another student, else None."""
+    username = username if username != student.get('username') else None
+    email = email if email != student.get('email') else None
+    if not (username or email):
+        return None
+    taken = find_taken_fields(username=username, email=email, exclude_id=student['id'])
+    for field in ('username', 'email'):
+        if field in taken:
+            return JsonResponse({'success': False, 'error': PROFILE_TAKEN_ERRORS[field]}, status=400)
+    return None
+
+
 # Update Profile
 def update_profile(request):
     if request.method != 'POST':
@@ -415,6 +533,8 @@ def update_profile(request):
     
     try:
         update_data = {}
+        picture_upload = None
+        picture_format = None
         student_id = student['id']
         
         # Handle FormData (for file uploads)
@@ -434,17 +554,10 @@ def update_profile(request):
             if not email:
                 return JsonResponse({'success': False, 'error': 'Email is required'}, status=400)
             
-            # Check if username is already taken (by another user)
-            if username != student.get('username'):
-                check_response = supabase.table("students").select("id").eq("username", username).neq("id", student_id).execute()
-                if check_response.data and len(check_response.data) > 0:
-                    return JsonResponse({'success': False, 'error': 'Username already taken'}, status=400)
-            
-            # Check if email is already taken (by another user)
-            if email != student.get('email'):
-                check_response = supabase.table("students").select("id").eq("email", email).neq("id", student_id).execute()
-                if check_response.data and len(check_response.data) > 0:
-                    return JsonResponse({'success': False, 'error': 'Email already taken'}, status=400)
+            # Check if the new username/email is already taken (by another user)
+            taken_response = _profile_taken_response(student, username, email)
+            if taken_response:
+                return taken_response
             
             # Add fields to update_data (include all fields, even if empty, so users can clear them)
             update_data['username'] = username
@@ -455,7 +568,8 @@ def update_profile(request):
             update_data['location'] = location if location else ''
             update_data['date_of_birth'] = date_of_birth if date_of_birth else None
             
-            # Handle profile picture upload
+            # Handle profile picture upload; resizing and the Storage upload happen in
+            # the background once the profile fields are saved (see media.py)
             if 'profile_picture' in request.FILES:
                 picture_file = request.FILES['profile_picture']
                 
@@ -467,48 +581,13 @@ def update_profile(request):
                 if not picture_file.content_type.startswith('image/'):
                     return JsonResponse({'success': False, 'error': 'Invalid file type. Please upload an image.'}, status=400)
                 
-                # Process image if PIL is available
-                file_data = None
-                if PIL_AVAILABLE and Image:
-                    try:
-                        img = Image.open(picture_file)
-                        if img.mode != 'RGB':
-                            img = img.convert('RGB')
-                        img.thumbnail((400, 400), Image.Resampling.LANCZOS)
-                        
-                        # Save to BytesIO
-                        output = BytesIO()
-                        img.save(output, format='JPEG', quality=85)
-                        output.seek(0)
-                        file_data = output.read()
-                    except Exception as e:
-                        print(f"Image processing error: {e}")
-                        # If image processing fails, use original file
-                        picture_file.seek(0)
-                        file_data = picture_file.read()
-                else:
-                    # Without PIL, use file as-is
-                    picture_file.seek(0)
-                    file_data = picture_file.read()
-                
-                # Upload to Supabase Storage
-                file_path = f"profile_pics/{student_id}_{int(timezone.now().timestamp())}.jpg"
+                # Reads the header only; rejects other formats and decompression bombs
                 try:
-                    # Upload file to Supabase Storage (upsert replaces existing file)
-                    upload_response = supabase.storage.from_("profile-pictures").upload(
-                        file_path,
-                        file_data,
-                        file_options={"content-type": "image/jpeg", "upsert": "true"}
-                    )
-                    
-                    # Get public URL
-                    url_response = supabase.storage.from_("profile-pictures").get_public_url(file_path)
-                    update_data['profile_picture_url'] = url_response
-                    print(f"Profile picture uploaded successfully: {url_response}")
-                    
-                except Exception as e:
-                    print(f"Error uploading profile picture: {e}")
-                    return JsonResponse({'success': False, 'error': f'Failed to upload profile picture: {str(e)}'}, status=500)
+                    picture_info = check_profile_picture(picture_file)
+                except UnsupportedImage as e:
+                    return JsonResponse({'success': False, 'error': str(e)}, status=400)
+                picture_upload = picture_file
+                picture_format = picture_info[0] if picture_info else None
         
         else:
             # Handle JSON data (for regular fields without file upload)
@@ -531,17 +610,10 @@ def update_profile(request):
             if not email:
                 return JsonResponse({'success': False, 'error': 'Email is required'}, status=400)
             
-            # Check if username is already taken
-            if username != student.get('username'):
-                check_response = supabase.table("students").select("id").eq("username", username).neq("id", student_id).execute()
-                if check_response.data and len(check_response.data) > 0:
-                    return JsonResponse({'success': False, 'error': 'Username already taken'}, status=400)
-            
-            # Check if email is already taken
-            if email != student.get('email'):
-                check_response = supabase.table("students").select("id").eq("email", email).neq("id", student_id).execute()
-                if check_response.data and len(check_response.data) > 0:
-                    return JsonResponse({'success': False, 'error': 'Email already taken'}, status=400)
+            # Check if the new username/email is already taken (by another user)
+            taken_response = _profile_taken_response(student, username, email)
+            if taken_response:
+                return taken_response
             
             # Add all fields to update_data (include all fields, even if empty)
             update_data['username'] = username
@@ -575,24 +647,39 @@ def update_profile(request):
                     }
                     request.session.modified = True
                     
-                    return JsonResponse({
+                    result = {
                         'success': True, 
                         'message': 'Profile updated successfully', 
                         'student': updated_student
-                    })
+                    }
+                    if picture_upload is not None:
+                        # The current picture stands in until the new one is ready
+                        job = submit_profile_picture(student_id, picture_upload, picture_format)
+                        if job['status'] == 'done':
+                            _apply_profile_picture(request, updated_student, job['url'])
+                        result['profile_picture'] = {
+                            'job_id': job['id'],
+                            'status': job['status'],
+                            'url': job['url'],
+                            'placeholder_url': student.get('profile_picture_url'),
+                            'status_url': reverse('profile_picture_status', args=[job['id']]),
+                        }
+                    return JsonResponse(result)
                 else:
                     return JsonResponse({'success': False, 'error': 'Failed to update profile'}, status=500)
                     
             except Exception as e:
-                print(f"Error updating profile in Supabase: {e}")
+                # Another account claimed the username/email since the check above
+                field = duplicate_field(e)
+                if field in PROFILE_TAKEN_ERRORS:
+                    return JsonResponse({'success': False, 'error': PROFILE_TAKEN_ERRORS[field]}, status=400)
+                logger.info("Error updating profile in Supabase: %s", e)
                 return JsonResponse({'success': False, 'error': f'Failed to update profile: {str(e)}'}, status=500)
         else:
             return JsonResponse({'success': False, 'error': 'No fields to update'}, status=400)
             
     except Exception as e:
-        print(f"Unexpected error in update_profile: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.info("Unexpected error in update_profile: %s", e, exc_info=True)
         return JsonResponse({'success': False, 'error': f'An error occurred: {str(e)}'}, status=500)
 
 
@@ -667,39 +754,6 @@ def get_journals(request):
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
-def create_journal(request):
-    if request.method != 'POST':
-        return JsonResponse({'success': False, 'error': 'Invalid request method'}, status=405)
-    
-    student = request.session.get('student', None)
-    if not student:
-        return JsonResponse({'success': False, 'error': 'Not authenticated'}, status=401)
-    
-    try:
-        data = json.loads(request.body)
-        content = data.get('content')
-        title = data.get('title', 'Untitled')
-        
-        if not content:
-            return JsonResponse({'success': False, 'error': 'Content is required'}, status=400)
-        
-        journal_data = {
-            "student_id": student['id'],
-            "title": title,
-            "content": content,
-            "created_at": datetime.now().isoformat()
-        }
-        
-        response = supabase.table("journals").insert(journal_data).execute()
-        
-        if response.data:
-            return JsonResponse({'success': True, 'journal': response.data[0]})
-        else:
-            return JsonResponse({'success': False, 'error': 'Failed to create journal'}, status=500)
-            
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)}, status=500)
-
 def update_journal(request, journal_id):
     if request.method != 'POST':
         return JsonResponse({'success': False, 'error': 'Invalid request method'}, status=405)
@@ -746,77 +800,76 @@ def delete_journal(request, journal_id):
 
 # Anonymous Posts
 def get_anonymous_posts(request):
+    limit = parse_page_size(request.GET.get('limit'))
+    cursor = request.GET.get('cursor')
     try:
-        # Prefer the explicit status column; fall back to the legacy approved flag
-        try:
-            response = supabase.table("posts").select("*").eq("status", "approved").execute()
-        except Exception:
-            response = supabase.table("posts").select("*").eq("approved", True).execute()
+        keyset = decode_post_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    try:
+        repo = get_repository()
+        response = repo.approved_posts_page(keyset, limit).execute()
+
+        rows = response.data or []
+        has_more = len(rows) > limit
+        rows = rows[:limit]
         
         # Format posts with author information
         posts = []
-        if response.data:
-            # Get all unique student IDs for non-anonymous posts
-            student_ids = [post.get('student_id') for post in response.data if post.get('student_id') and not post.get('is_anonymous', True)]
-            student_ids = list(set(student_ids))
-            
-            # Fetch student data
-            student_map = {}
-            if student_ids:
+        if rows:
+            student = request.session.get('student', None)
+            student_ids = author_ids(rows)
+            # Get all post IDs for comment and like counting
+            post_ids = [post.get('id') for post in rows if post.get('id')]
+
+            # Fetch names for the authors of non-anonymous posts
+            def fetch_author_names():
+                if not student_ids:
+                    return {}
                 try:
                     students_response = supabase.table("students").select("id, username, full_name").in_("id", student_ids).execute()
-                    if students_response.data:
-                        for student in students_response.data:
-                            student_map[student['id']] = student.get('full_name') or student.get('username', 'Unknown')
+                    return author_name_map(students_response.data or [])
                 except:
-                    pass
-            
-            # Get all post IDs for comment counting
-            post_ids = [post.get('id') for post in response.data if post.get('id')]
-            
+                    return {}
+
             # Get comment counts for all posts
-            comment_counts = {}
-            if post_ids:
+            def fetch_comment_counts():
+                if not post_ids:
+                    return {}
+                if repo.schema.post_counters:
+                    return stored_comment_counts(rows)
                 try:
-                    # Try both table names for compatibility
-                    try:
-                        comments_response = supabase.table("comments").select("post_id").in_("post_id", post_ids).execute()
-                    except:
-                        comments_response = supabase.table("post_comments").select("post_id").in_("post_id", post_ids).execute()
-                    
-                    if comments_response.data:
-                        for comment in comments_response.data:
-                            post_id = comment.get('post_id')
-                            if post_id:
-                                comment_counts[post_id] = comment_counts.get(post_id, 0) + 1
+                    comments_response = repo.comment_post_ids(post_ids).execute()
+                    return tally_comment_counts(comments_response.data or [])
                 except Exception as e:
-                    print(f"Error fetching comment counts: {e}")
-            
-            # Format posts
-            for post in response.data:
-                post_data = post.copy()
-                post_status = post.get('status') or ('approved' if post.get('approved') else 'pending')
-                post_data['status'] = post_status
-                post_data['approved'] = post_status == 'approved'
-                if not post.get('is_anonymous', True) and post.get('student_id'):
-                    student_id = post['student_id']
-                    if student_id in student_map:
-                        post_data['author_name'] = student_map[student_id]
-                    else:
-                        post_data['author_name'] = 'Unknown'
-                else:
-                    post_data['is_anonymous'] = True
-                
-                # Add comment count
-                post_id = post.get('id')
-                post_data['comments_count'] = comment_counts.get(post_id, 0)
-                
-                posts.append(post_data)
-            
-            # Sort by created_at descending (newest first)
-            posts.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-        
-        return JsonResponse({'success': True, 'posts': posts})
+                    logger.warning("Error fetching comment counts: %s", e)
+                    return {}
+
+            # Get like counts and the viewer's liked state for all posts
+            def fetch_like_states():
+                if not post_ids:
+                    return {}
+                try:
+                    return _get_like_states(post_ids, student['id'] if student else None, rows)
+                except Exception as e:
+                    logger.warning("Error fetching like counts: %s", e)
+                    return {}
+
+            # The three lookups only depend on the page of posts, so run them together
+            results = run_parallel({
+                'author_names': fetch_author_names,
+                'comment_counts': fetch_comment_counts,
+                'like_states': fetch_like_states,
+            })
+
+            posts = [
+                format_feed_post(post, results['author_names'], results['comment_counts'], results['like_states'])
+                for post in rows
+            ]
+
+        next_cursor = encode_post_cursor(rows[-1]) if has_more else None
+        return JsonResponse({'success': True, 'posts': posts, 'next_cursor': next_cursor})
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
@@ -832,23 +885,22 @@ def create_anonymous_post(request):
         data = json.loads(request.body)
         content = data.get('content')
         is_anonymous = data.get('is_anonymous', True)  # Default to anonymous
-        # Posts need admin approval - store explicit status
-        approved = False
+        # Posts need admin approval
         status = "pending"
         
         if not content:
             return JsonResponse({'success': False, 'error': 'Content is required'}, status=400)
         
+        repo = get_repository()
         post_data = {
             "content": content,
-            "approved": approved,  # Legacy flag for backward compatibility
-            "status": status,
+            **repo.status_fields(status),  # status and/or the legacy approved flag
             "is_anonymous": is_anonymous,
             "student_id": student['id'],  # Always include student_id for admin tracking
             "created_at": datetime.now().isoformat()
         }
         
-        response = supabase.table("posts").insert(post_data).execute()
+        response = repo.insert_post(post_data).execute()
         
         if response.data:
             return JsonResponse({
@@ -872,16 +924,11 @@ def like_post(request, post_id):
         return JsonResponse({'success': False, 'error': 'Not authenticated'}, status=401)
     
     try:
-        # Try both table names for compatibility
-        try:
-            check_response = supabase.table("likes").select("*").eq("post_id", post_id).eq("student_id", student['id']).execute()
-            table_name = "likes"
-        except:
-            check_response = supabase.table("post_likes").select("*").eq("post_id", post_id).eq("student_id", student['id']).execute()
-            table_name = "post_likes"
+        repo = get_repository()
+        check_response = repo.like(post_id, student['id']).execute()
         
         if check_response.data and len(check_response.data) > 0:
-            supabase.table(table_name).delete().eq("post_id", post_id).eq("student_id", student['id']).execute()
+            repo.delete_like(post_id, student['id']).execute()
             return JsonResponse({'success': True, 'liked': False})
         else:
             like_data = {
@@ -889,76 +936,86 @@ def like_post(request, post_id):
                 "student_id": student['id'],
                 "created_at": datetime.now().isoformat()
             }
-            supabase.table(table_name).insert(like_data).execute()
+            repo.insert_like(like_data).execute()
             return JsonResponse({'success': True, 'liked': True})
             
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
+def _get_like_states(post_ids, student_id=None, posts=None):
+    """Return {str(post_id): {'count', 'is_liked'}} for many posts.
+
+    With stored counters the counts come from the post rows (`posts`, when the caller
+    already has them) and only the viewer's own likes are fetched; otherwise every
+    like row of the posts is tallied from one likes query.
+    """
+    post_ids = [str(post_id) for post_id in post_ids]
+    if not post_ids:
+        return {}
+
+    repo = get_repository()
+    if repo.schema.post_counters:
+        if posts is None:
+            posts = repo.post_counters(post_ids).execute().data or []
+        liked = repo.liked_post_ids(post_ids, student_id).execute().data or [] if student_id else []
+        return stored_like_states(post_ids, posts, [like['post_id'] for like in liked])
+
+    # Only the two columns we tally are fetched
+    response = repo.likes_for_posts(post_ids).execute()
+    return tally_like_states(post_ids, response.data or [], student_id)
+
+
 def get_likes(request, post_id):
     """Get like count and check if current user liked the post"""
     try:
         student = request.session.get('student', None)
         student_id = student['id'] if student else None
-        
-        # Get all likes for this post
-        likes_response = supabase.table("likes").select("*").eq("post_id", post_id).execute()
-        likes = likes_response.data if likes_response.data else []
-        
-        # Count likes
-        like_count = len(likes)
-        
-        # Check if current user liked
-        is_liked = False
-        if student_id:
-            user_like = [like for like in likes if like.get('student_id') == student_id]
-            is_liked = len(user_like) > 0
-        
+
+        state = _get_like_states([post_id], student_id)[str(post_id)]
         return JsonResponse({
             'success': True,
-            'count': like_count,
-            'is_liked': is_liked
+            'count': state['count'],
+            'is_liked': state['is_liked']
         })
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
+def get_likes_bulk(request):
+    """Get like counts and liked state for several posts: /api/posts/likes/?ids=1,2,3"""
+    try:
+        post_ids = parse_id_list(request.GET.get('ids'))
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'ids must be integers'}, status=400)
+    if not post_ids:
+        return JsonResponse({'success': False, 'error': 'ids is required'}, status=400)
+    if len(post_ids) > LIKE_STATES_MAX_POSTS:
+        return JsonResponse({'success': False, 'error': f'At most {LIKE_STATES_MAX_POSTS} ids per request'}, status=400)
+
+    try:
+        student = request.session.get('student', None)
+        student_id = student['id'] if student else None
+        return JsonResponse({'success': True, 'likes': _get_like_states(post_ids, student_id)})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
 def get_comments(request, post_id):
     try:
-        # Try both table names for compatibility
-        try:
-            response = supabase.table("comments").select("*").eq("post_id", post_id).order("created_at", desc=False).execute()
-        except:
-            response = supabase.table("post_comments").select("*").eq("post_id", post_id).order("created_at", desc=False).execute()
+        response = get_repository().comments(post_id).execute()
         
         comments = response.data if response.data else []
         
         # Get student information for comments
-        student_ids = [comment.get('student_id') for comment in comments if comment.get('student_id')]
-        student_map = {}
+        students = []
+        student_ids = list({comment['student_id'] for comment in comments if comment.get('student_id')})
         if student_ids:
             try:
-                students_response = supabase.table("students").select("id, username, full_name, profile_picture_url").in_("id", list(set(student_ids))).execute()
-                if students_response.data:
-                    for student in students_response.data:
-                        student_map[student['id']] = {
-                            'username': student.get('username', 'Unknown'),
-                            'full_name': student.get('full_name', ''),
-                            'profile_picture_url': student.get('profile_picture_url', '')
-                        }
+                students_response = supabase.table("students").select("id, username, full_name, profile_picture_url").in_("id", student_ids).execute()
+                students = students_response.data or []
             except Exception as e:
-                print(f"Error fetching student info for comments: {e}")
+                logger.warning("Error fetching student info for comments: %s", e)
         
         # Add student info to each comment
-        for comment in comments:
-            student_id = comment.get('student_id')
-            if student_id and student_id in student_map:
-                comment['student'] = student_map[student_id]
-            else:
-                comment['student'] = {
-                    'username': 'Unknown',
-                    'full_name': '',
-                    'profile_picture_url': ''
-                }
+        attach_comment_authors(comments, students)
         
         return JsonResponse({'success': True, 'comments': comments})
     except Exception as e:
@@ -986,11 +1043,7 @@ def create_comment(request, post_id):
             "created_at": datetime.now().isoformat()
         }
         
-        # Try both table names for compatibility
-        try:
-            response = supabase.table("comments").insert(comment_data).execute()
-        except:
-            response = supabase.table("post_comments").insert(comment_data).execute()
+        response = get_repository().insert_comment(comment_data).execute()
         
         if response.data:
             return JsonResponse({'success': True, 'comment': response.data[0]})
@@ -1026,7 +1079,8 @@ def edit_post(request, post_id):
             return JsonResponse({'success': False, 'error': 'Content is required'}, status=400)
         
         # Check if post belongs to the student
-        post_response = supabase.table("posts").select("*").eq("id", post_id).execute()
+        repo = get_repository()
+        post_response = repo.post(post_id, "student_id").execute()
         if not post_response.data:
             return JsonResponse({'success': False, 'error': 'Post not found'}, status=404)
         
@@ -1035,10 +1089,10 @@ def edit_post(request, post_id):
             return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
         
         # Update the post
-        update_response = supabase.table("posts").update({
+        update_response = repo.update_post(post_id, {
             "content": content,
             "updated_at": datetime.now().isoformat()
-        }).eq("id", post_id).execute()
+        }).execute()
         
         if update_response.data:
             return JsonResponse({'success': True, 'post': update_response.data[0]})
@@ -1049,48 +1103,62 @@ def edit_post(request, post_id):
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
 # Delete Post
-def delete_post(request, post_id):
-    if request.method != 'POST':
-        return JsonResponse({'success': False, 'error': 'Invalid request method'}, status=405)
-    
-    student = request.session.get('student', None)
-    if not student:
-        return JsonResponse({'success': False, 'error': 'Not authenticated'}, status=401)
-    
-    try:
-        # Check if post belongs to the student
-        post_response = supabase.table("posts").select("*").eq("id", post_id).execute()
-        if not post_response.data:
-            return JsonResponse({'success': False, 'error': 'Post not found'}, status=404)
-        
-        post = post_response.data[0]
-        if post.get('student_id') != student['id']:
-            return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
-        
-        # Delete the post (this will cascade delete likes and comments if foreign keys are set up)
-        supabase.table("posts").delete().eq("id", post_id).execute()
-        return JsonResponse({'success': True, 'message': 'Post deleted successfully'})
-            
-    except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+def _get_session_student_id(request):
+    """Id of the local Django Student for the logged-in Supabase user (matched by email)."""
+    local_student = request.local_student
+    return local_student.pk if local_student else None
 
 # Wellness Resources
+WELLNESS_PAGE_SIZE = 20
+WELLNESS_MAX_PAGE_SIZE = 100
+
+
 def get_wellness_resources(request):
     try:
-        search_query = request.GET.get('search', '')
+        page = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        page = 1
+    page_size = parse_page_size(request.GET.get('page_size'), WELLNESS_PAGE_SIZE, WELLNESS_MAX_PAGE_SIZE)
+    start = (page - 1) * page_size
+
+    try:
+        search_query = request.GET.get('search', '').strip()
         resource_type = request.GET.get('type', '')
         
-        query = supabase.table("wellness_resources").select("*")
-        
-        if search_query:
-            query = query.or_("title.ilike.%{search}%,description.ilike.%{search}%".format(search=search_query))
+        def resources_query():
+            if search_query and search_function_available("search_wellness_resources"):
+                # Ranked full-text match on name and description (see search.py)
+                params = {"search": search_query, "resource_type": resource_type or None}
+                query = supabase.rpc("search_wellness_resources", params, count="exact").select("*")
+            else:
+                query = supabase.table("wellness_resources").select("*", count="exact")
+                if search_query:
+                    query = query.or_(ilike_any(WELLNESS_SEARCH_COLUMNS, search_query))
+                if resource_type:
+                    query = query.eq("type", resource_type)
+                query = query.order("created_at", desc=True)
+            return query.range(start, start + page_size - 1)
         
-        if resource_type:
-            query = query.eq("type", resource_type)
+        try:
+            response = resources_query().execute()
+        except Exception as e:
+            note_search_error("search_wellness_resources", e)
+            if search_function_available("search_wellness_resources"):
+                raise
+            response = resources_query().execute()
         
-        response = query.order("created_at", desc=True).execute()
-        return JsonResponse({'success': True, 'resources': response.data if response.data else []})
+        resources = response.data if response.data else []
+        total = response.count if response.count is not None else start + len(resources)
+        return JsonResponse({
+            'success': True,
+            'resources': resources,
+            'page': page,
+            'page_size': page_size,
+            'total': total,
+            'has_more': start + len(resources) < total
+        })
     except Exception as e:
+        logger.warning("Error fetching wellness resources: %s", e)
         return JsonResponse({'success': True, 'resources': []})
 
 def get_hotlines(request):
@@ -1110,39 +1178,19 @@ def is_admin(request):
     if not student_id:
         return False
     
-    # Method 1: Check admins table (primary method)
-    try:
-        admin_response = supabase.table("admins").select("student_id").eq("student_id", student_id).execute()
-        if admin_response.data and len(admin_response.data) > 0:
-            print(f"Admin check: User {student_id} ({student.get('username', 'unknown')}) is admin (found in admins table)")
-            return True
-    except Exception as e:
-        print(f"Error checking admins table: {e}")
+    # Resolved at most once per request, and cached across requests by student id
+    if getattr(request, '_is_admin', None) is not None:
+        return request._is_admin
     
-    # Method 2: Check is_admin column in students table (fallback)
-    try:
-        response = supabase.table("students").select("is_admin").eq("id", student_id).execute()
-        if response.data and response.data[0].get('is_admin'):
-            print(f"Admin check: User {student_id} ({student.get('username', 'unknown')}) is admin (is_admin column)")
-            return True
-    except Exception as e2:
-        print(f"Error checking is_admin column: {e2}")
+    admin_status = known_admin_status(student)
+    if admin_status is None:
+        admin_status, definitive = resolve_admin_status(student)
+        if definitive:
+            cache_admin_status(student_id, admin_status)
+            request.session['student'] = with_admin_status(student, admin_status)
     
-    # Method 3: Check if username starts with 'admin' (temporary fallback for testing)
-    username = student.get('username', '').lower()
-    if username.startswith('admin'):
-        print(f"Admin check: User {student_id} ({username}) is admin (username prefix fallback)")
-        # Automatically add to admins table if not already there
-        try:
-            admin_data = {"student_id": student_id}
-            supabase.table("admins").insert(admin_data).execute()
-            print(f"Auto-added {username} to admins table")
-            return True
-        except:
-            pass
-    
-    print(f"Admin check: User {student_id} ({student.get('username', 'unknown')}) is NOT admin")
-    return False
+    request._is_admin = admin_status
+    return admin_status
 
 # Admin Functions
 def admin_get_posts(request):
@@ -1151,50 +1199,21 @@ def admin_get_posts(request):
     
     try:
         status_filter = request.GET.get('status')
-        query = supabase.table("posts").select("*")
-
-        # Apply status filters when provided
-        if status_filter in ['pending', 'approved', 'declined']:
-            try:
-                query = query.eq("status", status_filter)
-            except Exception:
-                # Fallback for legacy approved flag
-                if status_filter == 'approved':
-                    query = query.eq("approved", True)
-                elif status_filter == 'pending':
-                    query = query.eq("approved", False)
-                else:
-                    # Declined has no legacy equivalent; fetch none via false condition
-                    query = query.eq("approved", None)
-
-        response = query.order("created_at", desc=True).execute()
+        response = get_repository().posts(status_filter).execute()
         posts = response.data if response.data else []
         
         # Get student information for posts with student_id
-        student_ids = [post.get('student_id') for post in posts if post.get('student_id')]
-        student_map = {}
+        students = []
+        student_ids = list({post['student_id'] for post in posts if post.get('student_id')})
         if student_ids:
             try:
-                students_response = supabase.table("students").select("id, username, full_name").in_("id", list(set(student_ids))).execute()
-                if students_response.data:
-                    for student in students_response.data:
-                        student_map[student['id']] = {
-                            'username': student.get('username', 'Unknown'),
-                            'full_name': student.get('full_name', ''),
-                            'id': student['id']
-                        }
+                students_response = supabase.table("students").select("id, username, full_name").in_("id", student_ids).execute()
+                students = students_response.data or []
             except:
                 pass
         
         # Add student info to posts
-        for post in posts:
-            post_status = post.get('status') or ('approved' if post.get('approved') else 'pending')
-            post['status'] = post_status
-            post['approved'] = post_status == 'approved'
-            if post.get('student_id') and post['student_id'] in student_map:
-                post['student'] = student_map[post['student_id']]
-            else:
-                post['student'] = None
+        format_admin_posts(posts, students)
         
         return JsonResponse({'success': True, 'posts': posts})
     except Exception as e:
@@ -1205,11 +1224,7 @@ def admin_approve_post(request, post_id):
         return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
     
     try:
-        update_data = {
-            "approved": True,
-            "status": "approved"
-        }
-        response = supabase.table("posts").update(update_data).eq("id", post_id).execute()
+        response = get_repository().set_post_status(post_id, "approved").execute()
         if response.data:
             return JsonResponse({'success': True, 'message': 'Post approved'})
         else:
@@ -1222,11 +1237,7 @@ def admin_decline_post(request, post_id):
         return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
     
     try:
-        update_data = {
-            "approved": False,
-            "status": "declined"
-        }
-        response = supabase.table("posts").update(update_data).eq("id", post_id).execute()
+        response = get_repository().set_post_status(post_id, "declined").execute()
         if response.data:
             return JsonResponse({'success': True, 'message': 'Post declined'})
         else:
@@ -1239,11 +1250,7 @@ def admin_pending_post(request, post_id):
         return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
     
     try:
-        update_data = {
-            "approved": False,
-            "status": "pending"
-        }
-        response = supabase.table("posts").update(update_data).eq("id", post_id).execute()
+        response = get_repository().set_post_status(post_id, "pending").execute()
         if response.data:
             return JsonResponse({'success': True, 'message': 'Post moved to pending'})
         else:
@@ -1256,7 +1263,7 @@ def admin_delete_post(request, post_id):
         return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
     
     try:
-        supabase.table("posts").delete().eq("id", post_id).execute()
+        get_repository().delete_post(post_id).execute()
         return JsonResponse({'success': True, 'message': 'Post deleted'})
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
@@ -1353,6 +1360,7 @@ def add_admin_utility(request):
         # Add to admins table
         admin_data = {"student_id": student['id']}
         result = supabase.table("admins").insert(admin_data).execute()
+        invalidate_admin_status(student['id'])
         return JsonResponse({
             'success': True, 
             'message': f'Successfully added {student["username"]} (ID: {student["id"]}) as admin',
@@ -1373,63 +1381,16 @@ def admin_dashboard(request):
     if not student:
         return redirect('login')
     
-    # Get statistics
-    try:
-        # Get user count - fetch all and count
-        try:
-            users_response = supabase.table("students").select("id").execute()
-            user_count = len(users_response.data) if users_response.data else 0
-        except Exception as e:
-            print(f"Error getting user count: {e}")
-            user_count = 0
-        
-        # Get total post count - fetch all and count
-        try:
-            posts_response = supabase.table("posts").select("id").execute()
-            post_count = len(posts_response.data) if posts_response.data else 0
-        except Exception as e:
-            print(f"Error getting post count: {e}")
-            post_count = 0
-        
-        # Get pending posts count
-        try:
-            pending_response = supabase.table("posts").select("id").eq("status", "pending").execute()
-            pending_count = len(pending_response.data) if pending_response.data else 0
-        except Exception:
-            try:
-                # Fallback to approved flag
-                pending_response = supabase.table("posts").select("id").eq("approved", False).execute()
-                pending_count = len(pending_response.data) if pending_response.data else 0
-            except Exception as e:
-                print(f"Error getting pending count: {e}")
-                pending_count = 0
-        
-        # Get resource count
-        try:
-            resources_response = supabase.table("wellness_resources").select("id").execute()
-            resource_count = len(resources_response.data) if resources_response.data else 0
-        except Exception as e:
-            print(f"Error getting resource count: {e}")
-            resource_count = 0
-        
-        stats = {
-            'user_count': user_count,
-            'post_count': post_count,
-            'pending_count': pending_count,
-            'resource_count': resource_count
-        }
-        print(f"Admin Dashboard Stats: {stats}")  # Debug output
-    except Exception as e:
-        print(f"Error getting admin dashboard stats: {e}")
-        stats = {
-            'user_count': 0,
-            'post_count': 0,
-            'pending_count': 0,
-            'resource_count': 0
-        }
+    stats = get_admin_stats()
     
     return render(request, 'students/admin_dashboard.html', {'stats': stats, 'student': student})
 
+def admin_get_stats(request):
+    if not is_admin(request):
+        return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
+    
+    return JsonResponse({'success': True, 'stats': get_admin_stats()})
+
 # Admin Manage Users Page
 def admin_users_view(request):
     if not is_admin(request):
@@ -1440,15 +1401,7 @@ def admin_users_view(request):
         return redirect('login')
     
     # Get stats for navbar
-    stats = {'pending_count': 0}
-    try:
-        try:
-            pending_response = supabase.table("posts").select("id").eq("status", "pending").execute()
-        except Exception:
-            pending_response = supabase.table("posts").select("id").eq("approved", False).execute()
-        stats['pending_count'] = len(pending_response.data) if pending_response.data else 0
-    except:
-        pass
+    stats = get_navbar_stats()
     
     return render(request, 'students/admin_users.html', {'student': student, 'stats': stats})
 
@@ -1462,15 +1415,7 @@ def admin_posts_view(request):
         return redirect('login')
 
     # Get stats for navbar
-    stats = {'pending_count': 0}
-    try:
-        try:
-            pending_response = supabase.table("posts").select("id").eq("status", "pending").execute()
-        except Exception:
-            pending_response = supabase.table("posts").select("id").eq("approved", False).execute()
-        stats['pending_count'] = len(pending_response.data) if pending_response.data else 0
-    except:
-        pass
+    stats = get_navbar_stats()
     
     return render(request, 'students/admin_posts.html', {'student': student, 'stats': stats})
 
@@ -1483,43 +1428,85 @@ def admin_resources_view(request):
     if not student:
         return redirect('login')
     
-    stats = {'pending_count': 0}
-    try:
-        try:
-            pending_response = supabase.table("posts").select("id").eq("status", "pending").execute()
-        except Exception:
-            pending_response = supabase.table("posts").select("id").eq("approved", False).execute()
-        stats['pending_count'] = len(pending_response.data) if pending_response.data else 0
-    except:
-        pass
+    stats = get_navbar_stats()
     
     return render(request, 'students/admin_dashboard.html', {'stats': stats, 'student': student})
 
 # Admin User Management
+ADMIN_USERS_PAGE_SIZE = 50
+ADMIN_USERS_MAX_PAGE_SIZE = 200
+
+
+def _attach_post_counts(users):
+    """Fill user['post_count'] for a page of users from a single posts query."""
+    counts = {}
+    user_ids = [user['id'] for user in users]
+    if user_ids:
+        posts_response = get_repository().posts_by_students(user_ids).execute()
+        for post in posts_response.data or []:
+            counts[post['student_id']] = counts.get(post['student_id'], 0) + 1
+    for user in users:
+        user['post_count'] = counts.get(user['id'], 0)
+
+
 def admin_get_users(request):
     if not is_admin(request):
         return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
     
+    try:
+        page = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        page = 1
+    page_size = parse_page_size(request.GET.get('page_size'), ADMIN_USERS_PAGE_SIZE, ADMIN_USERS_MAX_PAGE_SIZE)
+    start = (page - 1) * page_size
+
     try:
         search_query = request.GET.get('search', '')
-        query = supabase.table("students").select("*")
-        
-        if search_query:
-            # Search in username, email, or full_name
-            query = query.or_(f"username.ilike.%{search_query}%,email.ilike.%{search_query}%,full_name.ilike.%{search_query}%")
-        
-        response = query.order("created_at", desc=True).execute()
-        users = response.data if response.data else []
-        
-        # Add post count for each user
-        for user in users:
+        repo = get_repository()
+
+        def users_query():
+            # Embeds the per-user post count when the schema has a students -> posts relationship
+            columns = repo.user_columns()
+            if search_query and search_function_available("search_students"):
+                # Ranked match on username, email or full_name over trigram indexes (see search.py)
+                query = supabase.rpc("search_students", {"search": search_query}, count="exact").select(columns)
+            else:
+                query = supabase.table("students").select(columns, count="exact")
+                if search_query:
+                    query = query.or_(ilike_any(STUDENT_SEARCH_COLUMNS, search_query))
+                query = query.order("created_at", desc=True)
+            return query.range(start, start + page_size - 1)
+
+        try:
+            response = users_query().execute()
+        except Exception as e:
+            note_search_error("search_students", e)
+            if search_function_available("search_students"):
+                raise
+            response = users_query().execute()
+        users = response.data or []
+
+        # Without the embedded count, count the page's posts in one extra query
+        if not all([repo.pop_post_count(user) for user in users]):
             try:
-                posts_response = supabase.table("posts").select("id", count="exact").eq("student_id", user['id']).execute()
-                user['post_count'] = len(posts_response.data) if posts_response.data else 0
+                _attach_post_counts(users)
             except Exception:
-                user['post_count'] = 0
-        
-        return JsonResponse({'success': True, 'users': users})
+                for user in users:
+                    user['post_count'] = 0
+
+        # Never send password hashes to the browser
+        for user in users:
+            format_admin_user(user)
+
+        total = response.count if response.count is not None else start + len(users)
+        return JsonResponse({
+            'success': True,
+            'users': users,
+            'page': page,
+            'page_size': page_size,
+            'total': total,
+            'has_more': start + len(users) < total
+        })
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
@@ -1543,6 +1530,8 @@ def admin_update_user(request, user_id):
         
         if update_data:
             response = supabase.table("students").update(update_data).eq("id", user_id).execute()
+            if 'is_admin' in update_data:
+                invalidate_admin_status(user_id)
             if response.data:
                 return JsonResponse({'success': True, 'message': 'User updated successfully', 'user': response.data[0]})
         
@@ -1563,38 +1552,26 @@ def admin_delete_user(request, user_id):
         if student and student['id'] == user_id:
             return JsonResponse({'success': False, 'error': 'Cannot delete your own account'}, status=400)
 
-        # Remove user's interactions first
+        repo = get_repository()
         try:
-            supabase.table("post_comments").delete().eq("student_id", user_id).execute()
-        except Exception:
-            pass
-        try:
-            supabase.table("post_likes").delete().eq("student_id", user_id).execute()
-        except Exception:
-            pass
-
-        # Find and delete the user's posts (and related data)
-        try:
-            posts_response = supabase.table("posts").select("id").eq("student_id", user_id).execute()
+            posts_response = repo.posts_by_student(user_id).execute()
             post_ids = [p['id'] for p in posts_response.data] if posts_response.data else []
-            if post_ids:
-                try:
-                    supabase.table("post_comments").delete().in_("post_id", post_ids).execute()
-                except Exception:
-                    pass
-                try:
-                    supabase.table("post_likes").delete().in_("post_id", post_ids).execute()
-                except Exception:
-                    pass
-                supabase.table("posts").delete().in_("id", post_ids).execute()
         except Exception:
-            pass
+            post_ids = []
 
-        # Remove admin record if present
-        try:
-            supabase.table("admins").delete().eq("student_id", user_id).execute()
-        except Exception:
-            pass
+        # Remove the user's likes, comments and admin record, and everything on their posts
+        for query in repo.user_cleanup(user_id, post_ids):
+            try:
+                query.execute()
+            except Exception as e:
+                logger.warning("Error cleaning up user %s: %s", user_id, e)
+        invalidate_admin_status(user_id)
+
+        if post_ids:
+            try:
+                repo.delete_posts(post_ids).execute()
+            except Exception as e:
+                logger.warning("Error deleting posts of user %s: %s", user_id, e)
 
         supabase.table("students").delete().eq("id", user_id).execute()
         return JsonResponse({'success': True, 'message': 'User and related posts deleted successfully'})
@@ -1621,16 +1598,14 @@ def resources_hub(request):
     query = request.GET.get('q', '').strip()
     category = request.GET.get('category', '')
 
-    resources = Resource.objects.all()
-
-    if query:
-        resources = resources.filter(title__icontains=query)
-
-    if category:
-        resources = resources.filter(category__icontains=category)
+    # Ranked full-text search over title, description and category (see search.py)
+    results = search_resources(query, category)
+    page = Paginator(results, RESOURCES_PAGE_SIZE).get_page(request.GET.get('page'))
 
     return render(request, 'students/resources_hub.html', {
-        'resources': resources,
+        'resources': page,
+        'page_obj': page,
+        'categories': resource_categories(),
         'query': query,
         'category': category,
     })
@@ -1663,18 +1638,13 @@ def save_journal_entry(request):
         if not student_session:
             return JsonResponse({'success': False, 'error': 'Not logged in'}, status=401)
 
-        # Get or create local Django Student from session
-        email = student_session.get('email')
-        username = student_session.get('username') or (email.split('@')[0] if email else None)
-        full_name = student_session.get('full_name') or username
-
+        # Local Django Student for the session (see LocalStudentMiddleware)
         try:
-            student_obj, _ = Student.objects.get_or_create(
-                email=email,
-                defaults={'username': username, 'full_name': full_name}
-            )
+            student_obj = request.local_student or None
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)}, status=400)
+        if student_obj is None:
+            return JsonResponse({'success': False, 'error': 'Student not found'}, status=404)
 
         try:
             data = json.loads(request.body)
@@ -1710,39 +1680,58 @@ def journal_entries_view(request):
     if not student_session:
         return redirect('login')
 
-    email = student_session.get('email')
-    if not email:
+    student_obj = request.local_student
+    if not student_obj:
         messages.error(request, "Invalid session.")
         return redirect('login')
 
-    try:
-        student_obj = Student.objects.get(email=email)
-    except Student.DoesNotExist:
-        messages.error(request, "Student not found.")
-        return redirect('login')
-
-    journals_qs = Journal.objects.filter(student_id=student_obj).order_by('-created_at')
-
-    # Convert to list of dicts
-    journals_data = [
-        {
-            'id': j.id,
-            'title': j.title or 'Journal Entry',
-            'content': j.content,
-            'created_at': j.created_at.isoformat() if j.created_at else ''
-        }
-        for j in journals_qs
-    ]
-
-    print(f"DEBUG: journals_data = {journals_data}")
-
+    # Entries themselves are fetched a page at a time by journal_entries.js
     context = {
         'student': student_session,
-        'journals': json.dumps(journals_data),  # Must be JSON string
+        'journal_count': Journal.objects.filter(student_id=student_obj).count(),
     }
     return render(request, 'students/journal_entries.html', context)
 
 
+def _journal_owner(request):
+    """The local Student for the session, or (None, error response)."""
+    if not request.session.get('student'):
+        return None, JsonResponse({'success': False, 'error': 'Not logged in'}, status=401)
+    if not request.local_student:
+        return None, JsonResponse({'success': False, 'error': 'Student not found'}, status=404)
+    return request.local_student, None
+
+
+def get_journal_entries(request):
+    student_obj, error = _journal_owner(request)
+    if error:
+        return error
+
+    limit = parse_page_size(request.GET.get('limit'), JOURNAL_PAGE_SIZE, JOURNAL_MAX_PAGE_SIZE)
+    try:
+        entries, next_cursor = journal_page(
+            student_obj,
+            limit,
+            cursor=request.GET.get('cursor'),
+            oldest_first=request.GET.get('sort') == 'oldest',
+            query=request.GET.get('search', '').strip(),
+        )
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({'success': True, 'entries': entries, 'next_cursor': next_cursor})
+
+
+def get_journal_entry(request, journal_id):
+    student_obj, error = _journal_owner(request)
+    if error:
+        return error
+
+    journal = Journal.objects.filter(id=journal_id, student_id=student_obj).first()
+    if journal is None:
+        return JsonResponse({'success': False, 'error': 'Journal not found'}, status=404)
+    return JsonResponse({'success': True, 'entry': format_journal(journal)})
+
+
 def edit_journal_entry(request, journal_id):
     if request.method != 'POST':
         return JsonResponse({'success': False, 'error': 'Invalid method'}, status=400)
@@ -1751,14 +1740,12 @@ def edit_journal_entry(request, journal_id):
     if not student_session:
         return JsonResponse({'success': False, 'error': 'Not logged in'}, status=401)
 
-    try:
-        email = student_session.get('email')
-        student_obj = Student.objects.get(email=email)
-    except Student.DoesNotExist:
+    student_obj = request.local_student
+    if not student_obj:
         return JsonResponse({'success': False, 'error': 'Student not found'}, status=404)
 
     journal = get_object_or_404(Journal, id=journal_id)
-    if journal.student_id != student_obj:
+    if journal.student_id_id != student_obj.pk:
         return JsonResponse({'success': False, 'error': 'Not authorized'}, status=403)
 
     try:
@@ -1786,15 +1773,13 @@ def delete_journal_entry(request, journal_id):
     if not student_session:
         return JsonResponse({'error': 'Not logged in'}, status=401)
 
-    try:
-        email = student_session.get('email')
-        student_obj = Student.objects.get(email=email)
-    except Student.DoesNotExist:
+    student_obj = request.local_student
+    if not student_obj:
         return JsonResponse({'error': 'Student not found'}, status=404)
 
     journal = get_object_or_404(Journal, id=journal_id)
 
-    if journal.student_id != student_obj:
+    if journal.student_id_id != student_obj.pk:
         return JsonResponse({'error': 'Not authorized'}, status=403)
 
     journal.delete()
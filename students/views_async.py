@@ -0,0 +1,443 @@
+# Async versions of the Supabase-bound JSON endpoints, for serving under ASGI
+# (uvicorn/daphne via MentalEase/asgi.py). They return the same payloads as their
+# counterparts in views.py but await the supabase-py async client, so a worker is
+# not blocked while PostgREST answers, and independent queries run concurrently
+# with asyncio.gather. urls.py routes to them when settings.ASYNC_VIEWS is on.
+import asyncio
+import json
+import logging
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+
+from .roles import (
+    aknown_admin_status, acache_admin_status, ainvalidate_admin_status, resolve_admin_status,
+    with_admin_status,
+)
+from .filters import ilike_any
+from .search import STUDENT_SEARCH_COLUMNS, search_function_available, note_search_error
+from .feed import (
+    LIKE_STATES_MAX_POSTS, decode_post_cursor, encode_post_cursor, parse_page_size, parse_id_list,
+    author_ids, author_name_map, tally_comment_counts, tally_like_states, stored_comment_counts,
+    stored_like_states, format_feed_post, attach_comment_authors, format_admin_posts, format_admin_user,
+)
+from .repository import aget_repository
+
+logger = logging.getLogger(__name__)
+
+ADMIN_USERS_PAGE_SIZE = 50
+ADMIN_USERS_MAX_PAGE_SIZE = 200
+
+
+async def _session_student(request):
+    return await request.session.aget('student')
+
+
+async def _rows_or_empty(coroutine, label):
+    """Await a query and return its rows; log and return [] on failure."""
+    try:
+        response = await coroutine
+        return response.data or []
+    except Exception as e:
+        logger.warning("Error fetching %s: %s", label, e)
+        return []
+
+
+async def is_admin(request):
+    student = await _session_student(request)
+    if not student or not student.get('id'):
+        return False
+
+    if getattr(request, '_is_admin', None) is not None:
+        return request._is_admin
+
+    admin_status = await aknown_admin_status(student)
+    if admin_status is None:
+        # Cache miss: reuse the sync resolver (it may also insert into admins)
+        admin_status, definitive = await sync_to_async(resolve_admin_status)(student)
+        if definitive:
+            await acache_admin_status(student['id'], admin_status)
+            await request.session.aset('student', with_admin_status(student, admin_status))
+
+    request._is_admin = admin_status
+    return admin_status
+
+
+async def _like_states(repo, post_ids, student_id=None, posts=None):
+    post_ids = [str(post_id) for post_id in post_ids]
+    if not post_ids:
+        return {}
+    if repo.schema.post_counters:
+        # Counts are stored on the posts; only the viewer's own likes are needed
+        if posts is None:
+            posts = (await repo.post_counters(post_ids).execute()).data or []
+        liked = (await repo.liked_post_ids(post_ids, student_id).execute()).data or [] if student_id else []
+        return stored_like_states(post_ids, posts, [like['post_id'] for like in liked])
+    response = await repo.likes_for_posts(post_ids).execute()
+    return tally_like_states(post_ids, response.data or [], student_id)
+
+
+# Anonymous Posts
+async def get_anonymous_posts(request):
+    limit = parse_page_size(request.GET.get('limit'))
+    cursor = request.GET.get('cursor')
+    try:
+        keyset = decode_post_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    try:
+        repo = await aget_repository()
+        client = repo.client
+        student = await _session_student(request)
+
+        response = await repo.approved_posts_page(keyset, limit).execute()
+        rows = response.data or []
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        posts = []
+        if rows:
+            post_ids = [post.get('id') for post in rows if post.get('id')]
+            student_ids = author_ids(rows)
+
+            async def author_rows():
+                if not student_ids:
+                    return []
+                return await _rows_or_empty(
+                    client.table("students").select("id, username, full_name").in_("id", student_ids).execute(),
+                    "post authors",
+                )
+
+            async def comment_counts():
+                if repo.schema.post_counters:
+                    return stored_comment_counts(rows)
+                try:
+                    response = await repo.comment_post_ids(post_ids).execute()
+                    return tally_comment_counts(response.data or [])
+                except Exception as e:
+                    logger.warning("Error fetching comment counts: %s", e)
+                    return {}
+
+            async def like_states():
+                try:
+                    return await _like_states(repo, post_ids, student['id'] if student else None, rows)
+                except Exception as e:
+                    logger.warning("Error fetching like counts: %s", e)
+                    return {}
+
+            # Authors, comment counts and likes only depend on the page of posts
+            authors, counts, likes = await asyncio.gather(author_rows(), comment_counts(), like_states())
+
+            author_names = author_name_map(authors)
+            posts = [format_feed_post(post, author_names, counts, likes) for post in rows]
+
+        next_cursor = encode_post_cursor(rows[-1]) if has_more else None
+        return JsonResponse({'success': True, 'posts': posts, 'next_cursor': next_cursor})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+# Likes and Comments
+async def like_post(request, post_id):
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Invalid request method'}, status=405)
+
+    student = await _session_student(request)
+    if not student:
+        return JsonResponse({'success': False, 'error': 'Not authenticated'}, status=401)
+
+    try:
+        repo = await aget_repository()
+        check_response = await repo.like(post_id, student['id']).execute()
+
+        if check_response.data:
+            await repo.delete_like(post_id, student['id']).execute()
+            return JsonResponse({'success': True, 'liked': False})
+
+        like_data = {
+            "post_id": post_id,
+            "student_id": student['id'],
+            "created_at": datetime.now().isoformat()
+        }
+        await repo.insert_like(like_data).execute()
+        return JsonResponse({'success': True, 'liked': True})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+async def get_likes(request, post_id):
+    """Get like count and check if current user liked the post"""
+    try:
+        repo = await aget_repository()
+        student = await _session_student(request)
+        state = (await _like_states(repo, [post_id], student['id'] if student else None))[str(post_id)]
+        return JsonResponse({'success': True, 'count': state['count'], 'is_liked': state['is_liked']})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+async def get_likes_bulk(request):
+    """Get like counts and liked state for several posts: /api/posts/likes/?ids=1,2,3"""
+    try:
+        post_ids = parse_id_list(request.GET.get('ids'))
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'ids must be integers'}, status=400)
+    if not post_ids:
+        return JsonResponse({'success': False, 'error': 'ids is required'}, status=400)
+    if len(post_ids) > LIKE_STATES_MAX_POSTS:
+        return JsonResponse({'success': False, 'error': f'At most {LIKE_STATES_MAX_POSTS} ids per request'}, status=400)
+
+    try:
+        repo = await aget_repository()
+        student = await _session_student(request)
+        return JsonResponse({'success': True, 'likes': await _like_states(repo, post_ids, student['id'] if student else None)})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+async def get_comments(request, post_id):
+    try:
+        repo = await aget_repository()
+        client = repo.client
+        response = await repo.comments(post_id).execute()
+        comments = response.data or []
+
+        students = []
+        student_ids = list({comment['student_id'] for comment in comments if comment.get('student_id')})
+        if student_ids:
+            students = await _rows_or_empty(
+                client.table("students").select("id, username, full_name, profile_picture_url").in_("id", student_ids).execute(),
+                "student info for comments",
+            )
+        attach_comment_authors(comments, students)
+        return JsonResponse({'success': True, 'comments': comments})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+async def create_comment(request, post_id):
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Invalid request method'}, status=405)
+
+    student = await _session_student(request)
+    if not student:
+        return JsonResponse({'success': False, 'error': 'Not authenticated'}, status=401)
+
+    try:
+        data = json.loads(request.body)
+        content = data.get('content')
+
+        if not content:
+            return JsonResponse({'success': False, 'error': 'Content is required'}, status=400)
+
+        comment_data = {
+            "post_id": post_id,
+            "student_id": student['id'],
+            "content": content,
+            "created_at": datetime.now().isoformat()
+        }
+
+        repo = await aget_repository()
+        response = await repo.insert_comment(comment_data).execute()
+        if response.data:
+            return JsonResponse({'success': True, 'comment': response.data[0]})
+        return JsonResponse({'success': False, 'error': 'Failed to create comment'}, status=500)
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+# Admin Functions
+async def admin_get_posts(request):
+    if not await is_admin(request):
+        return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
+
+    try:
+        repo = await aget_repository()
+        client = repo.client
+        status_filter = request.GET.get('status')
+        response = await repo.posts(status_filter).execute()
+        posts = response.data or []
+
+        students = []
+        student_ids = list({post['student_id'] for post in posts if post.get('student_id')})
+        if student_ids:
+            students = await _rows_or_empty(
+                client.table("students").select("id, username, full_name").in_("id", student_ids).execute(),
+                "post authors",
+            )
+        format_admin_posts(posts, students)
+        return JsonResponse({'success': True, 'posts': posts})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+async def _set_post_status(request, post_id, status, message):
+    if not await is_admin(request):
+        return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
+
+    try:
+        repo = await aget_repository()
+        response = await repo.set_post_status(post_id, status).execute()
+        if response.data:
+            return JsonResponse({'success': True, 'message': message})
+        return JsonResponse({'success': False, 'error': 'Post not found'}, status=404)
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+async def admin_approve_post(request, post_id):
+    return await _set_post_status(request, post_id, "approved", 'Post approved')
+
+
+async def admin_decline_post(request, post_id):
+    return await _set_post_status(request, post_id, "declined", 'Post declined')
+
+
+async def admin_pending_post(request, post_id):
+    return await _set_post_status(request, post_id, "pending", 'Post moved to pending')
+
+
+async def admin_delete_post(request, post_id):
+    if not await is_admin(request):
+        return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
+
+    try:
+        repo = await aget_repository()
+        await repo.delete_post(post_id).execute()
+        return JsonResponse({'success': True, 'message': 'Post deleted'})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+async def _count(query):
+    response = await query.execute()
+    return response.count or 0
+
+
+def _count_rows(client, table):
+    return _count(client.table(table).select("id", count="exact", head=True))
+
+
+async def admin_get_stats(request):
+    if not await is_admin(request):
+        return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
+
+    repo = await aget_repository()
+    client = repo.client
+    names = ['user_count', 'post_count', 'pending_count', 'resource_count']
+    results = await asyncio.gather(
+        _count_rows(client, "students"),
+        _count(repo.count_posts()),
+        _count(repo.count_posts("pending")),
+        _count_rows(client, "wellness_resources"),
+        return_exceptions=True,
+    )
+    stats = {}
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            logger.warning("Error getting %s: %s", name, result)
+            result = 0
+        stats[name] = result
+    return JsonResponse({'success': True, 'stats': stats})
+
+
+async def admin_get_users(request):
+    if not await is_admin(request):
+        return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
+
+    try:
+        page = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        page = 1
+    page_size = parse_page_size(request.GET.get('page_size'), ADMIN_USERS_PAGE_SIZE, ADMIN_USERS_MAX_PAGE_SIZE)
+    start = (page - 1) * page_size
+
+    try:
+        repo = await aget_repository()
+        client = repo.client
+        search_query = request.GET.get('search', '')
+
+        def users_query():
+            columns = repo.user_columns()
+            if search_query and search_function_available("search_students"):
+                query = client.rpc("search_students", {"search": search_query}, count="exact").select(columns)
+            else:
+                query = client.table("students").select(columns, count="exact")
+                if search_query:
+                    query = query.or_(ilike_any(STUDENT_SEARCH_COLUMNS, search_query))
+                query = query.order("created_at", desc=True)
+            return query.range(start, start + page_size - 1)
+
+        try:
+            response = await users_query().execute()
+        except Exception as e:
+            note_search_error("search_students", e)
+            if search_function_available("search_students"):
+                raise
+            response = await users_query().execute()
+        users = response.data or []
+
+        if not all([repo.pop_post_count(user) for user in users]):
+            counts = {}
+            posts = await _rows_or_empty(
+                repo.posts_by_students([user['id'] for user in users]).execute(), "post counts"
+            )
+            for post in posts:
+                counts[post['student_id']] = counts.get(post['student_id'], 0) + 1
+            for user in users:
+                user['post_count'] = counts.get(user['id'], 0)
+
+        # Never send password hashes to the browser
+        for user in users:
+            format_admin_user(user)
+
+        total = response.count if response.count is not None else start + len(users)
+        return JsonResponse({
+            'success': True,
+            'users': users,
+            'page': page,
+            'page_size': page_size,
+            'total': total,
+            'has_more': start + len(users) < total
+        })
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+async def admin_delete_user(request, user_id):
+    if not await is_admin(request):
+        return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
+
+    if request.method != 'DELETE':
+        return JsonResponse({'success': False, 'error': 'Invalid request method'}, status=405)
+
+    try:
+        student = await _session_student(request)
+        if student and student['id'] == user_id:
+            return JsonResponse({'success': False, 'error': 'Cannot delete your own account'}, status=400)
+
+        repo = await aget_repository()
+        posts = await _rows_or_empty(repo.posts_by_student(user_id).execute(), "user posts")
+        post_ids = [post['id'] for post in posts]
+
+        # The user's own interactions, interactions on their posts and their admin
+        # row are independent of each other, so remove them concurrently
+        cleanup = [query.execute() for query in repo.user_cleanup(user_id, post_ids)]
+        for result in await asyncio.gather(*cleanup, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.warning("Error cleaning up user %s: %s", user_id, result)
+        await ainvalidate_admin_status(user_id)
+
+        if post_ids:
+            try:
+                await repo.delete_posts(post_ids).execute()
+            except Exception as e:
+                logger.warning("Error deleting posts of user %s: %s", user_id, e)
+
+        # Fails (and returns 500) if a leftover row still references the student
+        await repo.client.table("students").delete().eq("id", user_id).execute()
+        return JsonResponse({'success': True, 'message': 'User and related posts deleted successfully'})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
@@ -0,0 +1,68 @@
+-- Ranked, indexed search for the admin user list and wellness resources.
+-- Called from students/views.py (and views_async.py) through rpc(); the search text
+-- arrives as a JSON parameter, so it is never parsed as a PostgREST filter.
+-- Apply with `supabase db push`, or paste into the SQL editor.
+
+create extension if not exists pg_trgm;
+
+-- Escape LIKE wildcards in user input and wrap it for a substring match
+create or replace function public.like_pattern(search text)
+returns text
+language sql immutable parallel safe
+as $$
+    select '%' || replace(replace(replace(search, '\', '\\'), '%', '\%'), '_', '\_') || '%'
+$$;
+
+
+-- Students: trigram indexes serve ILIKE '%...%' on username, email and full_name
+create index if not exists students_username_trgm_idx on public.students using gin (username gin_trgm_ops);
+create index if not exists students_email_trgm_idx on public.students using gin (email gin_trgm_ops);
+create index if not exists students_full_name_trgm_idx on public.students using gin (full_name gin_trgm_ops);
+
+-- Best match first; callers page with range() and count=exact
+create or replace function public.search_students(search text)
+returns setof public.students
+language sql stable
+as $$
+    select s.*
+    from public.students s
+    where s.username ilike public.like_pattern(search)
+       or s.email ilike public.like_pattern(search)
+       or s.full_name ilike public.like_pattern(search)
+    order by greatest(
+                 similarity(s.username, search),
+                 similarity(coalesce(s.full_name, ''), search),
+                 similarity(s.email, search)
+             ) desc,
+             s.created_at desc
+$$;
+
+
+-- Wellness resources: weighted full-text document (name above description) plus a
+-- trigram index on name for partial words
+create or replace function public.wellness_resource_document(name text, description text)
+returns tsvector
+language sql immutable parallel safe
+as $$
+    select setweight(to_tsvector('english', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+$$;
+
+create index if not exists wellness_resources_document_idx
+    on public.wellness_resources using gin (public.wellness_resource_document(name, description));
+create index if not exists wellness_resources_name_trgm_idx
+    on public.wellness_resources using gin (name gin_trgm_ops);
+
+create or replace function public.search_wellness_resources(search text, resource_type text default null)
+returns setof public.wellness_resources
+language sql stable
+as $$
+    select r.*
+    from public.wellness_resources r
+    where (resource_type is null or r.type = resource_type)
+      and (public.wellness_resource_document(r.name, r.description) @@ websearch_to_tsquery('english', search)
+           or r.name ilike public.like_pattern(search))
+    order by ts_rank_cd(public.wellness_resource_document(r.name, r.description), websearch_to_tsquery('english', search)) desc,
+             similarity(coalesce(r.name, ''), search) desc,
+             r.created_at desc
+$$;
@@ -0,0 +1,82 @@
+-- Denormalised like and comment counts on posts, so the community feed reads them
+-- from the post rows it already fetches instead of downloading every like and
+-- comment row. Triggers on likes and comments keep the counts current; run
+-- `python manage.py reconcile_post_counts` (reconcile_post_counts() below) to
+-- repair any drift, e.g. after bulk edits with the triggers disabled. Only the
+-- service role may run the recount.
+-- The app detects the columns at startup (students/repository.py) and keeps
+-- tallying rows itself until this has been applied.
+-- Only for the current schema (public.posts, public.likes, public.comments): the
+-- table names are fixed below, so a project on the legacy anonymous_posts /
+-- post_likes / post_comments tables must not apply it and keeps the tallies.
+-- Apply with `supabase db push`, or paste into the SQL editor.
+
+alter table public.posts
+    add column if not exists like_count integer not null default 0,
+    add column if not exists comment_count integer not null default 0;
+
+-- TG_ARGV[0] is the posts column to maintain for the table the trigger is on
+create or replace function public.bump_post_counter()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op in ('DELETE', 'UPDATE') and old.post_id is not null then
+        execute format('update public.posts set %1$I = greatest(%1$I - 1, 0) where id = $1', tg_argv[0])
+            using old.post_id;
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') and new.post_id is not null then
+        execute format('update public.posts set %1$I = %1$I + 1 where id = $1', tg_argv[0])
+            using new.post_id;
+    end if;
+    return null;
+end
+$$;
+
+drop trigger if exists likes_post_counter on public.likes;
+create trigger likes_post_counter
+    after insert or delete or update of post_id on public.likes
+    for each row execute function public.bump_post_counter('like_count');
+
+drop trigger if exists comments_post_counter on public.comments;
+create trigger comments_post_counter
+    after insert or delete or update of post_id on public.comments
+    for each row execute function public.bump_post_counter('comment_count');
+
+-- Recount every post and fix the ones that drifted; returns the corrected rows
+create or replace function public.reconcile_post_counts()
+returns table (id bigint, like_count integer, comment_count integer)
+language sql
+security definer
+set search_path = public
+as $$
+    with actual as (
+        select p.id,
+               (select count(*) from public.likes l where l.post_id = p.id)::integer as like_count,
+               (select count(*) from public.comments c where c.post_id = p.id)::integer as comment_count
+        from public.posts p
+    )
+    update public.posts p
+    set like_count = a.like_count, comment_count = a.comment_count
+    from actual a
+    where p.id = a.id
+      and (p.like_count, p.comment_count) is distinct from (a.like_count, a.comment_count)
+    returning p.id::bigint, p.like_count, p.comment_count
+$$;
+
+-- Both functions run as their owner, so keep them away from API clients: the trigger
+-- function is only fired by the triggers (EXECUTE is checked when a trigger is
+-- created, not when it fires), and the recount is for the service role, which
+-- `manage.py reconcile_post_counts` needs as its SUPABASE_KEY
+revoke execute on function public.bump_post_counter() from public, anon, authenticated;
+revoke execute on function public.reconcile_post_counts() from public, anon, authenticated;
+grant execute on function public.reconcile_post_counts() to service_role;
+
+-- The recount looks likes and comments up by post
+create index if not exists likes_post_id_idx on public.likes (post_id);
+create index if not exists comments_post_id_idx on public.comments (post_id);
+
+-- Backfill existing posts
+select count(*) from public.reconcile_post_counts();